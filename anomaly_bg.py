@@ -2,6 +2,8 @@ import cv2
 import numpy as np
 import os
 import shutil
+from classes.shard_lib import ShardWriter
+from classes.image_lib import ImageAgent
 
 # Root directory
 root_dir = "./data-test"
@@ -15,6 +17,15 @@ contrast_levels_down = [0.9, 0.7, 0.5]
 hue_shifts = [5, 15, 30]
 dying_variations = [(10, 50, 50), (20, 70, 70), (30, 90, 90)]  # (hue, saturation, value)
 
+# Pack the outputs of every effect folder into tar shards of this many bytes instead of one file per image, 0 saves files
+# Read them back with ShardReader and ImageAgent.LoadShardImage
+shard_size = 0
+shard_writers = {}  # output folder -> ShardWriter of the current week, closed after every week
+
+# Threads decoding the next images and masks while the effects are applied
+load_workers = 4
+image_agent = ImageAgent()
+
 # Clear output folder before each run
 if os.path.exists(output_dir):
     shutil.rmtree(output_dir)  # Remove everything
@@ -63,6 +74,19 @@ def apply_effects(image, mask):
 
     return image_gray, hue_images, contrast_images, dying_images
 
+def save_output(folder, filename, image):
+    """Saves an output image as a file or appends it to the shard of its folder."""
+    if shard_size <= 0:
+        cv2.imwrite(os.path.join(folder, filename), image)
+        return
+
+    if folder not in shard_writers:
+        shard_writers[folder] = ShardWriter(folder, "images", shard_size)
+    ok, data = cv2.imencode(os.path.splitext(filename)[1], image)
+    if not ok:
+        raise IOError(f"Failed to encode {filename}")
+    shard_writers[folder].Write(filename, data.tobytes())
+
 # Process each subfolder (e.g., week3, week8, week12, week18)
 for week_folder in sorted(os.listdir(image_dir)):
     week_image_path = os.path.join(image_dir, week_folder)
@@ -87,21 +111,22 @@ for week_folder in sorted(os.listdir(image_dir)):
     image_filenames = {os.path.splitext(f)[0]: f for f in os.listdir(week_image_path) if f.endswith((".jpg", ".png", ".jpeg"))}
     mask_filenames = {os.path.splitext(f)[0]: f for f in os.listdir(week_mask_path) if f.endswith((".jpg", ".png", ".jpeg"))}
 
+    names = [name for name in image_filenames if name in mask_filenames]
     for name, image_file in image_filenames.items():
         if name not in mask_filenames:
             print(f"Warning: Mask for {image_file} in {week_folder} not found, skipping...")
-            continue
 
-        image_path = os.path.join(week_image_path, image_file)
-        mask_path = os.path.join(week_mask_path, mask_filenames[name])
-        image_ext = os.path.splitext(image_file)[1]  # Get original image extension
+    # Images and masks are decoded ahead in thread pools, in the order of names
+    images = image_agent.LoadImages((os.path.join(week_image_path, image_filenames[name]) for name in names), ImageAgent.ColorModeEnum.rgb_, load_workers)
+    masks = image_agent.LoadImages((os.path.join(week_mask_path, mask_filenames[name]) for name in names), ImageAgent.ColorModeEnum.grayscale_, load_workers)
 
-        # Load image and mask
-        image = cv2.imread(image_path)
-        mask = cv2.imread(mask_path, cv2.IMREAD_GRAYSCALE)
+    for name, image_result, mask_result in zip(names, images, masks):
+        image_file = image_filenames[name]
+        image_ext = os.path.splitext(image_file)[1]  # Get original image extension
+        image, mask = image_result.image_, mask_result.image_
 
         if image is None or mask is None:
-            print(f"Error loading {image_file} in {week_folder}, skipping...")
+            print(f"Error loading {image_file} in {week_folder}: {image_result.error_ or mask_result.error_}, skipping...")
             continue
 
         # Ensure binary mask
@@ -111,14 +136,19 @@ for week_folder in sorted(os.listdir(image_dir)):
         image_gray, hue_images, contrast_images, dying_images = apply_effects(image, mask)
 
         # Save outputs
-        cv2.imwrite(os.path.join(output_dir, "grayscale", week_folder, name + image_ext), image_gray)
+        save_output(os.path.join(output_dir, "grayscale", week_folder), name + image_ext, image_gray)
         for effect, img in hue_images.items():
-            cv2.imwrite(os.path.join(output_dir, effect, week_folder, name + image_ext), img)
+            save_output(os.path.join(output_dir, effect, week_folder), name + image_ext, img)
         for effect, img in contrast_images.items():
-            cv2.imwrite(os.path.join(output_dir, effect, week_folder, name + image_ext), img)
+            save_output(os.path.join(output_dir, effect, week_folder), name + image_ext, img)
         for effect, img in dying_images.items():
-            cv2.imwrite(os.path.join(output_dir, effect, week_folder, name + image_ext), img)
+            save_output(os.path.join(output_dir, effect, week_folder), name + image_ext, img)
 
         print(f"Processed: {week_folder}/{image_file}")
 
+    # Write the index of the last shard of every folder of the week and release its file and buffer
+    for writer in shard_writers.values():
+        writer.Close()
+    shard_writers.clear()
+
 print("Processing complete! Outputs saved in './data-test/output/'")
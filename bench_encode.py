@@ -0,0 +1,41 @@
+from argparse import ArgumentParser
+from itertools import islice
+from time import perf_counter
+from numpy import ndarray
+
+from classes.image_lib import ImageAgent
+
+# Encode throughput against bytes written for every encoder preset and format
+# Usage: python bench_encode.py datasets/week1/video1.mp4 --frames 20 --frame-rate 60 > bench_output.txt
+
+extensions : list[str] = [".png", ".jpg", ".webp"]
+
+def main() -> None:
+    parser : ArgumentParser = ArgumentParser(description="Benchmark the image encoder presets on video frames")
+    parser.add_argument("video", help="Video to take the frames from")
+    parser.add_argument("--frames", type=int, default=20, help="Number of frames to encode")
+    parser.add_argument("--frame-rate", type=int, default=60, help="Keep one frame every frame-rate frames")
+    args = parser.parse_args()
+
+    image_agent : ImageAgent = ImageAgent()
+    frames : list[ndarray] = [frame for _, _, frame in islice(image_agent.IterVideo(args.video, args.frame_rate), args.frames)]
+    assert frames, "No frames read from the video"
+
+    megapixels : float = sum(frame.shape[0] * frame.shape[1] for frame in frames) / 1e6
+    raw_bytes : int = sum(frame.nbytes for frame in frames)
+    print(f"{len(frames)} frames of {frames[0].shape[1]}x{frames[0].shape[0]}, {raw_bytes / 1e6:.1f} MB raw")
+    print(f"{'preset':<10}{'format':<8}{'ms/frame':>10}{'MPix/s':>10}{'KB/frame':>10}{'ratio':>8}")
+
+    for preset in ImageAgent.EncodePresetEnum:
+        options : ImageAgent.EncodeOptions = image_agent.PresetOptions(preset)
+        for extension in extensions:
+            encoded_bytes : int = 0
+            start : float = perf_counter()
+            for frame in frames:
+                encoded_bytes += image_agent.EncodeImage(frame, extension, options).size
+            elapsed : float = perf_counter() - start
+
+            print(f"{preset.value:<10}{extension:<8}{elapsed * 1000 / len(frames):>10.1f}{megapixels / elapsed:>10.1f}{encoded_bytes / 1024 / len(frames):>10.0f}{raw_bytes / encoded_bytes:>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+from timeit import timeit
+from tracemalloc import start, stop, take_snapshot
+from typing import Callable, Generic
+
+from classes.util_lib import Size, Point, Rect, RectArray, SetValidation, T
+
+# Allocation size and operation cost of Size, Point and Rect, before and after __slots__ and with and without validation
+# Usage: python bench_util.py > bench_output.txt
+
+# Layout of the classes before __slots__, an instance __dict__ and a Rect built through the subscripted generics
+class DictSize(Generic[T]):
+    def __init__(self, width : T, height : T) -> None:
+        self.width_ : T = width
+        self.height_ : T = height
+
+class DictPoint(Generic[T]):
+    def __init__(self, x : T, y : T) -> None:
+        self.x_ : T = x
+        self.y_ : T = y
+
+class DictRect(Generic[T]):
+    def __init__(self, width : T, height : T, x : T, y : T) -> None:
+        self.size_ : DictSize[T] = DictSize[T](width, height)
+        self.point_ : DictPoint[T] = DictPoint[T](x, y)
+
+def Allocated(factory : Callable[[], object], count : int = 10000) -> float:
+    # Bytes allocated per object, including the objects it owns
+    start()
+    before = take_snapshot()
+    objects : list[object] = [factory() for _ in range(count)]
+    after = take_snapshot()
+    stop()
+    return sum(stat.size_diff for stat in after.compare_to(before, "filename")) / len(objects)
+
+def main() -> None:
+    classes : list[tuple[str, Callable[[], object], Callable[[], object]]] = [
+        ("Size", lambda: DictSize(1, 2), lambda: Size(1, 2)),
+        ("Point", lambda: DictPoint(1, 2), lambda: Point(1, 2)),
+        ("Rect", lambda: DictRect(1, 2, 3, 4), lambda: Rect(1, 2, 3, 4)),
+    ]
+    number : int = 100000
+
+    print(f"{'object':<10}{'bytes':>8}{'slots':>8}{'us':>10}{'us slots':>10}")
+    for name, before, after in classes:
+        before_time : float = timeit(before, number=number) / number * 1e6
+        after_time : float = timeit(after, number=number) / number * 1e6
+        print(f"{name:<10}{Allocated(before):>8.0f}{Allocated(after):>8.0f}{before_time:>10.2f}{after_time:>10.2f}")
+
+    rect1 : Rect[int] = Rect(10, 10, 5, 5)
+    rect2 : Rect[int] = Rect(20, 20, 6, 6)
+    operations : list[tuple[str, Callable[[], object]]] = [
+        ("Rect()", lambda: Rect(1, 2, 3, 4)),
+        ("Mul", lambda: rect1.Mul(2)),
+        ("+", lambda: rect1 + rect2),
+        ("==", lambda: rect1 == rect2),
+        ("<", lambda: rect1 < rect2),
+        ("str", lambda: str(rect1)),
+    ]
+
+    print(f"\n{'operation':<10}{'us':>10}{'us valid':>10}")
+    for name, operation in operations:
+        SetValidation(False)
+        fast : float = timeit(operation, number=number) / number * 1e6
+        SetValidation(True)
+        validated : float = timeit(operation, number=number) / number * 1e6
+        print(f"{name:<10}{fast:>10.2f}{validated:>10.2f}")
+    SetValidation(False)
+
+    rects : list[Rect[int]] = [Rect(i, i, i, i) for i in range(10000)]
+    array : RectArray = RectArray.FromRects(rects)
+    loop : float = timeit(lambda: [rect.Mul(2).Add(1) for rect in rects], number=10) / 10 * 1e3
+    vectorized : float = timeit(lambda: array.Mul(2).Add(1), number=10) / 10 * 1e3
+    print(f"\n10000 boxes Mul + Add: Rect {loop:.2f} ms, RectArray {vectorized:.3f} ms")
+
+if __name__ == "__main__":
+    main()
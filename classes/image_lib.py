@@ -2,10 +2,18 @@
 
 from enum import Enum, unique
 from os.path import exists, dirname
-from os import makedirs
-from cv2 import imread, imwrite, resize, cvtColor, VideoCapture, inRange, findContours, boundingRect, COLOR_RGB2GRAY, COLOR_GRAY2RGB, COLOR_RGB2HSV, INTER_NEAREST, INTER_LINEAR, INTER_CUBIC, INTER_LANCZOS4, IMREAD_COLOR, IMREAD_GRAYSCALE, RETR_EXTERNAL, CHAIN_APPROX_SIMPLE, contourArea
-from numpy import ndarray, array
-from classes.util_lib import Size, Rect
+from struct import unpack
+from os import makedirs, stat
+from collections import OrderedDict
+from threading import Lock
+from typing import Iterator, Iterable
+from itertools import count
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from cv2 import imread, imwrite, imencode, imdecode, resize, cvtColor, VideoCapture, CAP_PROP_POS_MSEC, CAP_PROP_POS_FRAMES, CAP_PROP_FPS, CAP_PROP_FRAME_COUNT, CAP_PROP_FRAME_WIDTH, CAP_PROP_FRAME_HEIGHT, inRange, findContours, boundingRect, fillPoly, absdiff, COLOR_RGB2GRAY, COLOR_GRAY2RGB, COLOR_RGB2RGBA, COLOR_RGB2HSV, INTER_NEAREST, INTER_LINEAR, INTER_CUBIC, INTER_LANCZOS4, INTER_AREA, IMREAD_COLOR, IMREAD_GRAYSCALE, IMREAD_REDUCED_COLOR_2, IMREAD_REDUCED_COLOR_4, IMREAD_REDUCED_COLOR_8, IMREAD_REDUCED_GRAYSCALE_2, IMREAD_REDUCED_GRAYSCALE_4, IMREAD_REDUCED_GRAYSCALE_8, RETR_EXTERNAL, CHAIN_APPROX_SIMPLE, contourArea, connectedComponentsWithStatsWithAlgorithm, CCL_GRANA, CV_32S, morphologyEx, getStructuringElement, MORPH_OPEN, MORPH_RECT, CC_STAT_AREA, IMWRITE_PNG_COMPRESSION, IMWRITE_JPEG_QUALITY, IMWRITE_JPEG_PROGRESSIVE, IMWRITE_WEBP_QUALITY
+from numpy import ndarray, array, packbits, frombuffer, uint8, uint32, int32, int64, arange, stack, argpartition, argsort, flatnonzero, empty, zeros, full, where, concatenate, unique as unique_rows, minimum, maximum, add, iinfo
+from classes.util_lib import Size, Rect, RectArray
+from classes.shard_lib import ShardReader
 
 class ImageAgent:
     """
@@ -15,16 +23,61 @@ class ImageAgent:
         ColorModeEnum: Enum for different color modes.
         ColorConversionEnum: Enum for different color conversions.
         ImageInterpolationEnum: Enum for different interpolation methods for image resizing.
+        EncodePresetEnum: Enum for image encoder presets.
+
+    Classes:
+        VideoInfo: Container properties of a video file.
+        EncodeOptions: Encoder parameters for saving images.
+        LoadResult: Result of loading a single image.
+
+    Attributes:
+        cache_bytes_ (int): Size in bytes of the decoded image cache, 0 disables the cache.
+        cache_used_ (int): Bytes of decoded images in the cache.
+        cache_hits_ (int): Loads answered from the cache.
+        cache_misses_ (int): Loads that decoded the file.
+        mask_bounds_ (dict[tuple[int, ...], tuple[ndarray, ndarray]]): Bounds arrays of every plant color range.
+        mask_tables_ (dict[tuple[int, ...], ndarray]): Bit-packed lookup table of every plant color range.
 
     Methods:
         LoadImage: Load image from file.
+        LoadImages: Load many images in a thread pool.
+        TryLoadImage: Load image from file, reporting failures instead of raising.
+        ReadImage: Decode image from file through the cache.
+        ClearCache: Empty the decoded image cache.
+        LoadShardImage: Load image from a shard folder by key.
+        ProbeImageSize: Read the size of an image from its header without decoding it.
+        ReadHeaderSize: Parse the size from a PNG or JPEG header.
+        ExifTransposed: Whether the EXIF orientation of a JPEG swaps its width and height.
         SaveImage: Save image to file.
+        EncodeImage: Encode image to an in-memory buffer.
+        PresetOptions: Encoder options of a preset.
         ResizeImage: Resize image.
         ConvertColor: Convert color of image.
         CropImage: Crop image.
         LoadVideo: Load video from file.
+        IterVideo: Iterate over sampled video frames one at a time.
+        IterVideoFrames: Iterate over selected video frames, retrieving only the selected ones.
+        SeekFrame: Position a capture before a frame, checking the seek.
+        IterVideoInterval: Iterate over video frames sampled every interval seconds.
+        IntervalTimes: Target times every interval seconds.
+        IterVideoTimes: Iterate over the video frames at the selected times, by timestamp.
+        SeekTime: Position a capture before a time, checking the seek.
+        IterVideoAdaptive: Iterate over video frames kept when the scene changes.
+        SelectChangedFrames: Keep the frames whose content changed since the last kept frame.
+        GetVideoInfo: Read the container properties of a video file.
+        ImageHash: Difference hash of the image for near duplicate detection.
+        HashDistance: Hamming distance between two image hashes.
         FindPlantMask: Find plant mask in the image using color range.
+        PlantMaskTable: Bit-packed lookup table of a plant color range.
         FindPlantContour: Find plant contour in the mask.
+        FindPlantRects: Find plant bounding boxes on a reduced decode of an image file.
+        FindPlantComponents: Find the bounding boxes of the largest connected components in the mask.
+        BoxesToRects: Convert an array of bounding boxes to Rects.
+        FillPolygons: Fill the union of many polygons into a mask with few fillPoly calls.
+        FindPlantMaskTiled: Find plant mask in the image tile by tile.
+        FindPlantComponentsTiled: Find the largest plant components in the image tile by tile.
+        TileComponents: Connected components of the plant mask of a tile and the labels on its borders.
+        DecodeScale: Scale factor of a color mode.
 
     :example:
     >>> image_agent: ImageAgent = ImageAgent()
@@ -37,9 +90,24 @@ class ImageAgent:
 
         rgb_ : RGB color mode.
         grayscale_ : Grayscale color mode.
+        rgb_half_ : RGB color mode decoded at 1/2 scale.
+        rgb_quarter_ : RGB color mode decoded at 1/4 scale.
+        rgb_eighth_ : RGB color mode decoded at 1/8 scale.
+        grayscale_half_ : Grayscale color mode decoded at 1/2 scale.
+        grayscale_quarter_ : Grayscale color mode decoded at 1/4 scale.
+        grayscale_eighth_ : Grayscale color mode decoded at 1/8 scale.
+
+        The reduced modes are decoded in the DCT domain for JPEG, several times faster than decoding at full scale.
+        Other formats are decoded at full scale and resized. The reduced size is rounded up.
         """
         rgb_ = IMREAD_COLOR
         grayscale_ = IMREAD_GRAYSCALE
+        rgb_half_ = IMREAD_REDUCED_COLOR_2
+        rgb_quarter_ = IMREAD_REDUCED_COLOR_4
+        rgb_eighth_ = IMREAD_REDUCED_COLOR_8
+        grayscale_half_ = IMREAD_REDUCED_GRAYSCALE_2
+        grayscale_quarter_ = IMREAD_REDUCED_GRAYSCALE_4
+        grayscale_eighth_ = IMREAD_REDUCED_GRAYSCALE_8
 
     @unique
     class ColorConversionEnum(Enum):
@@ -62,14 +130,144 @@ class ImageAgent:
         nearest_ : Nearest neighbor interpolation.
         linear_ : Linear interpolation.
         cubic_ : Cubic interpolation.
+        lanczos4_ : Lanczos interpolation over 8x8 neighborhood.
+        area_ : Pixel area relation, best for downscaling.
         """
         nearest_ = INTER_NEAREST
         linear_ = INTER_LINEAR
         cubic_ = INTER_CUBIC
         lanczos4_ = INTER_LANCZOS4
+        area_ = INTER_AREA
+
+    @unique
+    class EncodePresetEnum(Enum):
+        """
+        Enum for image encoder presets.
+
+        default_ : OpenCV default parameters.
+        fast_ : Fast encoding for intermediate data, larger files. PNG uses zlib level 1, stored PNGs cost more in I/O than they save.
+        small_ : Smallest files, slowest encoding.
+        """
+        default_ = "default"
+        fast_ = "fast"
+        small_ = "small"
+
+    class EncodeOptions:
+        """
+        Encoder parameters for saving images, None keeps the OpenCV default.
+
+        Attributes:
+            png_compression_ (int | None): PNG zlib compression level, 0 (stored, fastest) to 9 (smallest).
+            jpeg_quality_ (int | None): JPEG quality, 0 to 100.
+            jpeg_progressive_ (bool): Write progressive JPEG.
+            webp_quality_ (int | None): Lossy WebP quality, 1 to 100.
+            webp_lossless_ (bool): Write lossless WebP, webp_quality_ is ignored.
+        """
+
+        def __init__(self, png_compression: int | None = None, jpeg_quality: int | None = None, jpeg_progressive: bool = False, webp_quality: int | None = None, webp_lossless: bool = False) -> None:
+            assert png_compression is None or 0 <= png_compression <= 9, "Invalid PNG compression level"
+            assert jpeg_quality is None or 0 <= jpeg_quality <= 100, "Invalid JPEG quality"
+            assert webp_quality is None or 1 <= webp_quality <= 100, "Invalid WebP quality"
+            self.png_compression_: int | None = png_compression
+            self.jpeg_quality_: int | None = jpeg_quality
+            self.jpeg_progressive_: bool = jpeg_progressive
+            self.webp_quality_: int | None = webp_quality
+            self.webp_lossless_: bool = webp_lossless
+
+        def Params(self, extension: str) -> list[int]:
+            """
+            OpenCV imwrite parameters for a file extension.
+
+            Args:
+                extension (str): File extension, e.g. ".png".
+
+            Returns:
+                list[int]: Flat list of parameter ids and values.
+            """
+            params: list[int] = []
+            if extension == ".png" and self.png_compression_ is not None:
+                params += [IMWRITE_PNG_COMPRESSION, self.png_compression_]
+            elif extension in (".jpg", ".jpeg"):
+                if self.jpeg_quality_ is not None:
+                    params += [IMWRITE_JPEG_QUALITY, self.jpeg_quality_]
+                if self.jpeg_progressive_:
+                    params += [IMWRITE_JPEG_PROGRESSIVE, 1]
+            elif extension == ".webp":
+                # OpenCV writes lossless WebP for a quality above 100
+                if self.webp_lossless_:
+                    params += [IMWRITE_WEBP_QUALITY, 101]
+                elif self.webp_quality_ is not None:
+                    params += [IMWRITE_WEBP_QUALITY, self.webp_quality_]
+            return params
+
+    class VideoInfo:
+        """
+        Container properties of a video file.
+
+        Attributes:
+            fps_ (float): Frames per second reported by the container.
+            frame_count_ (int): Number of frames reported by the container, may be an estimate.
+            size_ (Size[int]): Frame size.
+            duration_ (float): Duration in seconds.
+        """
+
+        def __init__(self, fps: float, frame_count: int, size: Size[int]) -> None:
+            self.fps_: float = fps
+            self.frame_count_: int = frame_count
+            self.size_: Size[int] = size
+            self.duration_: float = frame_count / fps if fps > 0 else 0.0
+
+    class LoadResult:
+        """
+        Result of loading a single image.
+
+        Attributes:
+            index_ (int): Position of the path in the loaded paths.
+            path_ (str): Path to the image file.
+            image_ (ndarray | None): Loaded image, None if the file could not be read.
+            error_ (str | None): Error message if the file could not be read.
+        """
+
+        def __init__(self, index: int, path: str, image: ndarray | None, error: str | None = None) -> None:
+            self.index_: int = index
+            self.path_: str = path
+            self.image_: ndarray | None = image
+            self.error_: str | None = error
+
+    def __init__(self, cache_bytes: int = 0) -> None:
+        """
+        Constructor for ImageAgent class
+
+        Args:
+            cache_bytes (int): Keep up to this many bytes of decoded images and return them again when the same
+                unchanged file is loaded with the same color mode, least recently used images are evicted first. 0 disables the cache.
+                Cached images are read-only since they are shared between callers, copy them before changing them in place.
+
+        :example:
+        >>> image_agent: ImageAgent = ImageAgent(cache_bytes=1 << 30)
+        """
+        assert cache_bytes >= 0, "Invalid cache size"
+        self.cache_bytes_: int = cache_bytes
+        self.cache_used_: int = 0
+        self.cache_hits_: int = 0
+        self.cache_misses_: int = 0
+        self.cache_: OrderedDict[tuple[str, int, int, int], ndarray] = OrderedDict()
+        self.cache_lock_: Lock = Lock()
+        self.mask_bounds_: dict[tuple[int, ...], tuple[ndarray, ndarray]] = {}
+        self.mask_tables_: dict[tuple[int, ...], ndarray] = {}
+
+    def __getstate__(self) -> dict:
+        # Worker processes start with an empty cache, locks cannot be pickled
+        state: dict = self.__dict__.copy()
+        state["cache_"] = OrderedDict()
+        state["cache_used_"] = 0
+        state["mask_tables_"] = {}
+        del state["cache_lock_"]
+        return state
 
-    def __init__(self):
-        pass
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.cache_lock_ = Lock()
 
     def LoadImage(self, path: str, color_mode: ColorModeEnum) -> ndarray:
         """
@@ -87,34 +285,348 @@ class ImageAgent:
         >>> image: ndarray = image_agent.LoadImage("path/to/image.jpg", ImageAgent.ColorModeEnum.rgb_)
         """
         assert exists(path), "File not found"
-        image: ndarray = imread(path, color_mode.value)
+        image: ndarray = self.ReadImage(path, color_mode)
+        return image
+
+    def LoadImages(self, paths: Iterable[str], color_mode: ColorModeEnum, workers: int = 4, ordered: bool = True) -> Iterator['ImageAgent.LoadResult']:
+        """
+        Load many images in a thread pool, OpenCV releases the GIL while decoding so the threads run in parallel.
+        At most 2 * workers images are loaded ahead of the consumer, so memory stays bounded for long path lists.
+        Unreadable files are reported in the result instead of raised.
+
+        Args:
+            paths (Iterable[str]): Paths to the image files.
+            color_mode (ColorModeEnum): Color mode of the images.
+            workers (int): Decoding threads, 0 or 1 loads in the calling thread.
+            ordered (bool): Yield the results in the order of paths, otherwise as soon as they are decoded.
+
+        Returns:
+            Iterator[LoadResult]: Loaded image or error of every path.
+
+        :example:
+        >>> image_agent: ImageAgent = ImageAgent()
+        >>> for result in image_agent.LoadImages(["a.jpg", "b.jpg"], ImageAgent.ColorModeEnum.rgb_, workers=8):
+        >>>     if result.error_ is None:
+        >>>         print(result.path_, result.image_.shape)
+        """
+        if workers <= 1:
+            for index, path in enumerate(paths):
+                yield self.TryLoadImage(index, path, color_mode)
+            return
+
+        window: int = workers * 2
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            if ordered:
+                queue: deque[Future] = deque()
+                for index, path in enumerate(paths):
+                    queue.append(executor.submit(self.TryLoadImage, index, path, color_mode))
+                    if len(queue) >= window:
+                        yield queue.popleft().result()
+                while queue:
+                    yield queue.popleft().result()
+            else:
+                pending: set[Future] = set()
+                for index, path in enumerate(paths):
+                    pending.add(executor.submit(self.TryLoadImage, index, path, color_mode))
+                    if len(pending) >= window:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield future.result()
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+
+    def TryLoadImage(self, index: int, path: str, color_mode: ColorModeEnum) -> 'ImageAgent.LoadResult':
+        """
+        Load image from file, reporting a missing or undecodable file in the result instead of raising.
+
+        Args:
+            index (int): Position of the path in the loaded paths.
+            path (str): Path to the image file.
+            color_mode (ColorModeEnum): Color mode of the image.
+
+        Returns:
+            LoadResult: Loaded image or error.
+
+        :example:
+        >>> image_agent: ImageAgent = ImageAgent()
+        >>> result: ImageAgent.LoadResult = image_agent.TryLoadImage(0, "path/to/image.jpg", ImageAgent.ColorModeEnum.rgb_)
+        """
+        try:
+            image: ndarray | None = self.ReadImage(path, color_mode)
+        except Exception as error:
+            return ImageAgent.LoadResult(index, path, None, repr(error))
+        if image is None:
+            return ImageAgent.LoadResult(index, path, None, "File not found" if not exists(path) else "Failed to decode image")
+        return ImageAgent.LoadResult(index, path, image)
+
+    def ReadImage(self, path: str, color_mode: ColorModeEnum) -> ndarray | None:
+        """
+        Decode image from file, through the cache when cache_bytes_ > 0.
+        The cache key holds the modification time and size of the file, so a changed file is decoded again.
+
+        Args:
+            path (str): Path to the image file.
+            color_mode (ColorModeEnum): Color mode of the image.
+
+        Returns:
+            ndarray | None: Decoded image, None if the file could not be read.
+
+        :example:
+        >>> image_agent: ImageAgent = ImageAgent(cache_bytes=1 << 30)
+        >>> image: ndarray = image_agent.ReadImage("path/to/image.jpg", ImageAgent.ColorModeEnum.rgb_)
+        """
+        if self.cache_bytes_ <= 0:
+            return imread(path, color_mode.value)
+
+        try:
+            file_stat = stat(path)
+        except OSError:
+            return None
+        key: tuple[str, int, int, int] = (path, file_stat.st_mtime_ns, file_stat.st_size, color_mode.value)
+
+        with self.cache_lock_:
+            image: ndarray | None = self.cache_.get(key)
+            if image is not None:
+                self.cache_.move_to_end(key)
+                self.cache_hits_ += 1
+                return image
+            self.cache_misses_ += 1
+
+        # Decode outside the lock so threads decode in parallel
+        image = imread(path, color_mode.value)
+        if image is None or image.nbytes > self.cache_bytes_:
+            return image
+        image.flags.writeable = False
+
+        with self.cache_lock_:
+            if key not in self.cache_:
+                self.cache_[key] = image
+                self.cache_used_ += image.nbytes
+            while self.cache_used_ > self.cache_bytes_:
+                _, evicted = self.cache_.popitem(last=False)
+                self.cache_used_ -= evicted.nbytes
+        return image
+
+    def ClearCache(self) -> None:
+        """
+        Empty the decoded image cache and reset its counters.
+
+        :example:
+        >>> image_agent.ClearCache()
+        """
+        with self.cache_lock_:
+            self.cache_.clear()
+            self.cache_used_ = 0
+            self.cache_hits_ = 0
+            self.cache_misses_ = 0
+
+    def ProbeImageSize(self, path: str) -> Size[int]:
+        """
+        Read the size of an image from its PNG IHDR or JPEG SOF header without decoding the pixels.
+        The JPEG EXIF orientation is applied like LoadImage does, so the size matches the decoded image.
+        Other formats and headers that cannot be parsed fall back to a full decode.
+
+        Args:
+            path (str): Path to the image file.
+
+        Returns:
+            Size[int]: Width and height of the image.
+
+        :example:
+        >>> image_agent: ImageAgent = ImageAgent()
+        >>> size: Size[int] = image_agent.ProbeImageSize("path/to/image.jpg")
+        """
+        assert exists(path), "File not found"
+        with open(path, "rb") as file:
+            size: Size[int] | None = self.ReadHeaderSize(file)
+        if size is not None:
+            return size
+
+        image: ndarray | None = self.ReadImage(path, ImageAgent.ColorModeEnum.rgb_)
+        if image is None:
+            raise IOError(f"Failed to decode {path}")
+        return Size(image.shape[1], image.shape[0])
+
+    def ReadHeaderSize(self, file) -> Size[int] | None:
+        """
+        Parse the size from a PNG or JPEG header, reading only the header segments.
+
+        Args:
+            file (BinaryIO): Image file opened in binary mode at its start.
+
+        Returns:
+            Size[int] | None: Width and height of the image, None if the header is not a PNG or JPEG header.
+
+        :example:
+        >>> image_agent: ImageAgent = ImageAgent()
+        >>> with open("path/to/image.png", "rb") as file:
+        >>>     size: Size[int] | None = image_agent.ReadHeaderSize(file)
+        """
+        head: bytes = file.read(24)
+
+        # PNG, the IHDR chunk is always first
+        if head[:8] == b"\x89PNG\r\n\x1a\n" and head[12:16] == b"IHDR":
+            width, height = unpack(">II", head[16:24])
+            return Size(width, height)
+
+        if head[:2] != b"\xff\xd8":
+            return None
+
+        # JPEG, walk the marker segments up to the first start of frame
+        file.seek(2)
+        transposed: bool = False
+        while True:
+            marker: bytes = file.read(2)
+            while marker[:1] == b"\xff" and marker[1:2] == b"\xff":
+                marker = marker[1:] + file.read(1) # fill bytes
+            if len(marker) < 2 or marker[0] != 0xFF:
+                return None
+            code: int = marker[1]
+            if code in (0x01, 0xD8) or 0xD0 <= code <= 0xD7:
+                continue # markers without a length
+            if code in (0xD9, 0xDA):
+                return None # end of image or start of scan before any frame header
+
+            length_bytes: bytes = file.read(2)
+            if len(length_bytes) < 2:
+                return None
+            length: int = unpack(">H", length_bytes)[0]
+            segment: bytes = file.read(length - 2)
+            if len(segment) < length - 2:
+                return None
+
+            if code == 0xE1 and segment[:6] == b"Exif\x00\x00":
+                transposed = self.ExifTransposed(segment[6:])
+            elif code in (0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF):
+                height, width = unpack(">HH", segment[1:5])
+                return Size(height, width) if transposed else Size(width, height)
+
+    def ExifTransposed(self, tiff: bytes) -> bool:
+        """
+        Whether the EXIF orientation of a JPEG swaps its width and height (orientations 5 to 8).
+
+        Args:
+            tiff (bytes): TIFF structure of the EXIF segment.
+
+        Returns:
+            bool: True if the decoded image is rotated by 90 degrees.
+
+        :example:
+        >>> image_agent: ImageAgent = ImageAgent()
+        >>> transposed: bool = image_agent.ExifTransposed(app1_segment[6:])
+        """
+        if len(tiff) < 8 or tiff[:2] not in (b"II", b"MM"):
+            return False
+        order: str = "<" if tiff[:2] == b"II" else ">"
+        offset: int = unpack(f"{order}I", tiff[4:8])[0]
+        if offset + 2 > len(tiff):
+            return False
+        entries: int = unpack(f"{order}H", tiff[offset:offset + 2])[0]
+        for entry in range(entries):
+            start: int = offset + 2 + entry * 12
+            if start + 12 > len(tiff):
+                return False
+            tag, _, _ = unpack(f"{order}HHI", tiff[start:start + 8])
+            if tag == 0x0112:
+                return unpack(f"{order}H", tiff[start + 8:start + 10])[0] in (5, 6, 7, 8)
+        return False
+
+    def LoadShardImage(self, reader: ShardReader, key: str, color_mode: ColorModeEnum) -> ndarray:
+        """
+        Load image from a shard folder by key.
+
+        Args:
+            reader (ShardReader): Reader of the shard folder.
+            key (str): Name of the image in the shards.
+            color_mode (ColorModeEnum): Color mode of the image.
+
+        Returns:
+            ndarray: Loaded image.
+
+        :example:
+        >>> image_agent: ImageAgent = ImageAgent()
+        >>> reader: ShardReader = ShardReader("bin/week1/video1")
+        >>> image: ndarray = image_agent.LoadShardImage(reader, "0000000.png", ImageAgent.ColorModeEnum.rgb_)
+        """
+        image: ndarray | None = imdecode(frombuffer(reader.Read(key), dtype=uint8), color_mode.value)
+        if image is None:
+            raise IOError(f"Failed to decode {key} from {reader.folder_}")
         return image
 
-    def SaveImage(self, path: str, image: ndarray) -> None:
+    def SaveImage(self, path: str, image: ndarray, options: 'ImageAgent.EncodeOptions | None' = None) -> None:
         """
         Save image to file.
 
         Args:
             path (str): Path to save the image.
             image (ndarray): Image data.
+            options (EncodeOptions | None): Encoder parameters, None uses the OpenCV defaults.
 
         :example:
         >>> image_agent: ImageAgent = ImageAgent()
         >>> image: ndarray = image_agent.LoadImage("path/to/image.jpg", ImageAgent.ColorModeEnum.rgb_)
         >>> image_agent.SaveImage("path/to/save/image.jpg", image)
+        >>> image_agent.SaveImage("path/to/save/image.png", image, image_agent.PresetOptions(ImageAgent.EncodePresetEnum.fast_))
         """
-        assert path.endswith((".jpg", ".png")), "Invalid file format"
+        assert path.endswith((".jpg", ".jpeg", ".png", ".webp")), "Invalid file format"
 
         # Ensure the directory exists
         directory = dirname(path)
-        if not exists(directory):
-            makedirs(directory)
+        if directory and not exists(directory):
+            makedirs(directory, exist_ok=True)
 
         # Save the image
-        if not imwrite(path, image):
+        params: list[int] = [] if options is None else options.Params(path[path.rindex("."):])
+        if not imwrite(path, image, params):
             raise IOError(f"Failed to save image to {path}")
 
-    def ResizeImage(self, image: ndarray, size: Size[int], interpolation: ImageInterpolationEnum = ImageInterpolationEnum.linear_) -> ndarray:
+    def EncodeImage(self, image: ndarray, extension: str, options: 'ImageAgent.EncodeOptions | None' = None) -> ndarray:
+        """
+        Encode image to an in-memory buffer.
+
+        Args:
+            image (ndarray): Image data.
+            extension (str): Image format, ".jpg", ".jpeg", ".png" or ".webp".
+            options (EncodeOptions | None): Encoder parameters, None uses the OpenCV defaults.
+
+        Returns:
+            ndarray: Encoded bytes.
+
+        :example:
+        >>> image_agent: ImageAgent = ImageAgent()
+        >>> data: ndarray = image_agent.EncodeImage(image, ".webp", ImageAgent.EncodeOptions(webp_quality=80))
+        """
+        assert extension in (".jpg", ".jpeg", ".png", ".webp"), "Invalid file format"
+
+        params: list[int] = [] if options is None else options.Params(extension)
+        ret, data = imencode(extension, image, params)
+        if not ret:
+            raise IOError(f"Failed to encode image to {extension}")
+        return data
+
+    def PresetOptions(self, preset: 'ImageAgent.EncodePresetEnum') -> 'ImageAgent.EncodeOptions':
+        """
+        Encoder options of a preset.
+
+        Args:
+            preset (EncodePresetEnum): Encoder preset.
+
+        Returns:
+            EncodeOptions: Encoder options.
+
+        :example:
+        >>> image_agent: ImageAgent = ImageAgent()
+        >>> options: ImageAgent.EncodeOptions = image_agent.PresetOptions(ImageAgent.EncodePresetEnum.fast_)
+        """
+        if preset == ImageAgent.EncodePresetEnum.fast_:
+            return ImageAgent.EncodeOptions(png_compression=1, jpeg_quality=90, webp_quality=75)
+        if preset == ImageAgent.EncodePresetEnum.small_:
+            return ImageAgent.EncodeOptions(png_compression=9, jpeg_quality=85, jpeg_progressive=True, webp_quality=80)
+        return ImageAgent.EncodeOptions()
+
+    def ResizeImage(self, image: ndarray, size: Size[int], interpolation: ImageInterpolationEnum = ImageInterpolationEnum.linear_, dst: ndarray | None = None) -> ndarray:
         """
         Resize image.
 
@@ -122,6 +634,7 @@ class ImageAgent:
             image (ndarray): Image data.
             size (Size[int]): Size to resize the image.
             interpolation (ImageInterpolation): Interpolation method.
+            dst (ndarray | None): Preallocated output image of the target size and image type, reused instead of allocating a new one.
 
         Returns:
             ndarray: Resized image.
@@ -132,6 +645,9 @@ class ImageAgent:
         >>> resized_image: ndarray = image_agent.ResizeImage(image, Size(100, 100), ImageAgent.ImageInterpolation.nearest_)
         """
         assert size.width_ > 0 and size.height_ > 0, "Invalid size"
+        if dst is not None:
+            assert dst.shape[:2] == (size.height_, size.width_) and dst.shape[2:] == image.shape[2:] and dst.dtype == image.dtype, "Invalid destination image"
+            return resize(image, (size.width_, size.height_), dst=dst, interpolation=interpolation.value)
         return resize(image, (size.width_, size.height_), interpolation=interpolation.value)
 
     def ConvertColor(self, image: ndarray, conversion: ColorConversionEnum) -> ndarray:
@@ -174,6 +690,7 @@ class ImageAgent:
     def LoadVideo(self, path: str, frame_rate: int) -> list[ndarray]:
         """
         Load video from file.
+        Keeps every sampled frame in memory, prefer IterVideo for long videos.
 
         Args:
             path (str): Path to the video file.
@@ -186,32 +703,428 @@ class ImageAgent:
         >>> image_agent: ImageAgent = ImageAgent()
         >>> frames: list[ndarray] = image_agent.LoadVideo("path/to/video.mp4", 30)
         """
+        return [frame for _, _, frame in self.IterVideo(path, frame_rate)]
+
+    def IterVideo(self, path: str, frame_rate: int, seek_threshold: int = 0) -> Iterator[tuple[int, float, ndarray]]:
+        """
+        Iterate over sampled video frames one at a time.
+        Only the current frame is held in memory.
+
+        Args:
+            path (str): Path to the video file.
+            frame_rate (int): Keep one frame every frame_rate frames.
+            seek_threshold (int): Seek instead of grabbing when more than this many frames are skipped, 0 never seeks.
+
+        Yields:
+            tuple[int, float, ndarray]: Frame index, timestamp in seconds and frame.
+
+        :example:
+        >>> image_agent: ImageAgent = ImageAgent()
+        >>> for index, timestamp, frame in image_agent.IterVideo("path/to/video.mp4", 30):
+        >>>     print(index, timestamp, frame.shape)
+        """
+        assert frame_rate > 0, "Invalid frame rate"
+        return self.IterVideoFrames(path, count(0, frame_rate), seek_threshold)
+
+    def IterVideoFrames(self, path: str, frame_indices: Iterable[int], seek_threshold: int = 0, start_frame: int = 0) -> Iterator[tuple[int, float, ndarray]]:
+        """
+        Iterate over selected video frames, retrieving only the selected ones.
+        Skipped frames are grabbed, which still decodes them in the FFmpeg backend, but they are not retrieved or converted to BGR.
+        When the gap to the next selected frame is larger than seek_threshold the stream is seeked by frame position instead.
+        Every seek is checked with SeekFrame, a video whose seeks are not frame accurate is grabbed frame by frame from then on.
+        Iteration stops at the end of the video, so frame_indices may be infinite.
+
+        Args:
+            path (str): Path to the video file.
+            frame_indices (Iterable[int]): Increasing frame indices to retrieve, repeated indices are skipped.
+            seek_threshold (int): Seek instead of grabbing when more than this many frames are skipped, 0 never seeks.
+            start_frame (int): Seek to this frame before reading, frame indices before it are skipped.
+
+        Yields:
+            tuple[int, float, ndarray]: Frame index, timestamp in seconds and frame.
+
+        :example:
+        >>> image_agent: ImageAgent = ImageAgent()
+        >>> for index, timestamp, frame in image_agent.IterVideoFrames("path/to/video.mp4", [0, 100, 200]):
+        >>>     print(index, timestamp, frame.shape)
+        """
+        assert exists(path), "File not found"
+        assert path.endswith((".mp4", ".mov")), "Invalid file format"
+        assert seek_threshold >= 0, "Invalid seek threshold"
+        assert start_frame >= 0, "Invalid start frame"
+
+        video = VideoCapture(path)
+        if not video.isOpened():
+            raise IOError(f"Failed to open video {path}")
+        position: int = 0 # index of the next frame to be grabbed
+
+        try:
+            if start_frame > 0:
+                video, accurate = self.SeekFrame(video, path, start_frame)
+                position = start_frame
+                if not accurate:
+                    seek_threshold = 0
+
+            for index in frame_indices:
+                if index < position:
+                    continue
+
+                # Sparse sampling, jump straight to the frame
+                if 0 < seek_threshold < index - position:
+                    video, accurate = self.SeekFrame(video, path, index)
+                    position = index
+                    if not accurate:
+                        seek_threshold = 0
+
+                # Dense sampling, advance the stream without retrieving or converting the skipped frames
+                while position < index:
+                    if not video.grab():
+                        return
+                    position += 1
+
+                if not video.grab():
+                    return
+                position += 1
+                ret, frame = video.retrieve()
+                if not ret:
+                    return
+                yield index, video.get(CAP_PROP_POS_MSEC) / 1000.0, frame
+        finally:
+            video.release()
+
+    def SeekFrame(self, video: VideoCapture, path: str, index: int) -> tuple[VideoCapture, bool]:
+        """
+        Position a capture so the next grabbed frame is index.
+        The capture is seeked to the frame before index and that frame is grabbed to check the position the decoder reports.
+        Seeking is not frame accurate for every codec and GOP layout, when the position is off the video is opened again
+        and grabbed frame by frame up to index.
+
+        Args:
+            video (VideoCapture): Opened capture.
+            path (str): Path to the video file, to open it again.
+            index (int): Index of the next frame to grab.
+
+        Returns:
+            tuple[VideoCapture, bool]: Capture positioned before index, the same or a new one, and whether the seek was accurate.
+
+        :example:
+        >>> image_agent: ImageAgent = ImageAgent()
+        >>> video, accurate = image_agent.SeekFrame(VideoCapture("path/to/video.mp4"), "path/to/video.mp4", 300)
+        """
+        if index > 0:
+            video.set(CAP_PROP_POS_FRAMES, index - 1)
+            if video.grab() and int(video.get(CAP_PROP_POS_FRAMES)) == index:
+                return video, True
+
+        video.release()
+        video = VideoCapture(path)
+        if not video.isOpened():
+            raise IOError(f"Failed to open video {path}")
+        for _ in range(index):
+            if not video.grab():
+                break
+        return video, index == 0
+
+    def IterVideoInterval(self, path: str, interval: float, seek_threshold: int | None = None) -> Iterator[tuple[int, float, ndarray]]:
+        """
+        Iterate over video frames sampled every interval seconds.
+        Frames are selected by their timestamps, see IterVideoTimes, so the sampling follows the wall clock
+        for 24, 30, 60 or 120 fps videos and for variable frame rate phone footage.
+
+        Args:
+            path (str): Path to the video file.
+            interval (float): Time between two sampled frames in seconds.
+            seek_threshold (int | None): Seek instead of grabbing when more than this many frames are skipped,
+                0 never seeks, None seeks when more than one second of video is skipped.
+
+        Yields:
+            tuple[int, float, ndarray]: Sample number k of the target time k * interval, timestamp in seconds and frame.
+
+        :example:
+        >>> image_agent: ImageAgent = ImageAgent()
+        >>> for sample, timestamp, frame in image_agent.IterVideoInterval("path/to/video.mp4", 3.0):
+        >>>     print(sample, timestamp, frame.shape)
+        """
+        return self.IterVideoTimes(path, self.IntervalTimes(interval), seek_threshold)
+
+    def IntervalTimes(self, interval: float) -> Iterator[float]:
+        """
+        Target times 0, interval, 2 * interval, ... in seconds, computed by multiplication so they do not drift.
+
+        Args:
+            interval (float): Time between two sampled frames in seconds.
+
+        Yields:
+            float: Target time in seconds.
+
+        :example:
+        >>> image_agent: ImageAgent = ImageAgent()
+        >>> times: list[float] = list(islice(image_agent.IntervalTimes(3.0), 3)) # [0.0, 3.0, 6.0]
+        """
+        assert interval > 0, "Invalid interval"
+        return (sample * interval for sample in count())
+
+    def IterVideoTimes(self, path: str, times: Iterable[float], seek_threshold: int | None = None, previous_time: float | None = None) -> Iterator[tuple[int, float, ndarray]]:
+        """
+        Iterate over the video frames at the selected times, using the frame timestamps instead of the container frame rate.
+        The frame of a target time is the first grabbed frame whose CAP_PROP_POS_MSEC timestamp reaches it, less half a nominal frame
+        so constant frame rate videos get the frame closest to the target. Target times that fall on an already selected frame are skipped.
+        Seeks are by timestamp and checked, see SeekTime. Iteration stops at the end of the video, so times may be infinite.
+
+        Args:
+            path (str): Path to the video file.
+            times (Iterable[float]): Increasing target times in seconds.
+            seek_threshold (int | None): Seek instead of grabbing when more than this many nominal frames are skipped,
+                0 never seeks, None seeks when more than one second of video is skipped. Videos without a frame rate never seek.
+            previous_time (float | None): Target time before the first one of times, to read a part of a longer sequence.
+                The capture is seeked to its frame, which counts as already selected, so the same target times are skipped as in a
+                read of the whole sequence.
+
+        Yields:
+            tuple[int, float, ndarray]: Position of the target time in times, timestamp in seconds and frame.
+
+        :example:
+        >>> image_agent: ImageAgent = ImageAgent()
+        >>> for sample, timestamp, frame in image_agent.IterVideoTimes("path/to/video.mp4", [0.0, 2.5, 10.0]):
+        >>>     print(sample, timestamp, frame.shape)
+        """
         assert exists(path), "File not found"
         assert path.endswith((".mp4", ".mov")), "Invalid file format"
+        assert seek_threshold is None or seek_threshold >= 0, "Invalid seek threshold"
 
         video = VideoCapture(path)
-        frames = []
-        count: int = 0
+        if not video.isOpened():
+            raise IOError(f"Failed to open video {path}")
 
-        while video.isOpened():
-            ret, frame = video.read()
-            if not ret:
+        fps: float = video.get(CAP_PROP_FPS)
+        frame_time: float = 1.0 / fps if fps > 0 else 0.0
+        tolerance: float = frame_time / 2
+        seek_gap: float = (max(int(fps), 1) if seek_threshold is None else seek_threshold) * frame_time # 0 never seeks
+        grabbed: float | None = None # timestamp of the last grabbed frame
+        selected: float = float("-inf") # timestamp of the last selected frame
+
+        try:
+            if previous_time is not None:
+                threshold: float = previous_time - tolerance
+                if threshold > 0:
+                    video, grabbed = self.SeekTime(video, path, threshold, frame_time)
+                    if grabbed is None:
+                        seek_gap = 0.0
+                while grabbed is None or grabbed < threshold:
+                    if not video.grab():
+                        return
+                    grabbed = video.get(CAP_PROP_POS_MSEC) / 1000.0
+                selected = grabbed
+
+            for sample, time in enumerate(times):
+                threshold = time - tolerance
+                if threshold <= selected:
+                    continue
+
+                # Sparse sampling, jump close to the target time
+                if seek_gap > 0 and threshold - (grabbed if grabbed is not None else 0.0) > seek_gap:
+                    video, grabbed = self.SeekTime(video, path, threshold, frame_time)
+                    if grabbed is None:
+                        seek_gap = 0.0 # the seeks of this video are not reliable, grab frame by frame
+
+                # Advance the stream without retrieving or converting the skipped frames
+                while grabbed is None or grabbed < threshold:
+                    if not video.grab():
+                        return
+                    grabbed = video.get(CAP_PROP_POS_MSEC) / 1000.0
+
+                ret, frame = video.retrieve()
+                if not ret:
+                    return
+                selected = grabbed
+                yield sample, grabbed, frame
+        finally:
+            video.release()
+
+    def SeekTime(self, video: VideoCapture, path: str, time: float, frame_time: float) -> tuple[VideoCapture, float | None]:
+        """
+        Position a capture on a frame before time, so grabbing on finds the first frame at or after time.
+        The capture is seeked a frame before time and the frame it lands on is grabbed to check its timestamp.
+        Seeks that land too late are retried one and ten seconds earlier, after that the video is opened again.
+
+        Args:
+            video (VideoCapture): Opened capture.
+            path (str): Path to the video file, to open it again.
+            time (float): Time in seconds to position before.
+            frame_time (float): Nominal duration of a frame in seconds, 0 if unknown.
+
+        Returns:
+            tuple[VideoCapture, float | None]: Capture, the same or a new one, and the timestamp of the grabbed frame before time,
+                None when the capture was opened again and nothing is grabbed.
+
+        :example:
+        >>> image_agent: ImageAgent = ImageAgent()
+        >>> video, timestamp = image_agent.SeekTime(VideoCapture("path/to/video.mp4"), "path/to/video.mp4", 600.0, 1 / 30)
+        """
+        for margin in (frame_time or 0.1, 1.0, 10.0):
+            if time - margin <= 0:
+                break
+            video.set(CAP_PROP_POS_MSEC, (time - margin) * 1000.0)
+            if not video.grab():
                 break
-            if count % frame_rate == 0:
-                frames.append(frame)
-            count += 1
+            timestamp: float = video.get(CAP_PROP_POS_MSEC) / 1000.0
+            if timestamp < time:
+                return video, timestamp
 
         video.release()
-        return frames
+        video = VideoCapture(path)
+        if not video.isOpened():
+            raise IOError(f"Failed to open video {path}")
+        return video, None
+
+    def IterVideoAdaptive(self, path: str, threshold: float, min_interval: float = 0.0, max_interval: float = 0.0, probe_stride: int = 1) -> Iterator[tuple[int, float, ndarray]]:
+        """
+        Iterate over video frames kept when the scene changes.
+        One frame every probe_stride frames is decoded and compared with the last kept frame, see SelectChangedFrames.
+
+        Args:
+            path (str): Path to the video file.
+            threshold (float): Mean absolute grayscale difference (0 - 255) that counts as a scene change.
+            min_interval (float): Minimum time between two kept frames in seconds.
+            max_interval (float): Maximum time between two kept frames in seconds, 0 has no maximum.
+            probe_stride (int): Compare one frame every probe_stride frames.
+
+        Yields:
+            tuple[int, float, ndarray]: Frame index, timestamp in seconds and frame.
+
+        :example:
+        >>> image_agent: ImageAgent = ImageAgent()
+        >>> for index, timestamp, frame in image_agent.IterVideoAdaptive("path/to/video.mp4", 12.0, 1.0, 10.0, 5):
+        >>>     print(index, timestamp, frame.shape)
+        """
+        return self.SelectChangedFrames(self.IterVideo(path, probe_stride), threshold, min_interval, max_interval)
+
+    def SelectChangedFrames(self, frames: Iterable[tuple[int, float, ndarray]], threshold: float, min_interval: float = 0.0, max_interval: float = 0.0, thumbnail_width: int = 64) -> Iterator[tuple[int, float, ndarray]]:
+        """
+        Keep the frames whose content changed since the last kept frame.
+        Frames are scored by the mean absolute difference of small grayscale thumbnails, so scoring costs little next to decoding.
+        A frame is kept when the score reaches threshold and at least min_interval seconds passed since the last kept frame,
+        or when max_interval seconds passed whatever the score. The first frame is always kept.
+
+        Args:
+            frames (Iterable[tuple[int, float, ndarray]]): Frame index, timestamp in seconds and frame, as yielded by IterVideoFrames.
+            threshold (float): Mean absolute grayscale difference (0 - 255) that counts as a scene change.
+            min_interval (float): Minimum time between two kept frames in seconds.
+            max_interval (float): Maximum time between two kept frames in seconds, 0 has no maximum.
+            thumbnail_width (int): Width of the thumbnails compared, the height keeps the aspect ratio.
+
+        Yields:
+            tuple[int, float, ndarray]: Frame index, timestamp in seconds and frame of the kept frames.
+
+        :example:
+        >>> image_agent: ImageAgent = ImageAgent()
+        >>> frames = image_agent.SelectChangedFrames(image_agent.IterVideo("path/to/video.mp4", 5), 12.0, 1.0, 10.0)
+        """
+        assert threshold > 0, "Invalid threshold"
+        assert min_interval >= 0 and max_interval >= 0, "Invalid interval"
+        assert thumbnail_width > 0, "Invalid thumbnail width"
+
+        last_thumbnail: ndarray | None = None
+        last_timestamp: float = 0.0
+
+        for index, timestamp, frame in frames:
+            gray: ndarray = self.ConvertColor(frame, self.ColorConversionEnum.rgb2gray_) if frame.ndim == 3 else frame
+            thumbnail_height: int = max(round(gray.shape[0] * thumbnail_width / gray.shape[1]), 1)
+            thumbnail: ndarray = resize(gray, (thumbnail_width, thumbnail_height), interpolation=INTER_AREA)
+
+            if last_thumbnail is not None:
+                elapsed: float = timestamp - last_timestamp
+                if not (0 < max_interval <= elapsed):
+                    if elapsed < min_interval or absdiff(thumbnail, last_thumbnail).mean() < threshold:
+                        continue
+
+            last_thumbnail = thumbnail
+            last_timestamp = timestamp
+            yield index, timestamp, frame
+
+    def GetVideoInfo(self, path: str) -> 'ImageAgent.VideoInfo':
+        """
+        Read the container properties of a video file without decoding any frame.
+
+        Args:
+            path (str): Path to the video file.
+
+        Returns:
+            VideoInfo: Video properties.
 
-    def FindPlantMask(self, image: ndarray, lower_color: list[int] = [35, 40, 40], upper_color: list[int] = [85, 255, 255]) -> ndarray:
+        :example:
+        >>> image_agent: ImageAgent = ImageAgent()
+        >>> info: ImageAgent.VideoInfo = image_agent.GetVideoInfo("path/to/video.mp4")
+        >>> print(info.fps_, info.frame_count_)
+        """
+        assert exists(path), "File not found"
+        assert path.endswith((".mp4", ".mov")), "Invalid file format"
+
+        video = VideoCapture(path)
+        if not video.isOpened():
+            raise IOError(f"Failed to open video {path}")
+        try:
+            return ImageAgent.VideoInfo(
+                video.get(CAP_PROP_FPS),
+                int(video.get(CAP_PROP_FRAME_COUNT)),
+                Size(int(video.get(CAP_PROP_FRAME_WIDTH)), int(video.get(CAP_PROP_FRAME_HEIGHT))),
+            )
+        finally:
+            video.release()
+
+    def ImageHash(self, image: ndarray, hash_size: int = 8) -> int:
+        """
+        Difference hash (dHash) of the image for near duplicate detection.
+        The image is shrunk to a (hash_size + 1) x hash_size grayscale thumbnail and every bit
+        tells whether a pixel is brighter than its right neighbour.
+
+        Args:
+            image (ndarray): Image data.
+            hash_size (int): Hash size, the hash has hash_size * hash_size bits.
+
+        Returns:
+            int: Image hash.
+
+        :example:
+        >>> image_agent: ImageAgent = ImageAgent()
+        >>> image: ndarray = image_agent.LoadImage("path/to/image.jpg", ImageAgent.ColorModeEnum.rgb_)
+        >>> image_hash: int = image_agent.ImageHash(image)
+        """
+        assert hash_size > 0, "Invalid hash size"
+        gray: ndarray = self.ConvertColor(image, self.ColorConversionEnum.rgb2gray_) if image.ndim == 3 else image
+        thumbnail: ndarray = resize(gray, (hash_size + 1, hash_size), interpolation=INTER_AREA)
+        bits: ndarray = thumbnail[:, 1:] > thumbnail[:, :-1]
+        return int.from_bytes(packbits(bits).tobytes(), "big")
+
+    def HashDistance(self, hash1: int, hash2: int) -> int:
+        """
+        Hamming distance between two image hashes.
+
+        Args:
+            hash1 (int): First image hash.
+            hash2 (int): Second image hash.
+
+        Returns:
+            int: Number of different bits.
+
+        :example:
+        >>> image_agent: ImageAgent = ImageAgent()
+        >>> distance: int = image_agent.HashDistance(image_agent.ImageHash(image1), image_agent.ImageHash(image2))
+        """
+        return (hash1 ^ hash2).bit_count()
+
+    def FindPlantMask(self, image: ndarray, lower_color: list[int] = [35, 40, 40], upper_color: list[int] = [85, 255, 255], use_table: bool = False) -> ndarray:
         """
         Find plant mask in the image using color range.
+        The bounds arrays of every color range are built once and reused for the following images.
+        With use_table every pixel is looked up in PlantMaskTable instead of converting the image to HSV, the mask is
+        bit-identical. The lookup is a NumPy gather, about 3x slower than the OpenCV conversion on full HD frames, so it is off by default.
 
         Args:
             image (ndarray): Image data.
             lower_color (list[int]): Lower color range.
             upper_color (list[int]): Upper color range.
+            use_table (bool): Look the mask up in the bit-packed table of the color range.
 
         Returns:
             ndarray: Plant mask.
@@ -221,12 +1134,49 @@ class ImageAgent:
         >>> image: ndarray = image_agent.LoadImage("path/to/image.jpg", ImageAgent.ColorModeEnum.rgb_)
         >>> mask: ndarray = image_agent.FindPlantMask(image)
         """
+        key: tuple[int, ...] = (*lower_color, *upper_color)
+        if use_table:
+            table: ndarray = self.PlantMaskTable(lower_color, upper_color)
+            # Color c0 | c1 << 8 | c2 << 16 of every pixel, read as one little endian word of the padded pixel
+            index: ndarray = cvtColor(image, COLOR_RGB2RGBA).view(uint32)[..., 0] & 0xFFFFFF
+            return ((table.take(index >> 3) >> (index & 7).astype(uint8)) & 1) * uint8(255)
+
+        if key not in self.mask_bounds_:
+            self.mask_bounds_[key] = (array(lower_color), array(upper_color))
+        np_lower_color, np_upper_color = self.mask_bounds_[key]
         hsv = cvtColor(image, self.ColorConversionEnum.rgb2hsv_.value)
-        np_lower_color = array(lower_color)
-        np_upper_color = array(upper_color)
         mask = inRange(hsv, np_lower_color, np_upper_color)
         return mask
 
+    def PlantMaskTable(self, lower_color: list[int], upper_color: list[int]) -> ndarray:
+        """
+        Bit-packed lookup table of a plant color range, one bit for each of the 256^3 colors (2 MB).
+        The table is built once per color range by running the conversion and range check of FindPlantMask on every color,
+        a million colors at a time.
+
+        Args:
+            lower_color (list[int]): Lower color range.
+            upper_color (list[int]): Upper color range.
+
+        Returns:
+            ndarray: Packed bits, bit i % 8 of byte i // 8 is set when color i = c0 | c1 << 8 | c2 << 16 is in range.
+
+        :example:
+        >>> image_agent: ImageAgent = ImageAgent()
+        >>> table: ndarray = image_agent.PlantMaskTable([35, 40, 40], [85, 255, 255])
+        """
+        key: tuple[int, ...] = (*lower_color, *upper_color)
+        if key not in self.mask_tables_:
+            table: ndarray = empty(1 << 21, dtype=uint8)
+            chunk: int = 1 << 20
+            for start in range(0, 1 << 24, chunk):
+                colors: ndarray = arange(start, start + chunk, dtype=uint32)
+                block: ndarray = stack([colors & 255, (colors >> 8) & 255, colors >> 16], axis=-1).astype(uint8).reshape(1024, 1024, 3)
+                hsv = cvtColor(block, self.ColorConversionEnum.rgb2hsv_.value)
+                table[start >> 3:(start + chunk) >> 3] = packbits(inRange(hsv, array(lower_color), array(upper_color)).reshape(-1) > 0, bitorder="little")
+            self.mask_tables_[key] = table
+        return self.mask_tables_[key]
+
     def FindPlantContour(self, mask: ndarray) -> list[Rect[int]] | None:
         """
         Find plant contour in the mask.
@@ -249,7 +1199,341 @@ class ImageAgent:
             plant_contours: list[Rect[int]] = []
             for contour in largest_contours:
                 x, y, w, h = boundingRect(contour)
-                plant_contours.append(Rect(x, y, w, h))
+                plant_contours.append(Rect(w, h, x, y))
             return plant_contours
         else:
-            return None
\ No newline at end of file
+            return None
+
+    def FindPlantComponents(self, mask: ndarray, k: int = 5, min_area: int = 0, open_size: int = 0) -> ndarray:
+        """
+        Find the bounding boxes of the largest connected components in the mask.
+        Only the k largest components are selected by partial selection instead of sorting all of them,
+        so noisy masks with many specks stay fast. Components are ranked by pixel count instead of contour area.
+
+        Args:
+            mask (ndarray): Plant mask.
+            k (int): Number of components to return.
+            min_area (int): Ignore components with fewer pixels.
+            open_size (int): Size of the square kernel of a morphological open removing specks first, 0 skips it.
+
+        Returns:
+            ndarray: (N, 4) int32 array of x, y, width, height rows, largest component first, N <= k.
+
+        :example:
+        >>> image_agent: ImageAgent = ImageAgent()
+        >>> mask: ndarray = image_agent.FindPlantMask(image)
+        >>> boxes: ndarray = image_agent.FindPlantComponents(mask, k=5, min_area=100, open_size=3)
+        >>> plant_rects: list[Rect[int]] = image_agent.BoxesToRects(boxes)
+        """
+        assert k > 0, "Invalid number of components"
+        if open_size > 0:
+            mask = morphologyEx(mask, MORPH_OPEN, getStructuringElement(MORPH_RECT, (open_size, open_size)))
+
+        # Grana's block based labeling measured about twice as fast as the default on full HD masks
+        _, _, stats, _ = connectedComponentsWithStatsWithAlgorithm(mask, 8, CV_32S, CCL_GRANA)
+        stats = stats[1:] # label 0 is the background
+        candidates: ndarray = flatnonzero(stats[:, CC_STAT_AREA] >= max(min_area, 1))
+        if len(candidates) > k:
+            candidates = candidates[argpartition(-stats[candidates, CC_STAT_AREA], k - 1)[:k]]
+        candidates = candidates[argsort(-stats[candidates, CC_STAT_AREA], kind="stable")]
+        return stats[candidates, :4].astype(int32)
+
+    def BoxesToRects(self, boxes: ndarray) -> list[Rect[int]]:
+        """
+        Convert an array of bounding boxes to Rects.
+
+        Args:
+            boxes (ndarray): (N, 4) array of x, y, width, height rows.
+
+        Returns:
+            list[Rect[int]]: Bounding boxes as Rects.
+
+        :example:
+        >>> image_agent: ImageAgent = ImageAgent()
+        >>> plant_rects: list[Rect[int]] = image_agent.BoxesToRects(image_agent.FindPlantComponents(mask))
+        """
+        return RectArray(boxes).ToRects()
+
+    def FillPolygons(self, mask: ndarray, points: ndarray, offsets: ndarray, boxes: ndarray, color: int = 255, offset: tuple[int, int] = (0, 0)) -> ndarray:
+        """
+        Fill the union of many polygons into a mask with as few fillPoly calls as possible.
+        A single fillPoly call over overlapping polygons cancels the overlap like a hole, so the polygons are grouped into
+        layers whose bounding boxes do not overlap and every layer is filled with one call. Plants rarely overlap,
+        so most label files are filled with one call and the result matches filling the polygons one by one.
+
+        Args:
+            mask (ndarray): Single channel mask to fill in place.
+            points (ndarray): (M, 2) int32 pixel points of all the polygons.
+            offsets (ndarray): (N + 1,) first point of every polygon in points.
+            boxes (ndarray): (N, 4) x, y, width, height bounding box of every polygon.
+            color (int): Fill value.
+            offset (tuple[int, int]): x, y added to every point, to fill a window of a larger image.
+
+        Returns:
+            ndarray: The filled mask.
+
+        :example:
+        >>> image_agent: ImageAgent = ImageAgent()
+        >>> class_ids, offsets, points, boxes = label_index.PixelPolygons("image1", 1920, 1080)
+        >>> mask: ndarray = image_agent.FillPolygons(zeros((1080, 1920), dtype=uint8), points, offsets, boxes)
+        """
+        if len(boxes) == 0:
+            return mask
+
+        # Pairwise overlap of the inclusive boxes
+        x1, y1 = boxes[:, 0], boxes[:, 1]
+        x2, y2 = x1 + boxes[:, 2], y1 + boxes[:, 3]
+        overlaps: ndarray = (x1[:, None] < x2[None, :]) & (x1[None, :] < x2[:, None]) & (y1[:, None] < y2[None, :]) & (y1[None, :] < y2[:, None])
+
+        # Greedy layering, every polygon goes to the first layer without an overlapping polygon
+        layers: ndarray = zeros(len(boxes), dtype=int32)
+        for polygon in range(1, len(boxes)):
+            taken: set[int] = set(layers[:polygon][overlaps[polygon, :polygon]].tolist())
+            layers[polygon] = next(layer for layer in count() if layer not in taken)
+
+        polygons: list[ndarray] = [points[offsets[polygon]:offsets[polygon + 1]] for polygon in range(len(boxes))]
+        for layer in range(int(layers.max()) + 1):
+            fillPoly(mask, [polygons[polygon] for polygon in flatnonzero(layers == layer)], color, offset=offset)
+        return mask
+
+    def FindPlantMaskTiled(self, image: ndarray, lower_color: list[int] = [35, 40, 40], upper_color: list[int] = [85, 255, 255], tile_size: int = 2048, workers: int = 0) -> ndarray:
+        """
+        Find plant mask in the image tile by tile, identical to FindPlantMask.
+        Only one HSV tile per worker is allocated instead of an HSV copy of the whole image.
+
+        Args:
+            image (ndarray): Image data.
+            lower_color (list[int]): Lower color range.
+            upper_color (list[int]): Upper color range.
+            tile_size (int): Width and height of the tiles.
+            workers (int): Threads processing tiles in parallel, 0 or 1 processes them in the calling thread.
+
+        Returns:
+            ndarray: Plant mask.
+
+        :example:
+        >>> image_agent: ImageAgent = ImageAgent()
+        >>> mask: ndarray = image_agent.FindPlantMaskTiled(image, tile_size=4096, workers=4)
+        """
+        assert tile_size > 0, "Invalid tile size"
+        mask: ndarray = empty(image.shape[:2], dtype=uint8)
+
+        def MaskTile(window: tuple[int, int]) -> None:
+            y, x = window
+            mask[y:y + tile_size, x:x + tile_size] = self.FindPlantMask(image[y:y + tile_size, x:x + tile_size], lower_color, upper_color)
+
+        windows: list[tuple[int, int]] = [(y, x) for y in range(0, image.shape[0], tile_size) for x in range(0, image.shape[1], tile_size)]
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(MaskTile, windows))
+        else:
+            for window in windows:
+                MaskTile(window)
+        return mask
+
+    def FindPlantComponentsTiled(self, image: ndarray, k: int = 5, min_area: int = 0, lower_color: list[int] = [35, 40, 40], upper_color: list[int] = [85, 255, 255], tile_size: int = 2048, workers: int = 0, open_size: int = 0) -> ndarray:
+        """
+        Find the bounding boxes of the largest plant components in the image tile by tile, for images too large for a full mask.
+        Every tile is masked and labeled on its own, then components touching across tile borders are merged with
+        8-connectivity, including diagonal tile corners. The result is the same as FindPlantComponents on the full mask
+        with the same open_size, while memory beyond the image is set by the tile size: the HSV, mask and label planes of one tile per worker.
+        With open_size > 0 every tile is masked and opened with a halo of open_size pixels of its neighbours, the reach of
+        the erosion followed by the dilation with the off-center anchor of even kernels, so the opening does not change at the tile borders.
+
+        Args:
+            image (ndarray): Image data.
+            k (int): Number of components to return.
+            min_area (int): Ignore components with fewer pixels.
+            lower_color (list[int]): Lower color range.
+            upper_color (list[int]): Upper color range.
+            tile_size (int): Width and height of the tiles.
+            workers (int): Threads processing tiles in parallel, 0 or 1 processes them in the calling thread.
+            open_size (int): Size of the square kernel of a morphological open removing specks first, 0 skips it.
+
+        Returns:
+            ndarray: (N, 4) int32 array of x, y, width, height rows, largest component first, N <= k.
+
+        :example:
+        >>> image_agent: ImageAgent = ImageAgent()
+        >>> boxes: ndarray = image_agent.FindPlantComponentsTiled(orthomosaic, k=100, min_area=500, tile_size=4096, workers=8, open_size=3)
+        """
+        assert k > 0, "Invalid number of components"
+        assert tile_size > 0, "Invalid tile size"
+        rows: int = -(-image.shape[0] // tile_size)
+        cols: int = -(-image.shape[1] // tile_size)
+        windows: list[tuple[int, int]] = [(row * tile_size, col * tile_size) for row in range(rows) for col in range(cols)]
+        halo: int = max(open_size, 0)
+
+        def LabelTile(window: tuple[int, int]) -> tuple[ndarray, tuple[ndarray, ndarray, ndarray, ndarray]]:
+            y, x = window
+            top, left = max(y - halo, 0), max(x - halo, 0)
+            bottom, right = min(y + tile_size + halo, image.shape[0]), min(x + tile_size + halo, image.shape[1])
+            inner: tuple[int, int, int, int] = (y - top, x - left, min(tile_size, image.shape[0] - y), min(tile_size, image.shape[1] - x))
+            return self.TileComponents(image[top:bottom, left:right], lower_color, upper_color, open_size, inner)
+
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                tiles: list[tuple[ndarray, tuple[ndarray, ndarray, ndarray, ndarray]]] = list(executor.map(LabelTile, windows))
+        else:
+            tiles = [LabelTile(window) for window in windows]
+
+        # Global component ids, 0 is the background and the components of tile i start at bases[i]
+        bases: list[int] = []
+        total: int = 1
+        for stats, _ in tiles:
+            bases.append(total)
+            total += len(stats)
+
+        boxes: ndarray = zeros((total, 4), dtype=int64) # x0, y0, x1, y1
+        areas: ndarray = zeros(total, dtype=int64)
+        for (y, x), (stats, _), base in zip(windows, tiles, bases):
+            end: int = base + len(stats)
+            boxes[base:end, 0] = stats[:, 0] + x
+            boxes[base:end, 1] = stats[:, 1] + y
+            boxes[base:end, 2] = stats[:, 0] + stats[:, 2] + x
+            boxes[base:end, 3] = stats[:, 1] + stats[:, 3] + y
+            areas[base:end] = stats[:, CC_STAT_AREA]
+
+        def Border(index: int, side: int) -> ndarray:
+            # Labels on a side of a tile (top, bottom, left, right) as global ids
+            labels: ndarray = tiles[index][1][side].astype(int64)
+            return where(labels > 0, labels + bases[index] - 1, 0)
+
+        def Touching(first: ndarray, second: ndarray) -> list[ndarray]:
+            # Pairs of foreground pixels facing each other across a border, straight or diagonal
+            pairs: list[ndarray] = []
+            for a, b in ((first, second), (first[1:], second[:-1]), (first[:-1], second[1:])):
+                both: ndarray = (a > 0) & (b > 0)
+                pairs.append(stack([a[both], b[both]], axis=1))
+            return pairs
+
+        pairs: list[ndarray] = [empty((0, 2), dtype=int64)]
+        for row in range(rows):
+            for col in range(cols):
+                index: int = row * cols + col
+                if col + 1 < cols:
+                    pairs += Touching(Border(index, 3), Border(index + 1, 2))
+                if row + 1 < rows:
+                    pairs += Touching(Border(index, 1), Border(index + cols, 0))
+                    if col + 1 < cols:
+                        pairs += Touching(Border(index, 1)[-1:], Border(index + cols + 1, 0)[:1])
+                    if col > 0:
+                        pairs += Touching(Border(index, 1)[:1], Border(index + cols - 1, 0)[-1:])
+
+        # Union-find over the components touching across borders
+        parent: ndarray = arange(total, dtype=int64)
+
+        def Find(node: int) -> int:
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+
+        for a, b in unique_rows(concatenate(pairs), axis=0).tolist():
+            root_a, root_b = Find(a), Find(b)
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+        while True:
+            grandparent: ndarray = parent[parent]
+            if (grandparent == parent).all():
+                break
+            parent = grandparent
+
+        merged_areas: ndarray = zeros(total, dtype=int64)
+        merged_boxes: ndarray = empty((total, 4), dtype=int64)
+        merged_boxes[:, :2] = iinfo(int64).max
+        merged_boxes[:, 2:] = iinfo(int64).min
+        add.at(merged_areas, parent, areas)
+        minimum.at(merged_boxes[:, 0], parent, boxes[:, 0])
+        minimum.at(merged_boxes[:, 1], parent, boxes[:, 1])
+        maximum.at(merged_boxes[:, 2], parent, boxes[:, 2])
+        maximum.at(merged_boxes[:, 3], parent, boxes[:, 3])
+        merged_areas[0] = 0
+
+        candidates: ndarray = flatnonzero(merged_areas >= max(min_area, 1))
+        if len(candidates) > k:
+            candidates = candidates[argpartition(-merged_areas[candidates], k - 1)[:k]]
+        candidates = candidates[argsort(-merged_areas[candidates], kind="stable")]
+        selected: ndarray = merged_boxes[candidates]
+        return stack([selected[:, 0], selected[:, 1], selected[:, 2] - selected[:, 0], selected[:, 3] - selected[:, 1]], axis=1).astype(int32)
+
+    def TileComponents(self, tile: ndarray, lower_color: list[int], upper_color: list[int], open_size: int = 0, inner: tuple[int, int, int, int] | None = None) -> tuple[ndarray, tuple[ndarray, ndarray, ndarray, ndarray]]:
+        """
+        Connected components of the plant mask of a tile and the labels on its borders.
+        The tile may include a halo around the labeled region inner, the mask is opened on the whole tile and cropped to inner.
+
+        Args:
+            tile (ndarray): Tile of the image, with its halo.
+            lower_color (list[int]): Lower color range.
+            upper_color (list[int]): Upper color range.
+            open_size (int): Size of the square kernel of a morphological open removing specks first, 0 skips it.
+            inner (tuple[int, int, int, int] | None): y, x, height and width of the labeled region in the tile, None labels the whole tile.
+
+        Returns:
+            tuple[ndarray, tuple[ndarray, ndarray, ndarray, ndarray]]: Stats of the components without the background,
+                component i has label i + 1, and the labels of the top row, bottom row, left column and right column.
+
+        :example:
+        >>> image_agent: ImageAgent = ImageAgent()
+        >>> stats, (top, bottom, left, right) = image_agent.TileComponents(image[:2048, :2048], [35, 40, 40], [85, 255, 255])
+        """
+        mask: ndarray = self.FindPlantMask(tile, lower_color, upper_color)
+        if open_size > 0:
+            mask = morphologyEx(mask, MORPH_OPEN, getStructuringElement(MORPH_RECT, (open_size, open_size)))
+        if inner is not None:
+            y, x, height, width = inner
+            mask = mask[y:y + height, x:x + width]
+        _, labels, stats, _ = connectedComponentsWithStatsWithAlgorithm(mask, 8, CV_32S, CCL_GRANA)
+        return stats[1:], (labels[0].copy(), labels[-1].copy(), labels[:, 0].copy(), labels[:, -1].copy())
+
+    def FindPlantRects(self, path: str, color_mode: ColorModeEnum = ColorModeEnum.rgb_quarter_, lower_color: list[int] = [35, 40, 40], upper_color: list[int] = [85, 255, 255]) -> list[Rect[int]] | None:
+        """
+        Find plant bounding boxes on a reduced decode of an image file, in full resolution coordinates.
+        The boxes cover the same pixels as on the reduced image, so they are up to DecodeScale - 1 pixels
+        larger than boxes found at full resolution and may reach past the image border by as much.
+
+        Args:
+            path (str): Path to the image file.
+            color_mode (ColorModeEnum): Color mode to decode with, one of the reduced RGB modes or rgb_.
+            lower_color (list[int]): Lower color range.
+            upper_color (list[int]): Upper color range.
+
+        Returns:
+            list[Rect[int]] | None: Bounding boxes of the largest plant contours or None if no contours are found.
+
+        :example:
+        >>> image_agent: ImageAgent = ImageAgent()
+        >>> plant_rects: list[Rect[int]] | None = image_agent.FindPlantRects("path/to/image.jpg", ImageAgent.ColorModeEnum.rgb_eighth_)
+        """
+        image: ndarray = self.LoadImage(path, color_mode)
+        assert image is not None and image.ndim == 3, f"Failed to decode {path} in color"
+        plant_rects: list[Rect[int]] | None = self.FindPlantContour(self.FindPlantMask(image, lower_color, upper_color))
+        if plant_rects is None:
+            return None
+
+        scale: int = self.DecodeScale(color_mode)
+        return [rect.Mul(scale) for rect in plant_rects]
+
+    def DecodeScale(self, color_mode: ColorModeEnum) -> int:
+        """
+        Scale factor of a color mode, the full size of an image is its decoded size times this.
+
+        Args:
+            color_mode (ColorModeEnum): Color mode of the image.
+
+        Returns:
+            int: 1, 2, 4 or 8.
+
+        :example:
+        >>> image_agent: ImageAgent = ImageAgent()
+        >>> scale: int = image_agent.DecodeScale(ImageAgent.ColorModeEnum.rgb_quarter_) # 4
+        """
+        scales: dict[ImageAgent.ColorModeEnum, int] = {
+            ImageAgent.ColorModeEnum.rgb_half_: 2,
+            ImageAgent.ColorModeEnum.rgb_quarter_: 4,
+            ImageAgent.ColorModeEnum.rgb_eighth_: 8,
+            ImageAgent.ColorModeEnum.grayscale_half_: 2,
+            ImageAgent.ColorModeEnum.grayscale_quarter_: 4,
+            ImageAgent.ColorModeEnum.grayscale_eighth_: 8,
+        }
+        return scales.get(color_mode, 1)
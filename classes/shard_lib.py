@@ -0,0 +1,266 @@
+# python version : 3.12.6
+
+from io import BytesIO
+from re import compile, escape, Pattern
+from json import dump, load
+from os import listdir, makedirs, replace, remove
+from os.path import exists, join
+from tarfile import TarFile, TarInfo, BLOCKSIZE
+from threading import Lock
+from typing import BinaryIO
+
+class ShardWriter:
+    """
+    Writer packing many small files into tar shards.
+    Every shard has a sidecar index with the offset and size of every file, so a file is read back with a single seek.
+    Files are appended sequentially with large buffered writes, a new shard is started once max_bytes is reached.
+
+    Shard Structure:
+    - folder
+        - prefix-00000.tar
+        - prefix-00000.idx.json
+        - prefix-00001.tar
+        - prefix-00001.idx.json
+        - ...
+
+    Attributes:
+        folder_ (str): Folder of the shards.
+        prefix_ (str): File name prefix of the shards.
+        max_bytes_ (int): Size of a shard before a new one is started.
+        shard_count_ (int): Number of shards started.
+        written_ (int): Number of files written.
+
+    Methods:
+        Write: Append a file to the current shard.
+        Close: Close the current shard and write its index.
+        Open: Start a new shard.
+        CloseShard: Close the current shard and write its index without locking.
+        RemoveShards: Remove the shards of a folder.
+
+    :example:
+    >>> with ShardWriter("bin/week1/video1", "0000000") as writer:
+    >>>     writer.Write("0000000.png", data)
+    """
+
+    def __init__(self, folder: str, prefix: str, max_bytes: int = 1 << 30) -> None:
+        """
+        Constructor for ShardWriter class
+
+        Args:
+            folder (str): Folder of the shards.
+            prefix (str): File name prefix of the shards, writers of the same folder need different prefixes.
+            max_bytes (int): Size of a shard before a new one is started.
+
+        :example:
+        >>> writer: ShardWriter = ShardWriter("bin/week1/video1", "0000000", 1 << 28)
+        """
+        assert max_bytes > 0, "Invalid shard size"
+        self.folder_: str = folder
+        self.prefix_: str = prefix
+        self.max_bytes_: int = max_bytes
+        self.shard_count_: int = 0
+        self.written_: int = 0
+        self.file_: BinaryIO | None = None
+        self.tar_: TarFile | None = None
+        self.index_: dict[str, list[int]] = {}
+        self.lock_: Lock = Lock()
+
+    def __enter__(self) -> 'ShardWriter':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.Close()
+
+    def Write(self, key: str, data: bytes) -> None:
+        """
+        Append a file to the current shard. Safe to call from several threads.
+
+        Args:
+            key (str): Name of the file in the shard.
+            data (bytes): File content.
+
+        :example:
+        >>> writer.Write("0000000.png", image_agent.EncodeImage(image, ".png").tobytes())
+        """
+        with self.lock_:
+            if self.tar_ is None:
+                self.Open()
+
+            info: TarInfo = TarInfo(key)
+            info.size = len(data)
+            self.tar_.addfile(info, BytesIO(data))
+
+            # The data ends on the current offset, padded to the tar block size
+            padded_size: int = -(-info.size // BLOCKSIZE) * BLOCKSIZE
+            self.index_[key] = [self.tar_.offset - padded_size, info.size]
+            self.written_ += 1
+
+            if self.tar_.offset >= self.max_bytes_:
+                self.CloseShard()
+
+    def Close(self) -> None:
+        """
+        Close the current shard and write its index.
+
+        :example:
+        >>> writer.Close()
+        """
+        with self.lock_:
+            self.CloseShard()
+
+    def Open(self) -> None:
+        """
+        Start a new shard, the index of a previous shard with the same name is removed first.
+        The first shard removes every shard of the prefix left by a previous run, so a smaller rerun does not leave
+        old shards with higher numbers that ShardReader would still serve.
+        """
+        makedirs(self.folder_, exist_ok=True)
+        if self.shard_count_ == 0:
+            ShardWriter.RemoveShards(self.folder_, self.prefix_)
+
+        index_path: str = join(self.folder_, f"{self.prefix_}-{self.shard_count_:05d}.idx.json")
+        if exists(index_path):
+            remove(index_path)
+        self.file_ = open(join(self.folder_, f"{self.prefix_}-{self.shard_count_:05d}.tar"), "wb", buffering=1 << 20)
+        self.tar_ = TarFile(fileobj=self.file_, mode="w")
+        self.index_ = {}
+        self.shard_count_ += 1
+
+    def CloseShard(self) -> None:
+        """
+        Close the current shard and write its index, the index is written last so a shard without index is incomplete.
+        """
+        if self.tar_ is None:
+            return
+
+        self.tar_.close()
+        self.file_.close()
+
+        index_path: str = join(self.folder_, f"{self.prefix_}-{self.shard_count_ - 1:05d}.idx.json")
+        with open(f"{index_path}.tmp", "w") as file:
+            dump(self.index_, file)
+        replace(f"{index_path}.tmp", index_path)
+
+        self.tar_ = None
+        self.file_ = None
+        self.index_ = {}
+
+    @staticmethod
+    def RemoveShards(folder: str, prefix: str | None = None) -> None:
+        """
+        Remove the shards and indexes of a folder, complete or not.
+
+        Args:
+            folder (str): Folder of the shards.
+            prefix (str | None): Only remove the shards of this prefix, None removes the shards of every prefix.
+
+        :example:
+        >>> ShardWriter.RemoveShards("bin/week1/video1")
+        """
+        if not exists(folder):
+            return
+        shard_name: Pattern = compile((r".+" if prefix is None else escape(prefix)) + r"-\d{5}\.(tar|idx\.json|idx\.json\.tmp)")
+        for name in listdir(folder):
+            if shard_name.fullmatch(name):
+                remove(join(folder, name))
+
+class ShardReader:
+    """
+    Reader for the shards of a folder written by ShardWriter, with random access by key.
+    Shards without an index are incomplete and ignored.
+
+    Attributes:
+        folder_ (str): Folder of the shards.
+        index_ (dict[str, tuple[str, int, int]]): Shard path, offset and size of every key.
+
+    Methods:
+        Keys: List the keys of the folder.
+        Read: Read the content of a key.
+        Close: Close the open shard files.
+
+    :example:
+    >>> with ShardReader("bin/week1/video1") as reader:
+    >>>     data: bytes = reader.Read("0000000.png")
+    """
+
+    def __init__(self, folder: str) -> None:
+        """
+        Constructor for ShardReader class, loads the index of every shard in the folder.
+
+        Args:
+            folder (str): Folder of the shards.
+
+        :example:
+        >>> reader: ShardReader = ShardReader("bin/week1/video1")
+        """
+        self.folder_: str = folder
+        self.index_: dict[str, tuple[str, int, int]] = {}
+        self.files_: dict[str, BinaryIO] = {}
+        self.lock_: Lock = Lock()
+
+        for name in sorted(listdir(folder)) if exists(folder) else []:
+            if not name.endswith(".idx.json"):
+                continue
+            shard_path: str = join(folder, name[:-len(".idx.json")] + ".tar")
+            with open(join(folder, name), "r") as file:
+                for key, (offset, size) in load(file).items():
+                    self.index_[key] = (shard_path, offset, size)
+
+    def __enter__(self) -> 'ShardReader':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.Close()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.index_
+
+    def __len__(self) -> int:
+        return len(self.index_)
+
+    def Keys(self) -> list[str]:
+        """
+        List the keys of the folder.
+
+        Returns:
+            list[str]: Sorted keys.
+
+        :example:
+        >>> keys: list[str] = reader.Keys() # ["0000000.png", "0000001.png", ...]
+        """
+        return sorted(self.index_)
+
+    def Read(self, key: str) -> bytes:
+        """
+        Read the content of a key with a single seek. Safe to call from several threads.
+
+        Args:
+            key (str): Name of the file in the shard.
+
+        Returns:
+            bytes: File content.
+
+        :example:
+        >>> data: bytes = reader.Read("0000000.png")
+        """
+        assert key in self.index_, f"Key {key} not found"
+        shard_path, offset, size = self.index_[key]
+
+        with self.lock_:
+            if shard_path not in self.files_:
+                self.files_[shard_path] = open(shard_path, "rb")
+            file: BinaryIO = self.files_[shard_path]
+            file.seek(offset)
+            return file.read(size)
+
+    def Close(self) -> None:
+        """
+        Close the open shard files.
+
+        :example:
+        >>> reader.Close()
+        """
+        with self.lock_:
+            for file in self.files_.values():
+                file.close()
+            self.files_ = {}
@@ -1,6 +1,8 @@
 # python version : 3.12.6 
 
+from os import environ
 from typing import TypeVar, Generic, Callable
+from numpy import ndarray, empty, stack, clip, maximum, int32
 # Deprecated Decorator
 def Deprecated(message: str) -> Callable:
     """
@@ -57,11 +59,28 @@ __ge__ : Checks if one object is greater than or equal to another
 
 T = TypeVar('T', int, float)
 
+# The operand class of Size, Point and Rect operators is always asserted, the validation of the member types is off by default
+# since every operation would pay for it. Enable it while debugging with SetValidation(True) or the UTIL_VALIDATION=1 environment variable
+validation_enabled: bool = environ.get("UTIL_VALIDATION", "0") == "1"
+
+def SetValidation(enabled: bool) -> None:
+    """
+    Turn the type validation of Size, Point and Rect operations on or off
+
+    :example:
+    >>> SetValidation(True)
+    >>> Size(1, 2) + Size(1.0, 2.0) # AssertionError: width_ must be of type <class 'int'>
+    """
+    global validation_enabled
+    validation_enabled = enabled
+
 class Size(Generic[T]):
     """
     Size class for 2D dimensions
     """
 
+    __slots__ = ("width_", "height_")
+
     def __init__(self, width: T, height: T) -> None:
         """
         Constructor for Size class
@@ -80,7 +99,8 @@ class Size(Generic[T]):
         >>> square: Size[int] = Size[int](10, 10)
         >>> print(square) # Size(width=10, height=10)
         """
-        self.ClassValidator()
+        if validation_enabled:
+            self.ClassValidator()
         return f"Size(width={self.width_}, height={self.height_})"
 
     def Add(self, value: T) -> 'Size':
@@ -91,7 +111,8 @@ class Size(Generic[T]):
         >>> square: Size[int] = Size[int](10, 10)
         >>> print(square.Add(5)) # Size(width=15, height=15)
         """
-        self.ClassValidator()
+        if validation_enabled:
+            self.ClassValidator()
         return Size(self.width_ + value, self.height_ + value)
 
     def Sub(self, value: T) -> 'Size':
@@ -102,7 +123,8 @@ class Size(Generic[T]):
         >>> square: Size[int] = Size[int](10, 10)
         >>> print(square.Sub(5)) # Size(width=5, height=5)
         """
-        self.ClassValidator()
+        if validation_enabled:
+            self.ClassValidator()
         return Size(self.width_ - value, self.height_ - value)
 
     def Mul(self, value: T) -> 'Size':
@@ -113,7 +135,8 @@ class Size(Generic[T]):
         >>> square: Size[int] = Size[int](10, 10)
         >>> print(square.Mul(5)) # Size(width=50, height=50)
         """
-        self.ClassValidator()
+        if validation_enabled:
+            self.ClassValidator()
         return Size(self.width_ * value, self.height_ * value)
     
     def TrueDiv(self, value: T) -> 'Size':
@@ -124,7 +147,8 @@ class Size(Generic[T]):
         >>> square: Size[int] = Size[int](10, 10)
         >>> print(square.TrueDiv(5)) # Size(width=2.0, height=2.0)
         """
-        self.ClassValidator()
+        if validation_enabled:
+            self.ClassValidator()
         return Size(self.width_ / value, self.height_ / value)
 
     def FloorDiv(self, value: T) -> 'Size':
@@ -135,7 +159,8 @@ class Size(Generic[T]):
         >>> square: Size[int] = Size[int](10, 10)
         >>> print(square.FloorDiv(5)) # Size(width=2, height=2)
         """
-        self.ClassValidator()
+        if validation_enabled:
+            self.ClassValidator()
         return Size(self.width_ // value, self.height_ // value)
 
     def Mod(self, value: T) -> 'Size':
@@ -146,7 +171,8 @@ class Size(Generic[T]):
         >>> square: Size[int] = Size[int](10, 10)
         >>> print(square.Mod(5))
         """
-        self.ClassValidator()
+        if validation_enabled:
+            self.ClassValidator()
         return Size(self.width_ % value, self.height_ % value)
     
     def Pow(self, value: T) -> 'Size':
@@ -157,7 +183,8 @@ class Size(Generic[T]):
         >>> square: Size[int] = Size[int](10, 10)
         >>> print(square.Pow(2)) # Size(width=100, height=100)
         """
-        self.ClassValidator()
+        if validation_enabled:
+            self.ClassValidator()
         return Size(self.width_ ** value, self.height_ ** value)
 
     def __add__(self, other: 'Size') -> 'Size':
@@ -169,7 +196,9 @@ class Size(Generic[T]):
         >>> square2: Size[int] = Size[int](20, 20)
         >>> print(square1 + square2) # Size(width=30, height=30)
         """
-        self.OtherValidator(other)
+        assert isinstance(other, Size), "other must be of type Size"
+        if validation_enabled:
+            self.OtherValidator(other)
         return Size(self.width_ + other.width_, self.height_ + other.height_)
 
     def __sub__(self, other: 'Size') -> 'Size':
@@ -181,7 +210,9 @@ class Size(Generic[T]):
         >>> square2: Size[int] = Size[int](20, 20)
         >>> print(square1 - square2) # Size(width=-10, height=-10)
         """
-        self.OtherValidator(other)
+        assert isinstance(other, Size), "other must be of type Size"
+        if validation_enabled:
+            self.OtherValidator(other)
         return Size(self.width_ - other.width_, self.height_ - other.height_)
 
     def __mul__(self, other: 'Size') -> 'Size':
@@ -193,7 +224,9 @@ class Size(Generic[T]):
         >>> square2: Size[int] = Size[int](20, 20)
         >>> print(square1 * square2) # Size(width=200, height=200)
         """
-        self.OtherValidator(other)
+        assert isinstance(other, Size), "other must be of type Size"
+        if validation_enabled:
+            self.OtherValidator(other)
         return Size(self.width_ * other.width_, self.height_ * other.height_)
 
     def __truediv__(self, other: 'Size') -> 'Size':
@@ -205,7 +238,9 @@ class Size(Generic[T]):
         >>> square2: Size[int] = Size[int](20, 20)
         >>> print(square1 / square2) # Size(width=0.5, height=0.5)
         """
-        self.OtherValidator(other)
+        assert isinstance(other, Size), "other must be of type Size"
+        if validation_enabled:
+            self.OtherValidator(other)
         return Size(self.width_ / other.width_, self.height_ / other.height_)
 
     def __floordiv__(self, other: 'Size') -> 'Size':
@@ -217,7 +252,9 @@ class Size(Generic[T]):
         >>> square2: Size[int] = Size[int](20, 20)
         >>> print(square1 // square2)
         """
-        self.OtherValidator(other)
+        assert isinstance(other, Size), "other must be of type Size"
+        if validation_enabled:
+            self.OtherValidator(other)
         return Size(self.width_ // other.width_, self.height_ // other.height_)
 
     def __mod__(self, other: 'Size') -> 'Size':
@@ -229,7 +266,9 @@ class Size(Generic[T]):
         >>> square2: Size[int] = Size[int](20, 20)
         >>> print(square1 % square2)
         """
-        self.OtherValidator(other)
+        assert isinstance(other, Size), "other must be of type Size"
+        if validation_enabled:
+            self.OtherValidator(other)
         return Size(self.width_ % other.width_, self.height_ % other.height_)
 
     def __pow__(self, other: 'Size') -> 'Size':
@@ -241,7 +280,9 @@ class Size(Generic[T]):
         >>> square2: Size[int] = Size[int](2, 2)
         >>> print(square1 ** square2) # Size(width=100, height=100)
         """
-        self.OtherValidator(other)
+        assert isinstance(other, Size), "other must be of type Size"
+        if validation_enabled:
+            self.OtherValidator(other)
         return Size(self.width_ ** other.width_, self.height_ ** other.height_)
 
     def __eq__(self, other: object) -> bool:
@@ -254,7 +295,8 @@ class Size(Generic[T]):
         >>> rint(square1 == square2) # True
         """
         assert isinstance(other, Size), "other must be of type Size"
-        self.OtherValidator(other)
+        if validation_enabled:
+            self.OtherValidator(other)
         return self.width_ == other.width_ and self.height_ == other.height_
 
     def __ne__(self, other: object) -> bool:
@@ -267,7 +309,8 @@ class Size(Generic[T]):
         >>> print(square1 != square2) # True
         """
         assert isinstance(other, Size), "other must be of type Size"
-        self.OtherValidator(other)
+        if validation_enabled:
+            self.OtherValidator(other)
         return self.width_ != other.width_ or self.height_ != other.height_
 
     def __lt__(self, other: 'Size') -> bool:
@@ -279,7 +322,9 @@ class Size(Generic[T]):
         >>> square2: Size[int] = Size[int](20, 20)
         >>> print(square1 < square2) # True
         """
-        self.OtherValidator(other)
+        assert isinstance(other, Size), "other must be of type Size"
+        if validation_enabled:
+            self.OtherValidator(other)
         return self.width_ < other.width_ and self.height_ < other.height_
 
     def __le__(self, other: 'Size') -> bool:
@@ -291,7 +336,9 @@ class Size(Generic[T]):
         >>> square2: Size[int] = Size[int](20, 20)
         >>> print(square1 <= square2) # True
         """
-        self.OtherValidator(other)
+        assert isinstance(other, Size), "other must be of type Size"
+        if validation_enabled:
+            self.OtherValidator(other)
         return self.width_ <= other.width_ and self.height_ <= other.height_
 
     def __gt__(self, other: 'Size') -> bool:
@@ -303,7 +350,9 @@ class Size(Generic[T]):
         >>> square2: Size[int] = Size[int](20, 20)
         >>> print(square1 > square2) # False
         """
-        self.OtherValidator(other)
+        assert isinstance(other, Size), "other must be of type Size"
+        if validation_enabled:
+            self.OtherValidator(other)
         return self.width_ > other.width_ and self.height_ > other.height_
 
     def __ge__(self, other: 'Size') -> bool:
@@ -347,6 +396,8 @@ class Point(Generic[T]):
     Point class for 2D coordinates
     """
 
+    __slots__ = ("x_", "y_")
+
     def __init__(self, x: T, y: T) -> None:
         """
         Constructor for Point class
@@ -365,7 +416,8 @@ class Point(Generic[T]):
         >>> point: Point[int] = Point[int](10, 10)
         >>> print(point) # Point(x=10, y=10)
         """
-        self.ClassValidator()
+        if validation_enabled:
+            self.ClassValidator()
         return f"Point(x={self.x_}, y={self.y_})"
 
     def Add(self, value: T) -> 'Point':
@@ -376,7 +428,8 @@ class Point(Generic[T]):
         >>> point: Point[int] = Point[int](10, 10)
         >>> print(point.Add(5)) # Point(x=15, y=15)
         """
-        self.ClassValidator()
+        if validation_enabled:
+            self.ClassValidator()
         return Point(self.x_ + value, self.y_ + value)
 
     def Sub(self, value: T) -> 'Point':
@@ -387,7 +440,8 @@ class Point(Generic[T]):
         >>> point: Point[int] = Point[int](10, 10)
         >>> print(point.Sub(5)) # Point(x=5, y=5)
         """
-        self.ClassValidator()
+        if validation_enabled:
+            self.ClassValidator()
         return Point(self.x_ - value, self.y_ - value)
 
     def Mul(self, value: T) -> 'Point':
@@ -398,7 +452,8 @@ class Point(Generic[T]):
         >>> point: Point[int] = Point[int](10, 10)
         >>> print(point.Mul(5)) # Point(x=50, y=50)
         """
-        self.ClassValidator()
+        if validation_enabled:
+            self.ClassValidator()
         return Point(self.x_ * value, self.y_ * value)
     
     def TrueDiv(self, value: T) -> 'Point':
@@ -409,7 +464,8 @@ class Point(Generic[T]):
         >>> point: Point[int] = Point[int](10, 10)
         >>> print(point.TrueDiv(5)) # Point(x=2.0, y=2.0)
         """
-        self.ClassValidator()
+        if validation_enabled:
+            self.ClassValidator()
         return Point(self.x_ / value, self.y_ / value)
 
     def FloorDiv(self, value: T) -> 'Point':
@@ -420,7 +476,8 @@ class Point(Generic[T]):
         >>> point: Point[int] = Point[int](10, 10)
         >>> print(point.FloorDiv(5)) # Point(x=2, y=2)
         """
-        self.ClassValidator()
+        if validation_enabled:
+            self.ClassValidator()
         return Point(self.x_ // value, self.y_ // value)
 
     def Mod(self, value: T) -> 'Point':
@@ -431,7 +488,8 @@ class Point(Generic[T]):
         >>> point: Point[int] = Point[int](10, 10)
         >>> print(point.Mod(5)) # Point(x=0, y=0)
         """
-        self.ClassValidator()
+        if validation_enabled:
+            self.ClassValidator()
         return Point(self.x_ % value, self.y_ % value)
     
     def Pow(self, value: T) -> 'Point':
@@ -442,7 +500,8 @@ class Point(Generic[T]):
         >>> point: Point[int] = Point[int](10, 10)
         >>> print(point.Pow(2)) # Point(x=100, y=100)
         """
-        self.ClassValidator()
+        if validation_enabled:
+            self.ClassValidator()
         return Point(self.x_ ** value, self.y_ ** value)
 
     def __add__(self, other: 'Point') -> 'Point':
@@ -454,7 +513,9 @@ class Point(Generic[T]):
         >>> point2: Point[int] = Point[int](20, 20)
         >>> print(point1 + point2) # Point(x=30, y=30)
         """
-        self.OtherValidator(other)
+        assert isinstance(other, Point), "other must be of type Point"
+        if validation_enabled:
+            self.OtherValidator(other)
         return Point(self.x_ + other.x_, self.y_ + other.y_)
 
     def __sub__(self, other: 'Point') -> 'Point':
@@ -466,7 +527,9 @@ class Point(Generic[T]):
         >>> point2: Point[int] = Point[int](20, 20)
         >>> print(point1 - point2) # Point(x=-10, y=-10)
         """
-        self.OtherValidator(other)
+        assert isinstance(other, Point), "other must be of type Point"
+        if validation_enabled:
+            self.OtherValidator(other)
         return Point(self.x_ - other.x_, self.y_ - other.y_)
 
     def __mul__(self, other: 'Point') -> 'Point':
@@ -478,7 +541,9 @@ class Point(Generic[T]):
         >>> point2: Point[int] = Point[int](20, 20)
         >>> print(point1 * point2) # Point(x=200, y=200)
         """
-        self.OtherValidator(other)
+        assert isinstance(other, Point), "other must be of type Point"
+        if validation_enabled:
+            self.OtherValidator(other)
         return Point(self.x_ * other.x_, self.y_ * other.y_)
 
     def __truediv__(self, other: 'Point') -> 'Point':
@@ -490,7 +555,9 @@ class Point(Generic[T]):
         >>> point2: Point[int] = Point[int](20, 20)
         >>> print(point1 / point2) # Point(x=0.5, y=0.5)
         """
-        self.OtherValidator(other)
+        assert isinstance(other, Point), "other must be of type Point"
+        if validation_enabled:
+            self.OtherValidator(other)
         return Point(self.x_ / other.x_, self.y_ / other.y_)
     
     def __floordiv__(self, other: 'Point') -> 'Point':
@@ -502,7 +569,9 @@ class Point(Generic[T]):
         >>> point2: Point[int] = Point[int](20, 20)
         >>> print(point1 // point2) # Point(x=0, y=0)
         """
-        self.OtherValidator(other)
+        assert isinstance(other, Point), "other must be of type Point"
+        if validation_enabled:
+            self.OtherValidator(other)
         return Point(self.x_ // other.x_, self.y_ // other.y_)
 
     def __mod__(self, other: 'Point') -> 'Point':
@@ -514,7 +583,9 @@ class Point(Generic[T]):
         >>> point2: Point[int] = Point[int](20, 20)
         >>> print(point1 % point2) # Point(x=10, y=10)
         """
-        self.OtherValidator(other)
+        assert isinstance(other, Point), "other must be of type Point"
+        if validation_enabled:
+            self.OtherValidator(other)
         return Point(self.x_ % other.x_, self.y_ % other.y_)
     
     def __pow__(self, other: 'Point') -> 'Point':
@@ -526,7 +597,9 @@ class Point(Generic[T]):
         >>> point2: Point[int] = Point[int](2, 2)
         >>> print(point1 ** point2) # Point(x=100, y=100)
         """
-        self.OtherValidator(other)
+        assert isinstance(other, Point), "other must be of type Point"
+        if validation_enabled:
+            self.OtherValidator(other)
         return Point(self.x_ ** other.x_, self.y_ ** other.y_)
 
     def __eq__(self, other: object) -> bool:
@@ -539,7 +612,8 @@ class Point(Generic[T]):
         >>> print(point1 == point2) # True
         """
         assert isinstance(other, Point), "other must be of type Point"
-        self.OtherValidator(other)
+        if validation_enabled:
+            self.OtherValidator(other)
         return self.x_ == other.x_ and self.y_ == other.y_
     
     def __ne__(self, other: object) -> bool:
@@ -552,7 +626,8 @@ class Point(Generic[T]):
         >>> print(point1 != point2) # True
         """
         assert isinstance(other, Point), "other must be of type Point"
-        self.OtherValidator(other)
+        if validation_enabled:
+            self.OtherValidator(other)
         return self.x_ != other.x_ or self.y_ != other.y_
 
     def __lt__(self, other: 'Point') -> bool:
@@ -564,7 +639,9 @@ class Point(Generic[T]):
         >>> point2: Point[int] = Point[int](20, 20)
         >>> print(point1 < point2) # True
         """
-        self.OtherValidator(other)
+        assert isinstance(other, Point), "other must be of type Point"
+        if validation_enabled:
+            self.OtherValidator(other)
         return self.x_ < other.x_ and self.y_ < other.y_
 
     def __le__(self, other: 'Point') -> bool:
@@ -576,7 +653,9 @@ class Point(Generic[T]):
         >>> point2: Point[int] = Point[int](20, 20)
         >>> print(point1 <= point2) # True
         """
-        self.OtherValidator(other)
+        assert isinstance(other, Point), "other must be of type Point"
+        if validation_enabled:
+            self.OtherValidator(other)
         return self.x_ <= other.x_ and self.y_ <= other.y_
 
     def __gt__(self, other: 'Point') -> bool:
@@ -588,7 +667,9 @@ class Point(Generic[T]):
         >>> point2: Point[int] = Point[int](20, 20)
         >>> print(point1 > point2) # False
         """
-        self.OtherValidator(other)
+        assert isinstance(other, Point), "other must be of type Point"
+        if validation_enabled:
+            self.OtherValidator(other)
         return self.x_ > other.x_ and self.y_ > other.y_
 
     def __ge__(self, other: 'Point') -> bool:
@@ -632,6 +713,8 @@ class Rect(Generic[T]):
     Rect class for 2D rectangle
     """
 
+    __slots__ = ("size_", "point_")
+
     def __init__(self, width: T, height: T, x: T, y: T) -> None:
         """
         Constructor for Rect class
@@ -639,8 +722,8 @@ class Rect(Generic[T]):
         :example:
         >>> rect: Rect[int] = Rect[int](10, 10, 5, 5)
         """
-        self.size_: Size[T] = Size[T](width, height)
-        self.point_: Point[T] = Point[T](x, y)
+        self.size_: Size[T] = Size(width, height)
+        self.point_: Point[T] = Point(x, y)
     
     def __str__(self) -> str:
         """
@@ -650,7 +733,8 @@ class Rect(Generic[T]):
         >>> rect: Rect[int] = Rect[int](10, 10, 5, 5)
         >>> print(rect) # Rect(size=Size(width=10, height=10), point=Point(x=5, y=5))
         """
-        self.ClassValidator()
+        if validation_enabled:
+            self.ClassValidator()
         return f"Rect(size={self.size_}, point={self.point_})"
 
     def Add(self, value: T) -> 'Rect':
@@ -661,7 +745,8 @@ class Rect(Generic[T]):
         >>> rect: Rect[int] = Rect[int](10, 10, 5, 5)
         >>> print(rect.Add(5)) # Rect(size=Size(width=15, height=15), point=Point(x=10, y=10))
         """
-        self.ClassValidator()
+        if validation_enabled:
+            self.ClassValidator()
         new_size = self.size_.Add(value)
         new_point = self.point_.Add(value)
         return Rect(new_size.width_, new_size.height_, new_point.x_, new_point.y_)
@@ -674,7 +759,8 @@ class Rect(Generic[T]):
         >>> rect: Rect[int] = Rect[int](10, 10, 5, 5)
         >>> print(rect.Sub(5)) # Rect(size=Size(width=5, height=5), point=Point(x=0, y=0))
         """
-        self.ClassValidator()
+        if validation_enabled:
+            self.ClassValidator()
         new_size = self.size_.Sub(value)
         new_point = self.point_.Sub(value)
         return Rect(new_size.width_, new_size.height_, new_point.x_, new_point.y_)
@@ -687,7 +773,8 @@ class Rect(Generic[T]):
         >>> rect: Rect[int] = Rect[int](10, 10, 5, 5)
         >>> print(rect.Mul(5)) # Rect(size=Size(width=50, height=50), point=Point(x=25, y=25))
         """
-        self.ClassValidator()
+        if validation_enabled:
+            self.ClassValidator()
         new_size = self.size_.Mul(value)
         new_point = self.point_.Mul(value)
         return Rect(new_size.width_, new_size.height_, new_point.x_, new_point.y_)
@@ -700,7 +787,8 @@ class Rect(Generic[T]):
         >>> rect: Rect[int] = Rect[int](10, 10, 5, 5)
         >>> print(rect.TrueDiv(5)) # Rect(size=Size(width=2.0, height=2.0), point=Point(x=1.0, y=1.0))
         """
-        self.ClassValidator()
+        if validation_enabled:
+            self.ClassValidator()
         new_size = self.size_.TrueDiv(value)
         new_point = self.point_.TrueDiv(value)
         return Rect(new_size.width_, new_size.height_, new_point.x_, new_point.y_)
@@ -713,7 +801,8 @@ class Rect(Generic[T]):
         >>> rect: Rect[int] = Rect[int](10, 10, 5, 5)
         >>> print(rect.FloorDiv(5)) # Rect(size=Size(width=2, height=2), point=Point(x=1, y=1))
         """
-        self.ClassValidator()
+        if validation_enabled:
+            self.ClassValidator()
         new_size = self.size_.FloorDiv(value)
         new_point = self.point_.FloorDiv(value)
         return Rect(new_size.width_, new_size.height_, new_point.x_, new_point.y_)
@@ -726,7 +815,8 @@ class Rect(Generic[T]):
         >>> rect: Rect[int] = Rect[int](10, 10, 5, 5)
         >>> print(rect.Mod(5))
         """
-        self.ClassValidator()
+        if validation_enabled:
+            self.ClassValidator()
         new_size = self.size_.Mod(value)
         new_point = self.point_.Mod(value)
         return Rect(new_size.width_, new_size.height_, new_point.x_, new_point.y_)
@@ -739,7 +829,8 @@ class Rect(Generic[T]):
         >>> rect: Rect[int] = Rect[int](10, 10, 5, 5)
         >>> print(rect.Pow(2)) # Rect(size=Size(width=100, height=100), point=Point(x=25, y=25))
         """
-        self.ClassValidator()
+        if validation_enabled:
+            self.ClassValidator()
         new_size = self.size_.Pow(value)
         new_point = self.point_.Pow(value)
         return Rect(new_size.width_, new_size.height_, new_point.x_, new_point.y_)
@@ -753,7 +844,9 @@ class Rect(Generic[T]):
         >>> rect2: Rect[int] = Rect[int](20, 20, 10, 10)
         >>> print(rect1 + rect2) # Rect(size=Size(width=30, height=30), point=Point(x=15, y=15))
         """
-        self.OtherValidator(other)
+        assert isinstance(other, Rect), "other must be of type Rect"
+        if validation_enabled:
+            self.OtherValidator(other)
         new_size = self.size_ + other.size_
         new_point = self.point_ + other.point_
         return Rect(new_size.width_, new_size.height_, new_point.x_, new_point.y_)
@@ -767,7 +860,9 @@ class Rect(Generic[T]):
         >>> rect2: Rect[int] = Rect[int](20, 20, 10, 10)
         >>> print(rect1 - rect2) # Rect(size=Size(width=-10, height=-10), point=Point(x=-5, y=-5))
         """
-        self.OtherValidator(other)
+        assert isinstance(other, Rect), "other must be of type Rect"
+        if validation_enabled:
+            self.OtherValidator(other)
         new_size = self.size_ - other.size_
         new_point = self.point_ - other.point_
         return Rect(new_size.width_, new_size.height_, new_point.x_, new_point.y_)
@@ -781,7 +876,9 @@ class Rect(Generic[T]):
         >>> rect2: Rect[int] = Rect[int](20, 20, 10, 10)
         >>> print(rect1 * rect2) # Rect(size=Size(width=200, height=200), point=Point(x=50, y=50))
         """
-        self.OtherValidator(other)
+        assert isinstance(other, Rect), "other must be of type Rect"
+        if validation_enabled:
+            self.OtherValidator(other)
         new_size = self.size_ * other.size_
         new_point = self.point_ * other.point_
         return Rect(new_size.width_, new_size.height_, new_point.x_, new_point.y_)
@@ -795,7 +892,9 @@ class Rect(Generic[T]):
         >>> rect2: Rect[int] = Rect[int](20, 20, 10, 10)
         >>> print(rect1 / rect2) # Rect(size=Size(width=0.5, height=0.5), point=Point(x=0.5, y=0.5))
         """
-        self.OtherValidator(other)
+        assert isinstance(other, Rect), "other must be of type Rect"
+        if validation_enabled:
+            self.OtherValidator(other)
         new_size = self.size_ / other.size_
         new_point = self.point_ / other.point_
         return Rect(new_size.width_, new_size.height_, new_point.x_, new_point.y_)
@@ -809,7 +908,9 @@ class Rect(Generic[T]):
         >>> rect2: Rect[int] = Rect[int](20, 20, 10, 10)
         >>> print(rect1 // rect2)
         """
-        self.OtherValidator(other)
+        assert isinstance(other, Rect), "other must be of type Rect"
+        if validation_enabled:
+            self.OtherValidator(other)
         new_size = self.size_ // other.size_
         new_point = self.point_ // other.point_
         return Rect(new_size.width_, new_size.height_, new_point.x_, new_point.y_)
@@ -823,7 +924,9 @@ class Rect(Generic[T]):
         >>> rect2: Rect[int] = Rect[int](20, 20, 10, 10)
         >>> print(rect1 % rect2)
         """
-        self.OtherValidator(other)
+        assert isinstance(other, Rect), "other must be of type Rect"
+        if validation_enabled:
+            self.OtherValidator(other)
         new_size = self.size_ % other.size_
         new_point = self.point_ % other.point_
         return Rect(new_size.width_, new_size.height_, new_point.x_, new_point.y_)
@@ -837,7 +940,9 @@ class Rect(Generic[T]):
         >>> rect2: Rect[int] = Rect[int](2, 2, 2, 2)
         >>> print(rect1 ** rect2) # Rect(size=Size(width=100, height=100), point=Point(x=25, y=25))
         """
-        self.OtherValidator(other)
+        assert isinstance(other, Rect), "other must be of type Rect"
+        if validation_enabled:
+            self.OtherValidator(other)
         new_size = self.size_ ** other.size_
         new_point = self.point_ ** other.point_
         return Rect(new_size.width_, new_size.height_, new_point.x_, new_point.y_)
@@ -852,7 +957,8 @@ class Rect(Generic[T]):
         >>> print(rect1 == rect2) # True
         """
         assert isinstance(other, Rect), "other must be of type Rect"
-        self.OtherValidator(other)
+        if validation_enabled:
+            self.OtherValidator(other)
         return self.size_ == other.size_ and self.point_ == other.point_
 
     def __ne__(self, other: object) -> bool:
@@ -865,7 +971,8 @@ class Rect(Generic[T]):
         >>> print(rect1 != rect2) # True
         """
         assert isinstance(other, Rect), "other must be of type Rect"
-        self.OtherValidator(other)
+        if validation_enabled:
+            self.OtherValidator(other)
         return self.size_ != other.size_ or self.point_ != other.point_
 
     def __lt__(self, other: 'Rect') -> bool:
@@ -877,7 +984,9 @@ class Rect(Generic[T]):
         >>> rect2: Rect[int] = Rect[int](20, 20, 10, 10)
         >>> print(rect1 < rect2) # True
         """
-        self.OtherValidator(other)
+        assert isinstance(other, Rect), "other must be of type Rect"
+        if validation_enabled:
+            self.OtherValidator(other)
         return self.size_ < other.size_ and self.point_ < other.point_
 
     def __le__(self, other: 'Rect') -> bool:
@@ -889,7 +998,9 @@ class Rect(Generic[T]):
         >>> rect2: Rect[int] = Rect[int](20, 20, 10, 10)
         >>> print(rect1 <= rect2) # True
         """
-        self.OtherValidator(other)
+        assert isinstance(other, Rect), "other must be of type Rect"
+        if validation_enabled:
+            self.OtherValidator(other)
         return self.size_ <= other.size_ and self.point_ <= other.point_
 
     def __gt__(self, other: 'Rect') -> bool:
@@ -901,7 +1012,9 @@ class Rect(Generic[T]):
         >>> rect2: Rect[int] = Rect[int](20, 20, 10, 10)
         >>> print(rect1 > rect2) # False
         """
-        self.OtherValidator(other)
+        assert isinstance(other, Rect), "other must be of type Rect"
+        if validation_enabled:
+            self.OtherValidator(other)
         return self.size_ > other.size_ and self.point_ > other.point_
 
     def __ge__(self, other: 'Rect') -> bool:
@@ -938,4 +1051,267 @@ class Rect(Generic[T]):
         """
         assert isinstance(other, Rect), "other must be of type Rect"
         self.size_.OtherValidator(other.size_)
-        self.point_.OtherValidator(other.point_)
\ No newline at end of file
+        self.point_.OtherValidator(other.point_)
+
+class RectArray:
+    """
+    Array of 2D rectangles backed by a single (N, 4) NumPy array of x, y, width, height rows.
+    Operations apply to every rectangle at once without creating Size, Point and Rect objects,
+    the row order matches boundingRect and connectedComponentsWithStats.
+
+    :methods:
+    FromRects : Creates a RectArray from a list of Rect objects
+    ToRects : Converts the RectArray to a list of Rect objects
+    Add : Adds a value to every rectangle, like Rect.Add
+    Sub : Subtracts a value from every rectangle, like Rect.Sub
+    Mul : Multiplies every rectangle with a value, like Rect.Mul
+    TrueDiv : Divides every rectangle by a value, like Rect.TrueDiv
+    FloorDiv : Divides every rectangle by a value and returns the floor value, like Rect.FloorDiv
+    Translate : Moves every rectangle by an offset
+    Area : Returns the area of every rectangle
+    Center : Returns the center of every rectangle
+    Clip : Clips every rectangle to an image size
+    ExpandToSquare : Expands every rectangle to a square around its center
+    __eq__, __ne__, __lt__, __le__, __gt__, __ge__ : Compare the rectangles row by row like Rect, returning a boolean array
+    """
+
+    def __init__(self, boxes: ndarray) -> None:
+        """
+        Constructor for RectArray class, the array is used without copying
+
+        :example:
+        >>> rects: RectArray = RectArray(array([[5, 5, 10, 10], [0, 0, 20, 10]]))
+        """
+        assert boxes.ndim == 2 and boxes.shape[1] == 4, "boxes must be an (N, 4) array"
+        self.boxes_: ndarray = boxes
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the RectArray object
+
+        :example:
+        >>> rects: RectArray = RectArray(array([[5, 5, 10, 10]]))
+        >>> print(rects) # RectArray(x, y, width, height=[[5, 5, 10, 10]])
+        """
+        return f"RectArray(x, y, width, height={self.boxes_.tolist()})"
+
+    def __len__(self) -> int:
+        return len(self.boxes_)
+
+    def __getitem__(self, index) -> 'RectArray':
+        """
+        Selects rectangles by index, slice or boolean mask
+
+        :example:
+        >>> rects: RectArray = RectArray(array([[5, 5, 10, 10], [0, 0, 20, 10]]))
+        >>> print(rects[rects.Area() > 100]) # RectArray(x, y, width, height=[[0, 0, 20, 10]])
+        """
+        return RectArray(self.boxes_[index].reshape(-1, 4))
+
+    @staticmethod
+    def FromRects(rects: list[Rect], dtype: type = int32) -> 'RectArray':
+        """
+        Creates a RectArray from a list of Rect objects
+
+        :example:
+        >>> rects: RectArray = RectArray.FromRects([Rect[int](10, 10, 5, 5)])
+        >>> print(rects) # RectArray(x, y, width, height=[[5, 5, 10, 10]])
+        """
+        boxes: ndarray = empty((len(rects), 4), dtype=dtype)
+        for row, rect in enumerate(rects):
+            boxes[row] = (rect.point_.x_, rect.point_.y_, rect.size_.width_, rect.size_.height_)
+        return RectArray(boxes)
+
+    def ToRects(self) -> list[Rect]:
+        """
+        Converts the RectArray to a list of Rect objects with Python numbers
+
+        :example:
+        >>> rects: RectArray = RectArray(array([[5, 5, 10, 10]]))
+        >>> print(rects.ToRects()[0]) # Rect(size=Size(width=10, height=10), point=Point(x=5, y=5))
+        """
+        return [Rect(width, height, x, y) for x, y, width, height in self.boxes_.tolist()]
+
+    def Add(self, value: T) -> 'RectArray':
+        """
+        Adds a value to the position and size of every rectangle
+
+        :example:
+        >>> rects: RectArray = RectArray(array([[5, 5, 10, 10]]))
+        >>> print(rects.Add(5)) # RectArray(x, y, width, height=[[10, 10, 15, 15]])
+        """
+        return RectArray(self.boxes_ + value)
+
+    def Sub(self, value: T) -> 'RectArray':
+        """
+        Subtracts a value from the position and size of every rectangle
+
+        :example:
+        >>> rects: RectArray = RectArray(array([[5, 5, 10, 10]]))
+        >>> print(rects.Sub(5)) # RectArray(x, y, width, height=[[0, 0, 5, 5]])
+        """
+        return RectArray(self.boxes_ - value)
+
+    def Mul(self, value: T) -> 'RectArray':
+        """
+        Multiplies the position and size of every rectangle with a value, scaling the rectangles
+
+        :example:
+        >>> rects: RectArray = RectArray(array([[5, 5, 10, 10]]))
+        >>> print(rects.Mul(4)) # RectArray(x, y, width, height=[[20, 20, 40, 40]])
+        """
+        return RectArray(self.boxes_ * value)
+
+    def TrueDiv(self, value: T) -> 'RectArray':
+        """
+        Divides the position and size of every rectangle by a value
+
+        :example:
+        >>> rects: RectArray = RectArray(array([[5, 5, 10, 10]]))
+        >>> print(rects.TrueDiv(5)) # RectArray(x, y, width, height=[[1.0, 1.0, 2.0, 2.0]])
+        """
+        return RectArray(self.boxes_ / value)
+
+    def FloorDiv(self, value: T) -> 'RectArray':
+        """
+        Divides the position and size of every rectangle by a value and returns the floor value
+
+        :example:
+        >>> rects: RectArray = RectArray(array([[5, 5, 10, 10]]))
+        >>> print(rects.FloorDiv(3)) # RectArray(x, y, width, height=[[1, 1, 3, 3]])
+        """
+        return RectArray(self.boxes_ // value)
+
+    def Translate(self, dx: T, dy: T) -> 'RectArray':
+        """
+        Moves every rectangle by an offset
+
+        :example:
+        >>> rects: RectArray = RectArray(array([[5, 5, 10, 10]]))
+        >>> print(rects.Translate(10, -5)) # RectArray(x, y, width, height=[[15, 0, 10, 10]])
+        """
+        boxes: ndarray = self.boxes_.copy()
+        boxes[:, 0] += dx
+        boxes[:, 1] += dy
+        return RectArray(boxes)
+
+    def Area(self) -> ndarray:
+        """
+        Returns the area of every rectangle
+
+        :example:
+        >>> rects: RectArray = RectArray(array([[5, 5, 10, 10]]))
+        >>> print(rects.Area()) # [100]
+        """
+        return self.boxes_[:, 2] * self.boxes_[:, 3]
+
+    def Center(self) -> ndarray:
+        """
+        Returns the center of every rectangle as an (N, 2) array of x, y, rounded down for integer rectangles
+
+        :example:
+        >>> rects: RectArray = RectArray(array([[5, 5, 10, 11]]))
+        >>> print(rects.Center()) # [[10, 10]]
+        """
+        if self.boxes_.dtype.kind in "iu":
+            return self.boxes_[:, :2] + self.boxes_[:, 2:] // 2
+        return self.boxes_[:, :2] + self.boxes_[:, 2:] / 2
+
+    def Clip(self, size: Size) -> 'RectArray':
+        """
+        Clips every rectangle to an image of the given size, rectangles outside the image get a zero size
+
+        :example:
+        >>> rects: RectArray = RectArray(array([[-5, 5, 10, 10]]))
+        >>> print(rects.Clip(Size[int](100, 12))) # RectArray(x, y, width, height=[[0, 5, 5, 7]])
+        """
+        x0: ndarray = clip(self.boxes_[:, 0], 0, size.width_)
+        y0: ndarray = clip(self.boxes_[:, 1], 0, size.height_)
+        x1: ndarray = clip(self.boxes_[:, 0] + self.boxes_[:, 2], 0, size.width_)
+        y1: ndarray = clip(self.boxes_[:, 1] + self.boxes_[:, 3], 0, size.height_)
+        return RectArray(stack([x0, y0, maximum(x1 - x0, 0), maximum(y1 - y0, 0)], axis=1).astype(self.boxes_.dtype))
+
+    def ExpandToSquare(self) -> 'RectArray':
+        """
+        Expands every rectangle to a square with the side of its longer edge around its center
+
+        :example:
+        >>> rects: RectArray = RectArray(array([[5, 5, 10, 20]]))
+        >>> print(rects.ExpandToSquare()) # RectArray(x, y, width, height=[[0, 5, 20, 20]])
+        """
+        side: ndarray = self.boxes_[:, 2:].max(axis=1)
+        center: ndarray = self.Center()
+        corner: ndarray = center - (side // 2 if self.boxes_.dtype.kind in "iu" else side / 2)[:, None]
+        return RectArray(stack([corner[:, 0], corner[:, 1], side, side], axis=1).astype(self.boxes_.dtype))
+
+    def __eq__(self, other: object) -> ndarray:
+        """
+        Checks row by row if the rectangles are equal
+
+        :example:
+        >>> rects1: RectArray = RectArray(array([[5, 5, 10, 10], [0, 0, 5, 5]]))
+        >>> rects2: RectArray = RectArray(array([[5, 5, 10, 10], [0, 0, 6, 5]]))
+        >>> print(rects1 == rects2) # [ True False]
+        """
+        self.OtherValidator(other)
+        return (self.boxes_ == other.boxes_).all(axis=1)
+
+    def __ne__(self, other: object) -> ndarray:
+        """
+        Checks row by row if the rectangles are not equal
+
+        :example:
+        >>> print(rects1 != rects2) # [False  True]
+        """
+        self.OtherValidator(other)
+        return (self.boxes_ != other.boxes_).any(axis=1)
+
+    def __lt__(self, other: 'RectArray') -> ndarray:
+        """
+        Checks row by row if the size and position are both less than the other, like Rect
+
+        :example:
+        >>> print(rects1 < rects2) # [False False]
+        """
+        self.OtherValidator(other)
+        return (self.boxes_ < other.boxes_).all(axis=1)
+
+    def __le__(self, other: 'RectArray') -> ndarray:
+        """
+        Checks row by row if the size and position are both less than or equal to the other, like Rect
+
+        :example:
+        >>> print(rects1 <= rects2) # [ True  True]
+        """
+        self.OtherValidator(other)
+        return (self.boxes_ <= other.boxes_).all(axis=1)
+
+    def __gt__(self, other: 'RectArray') -> ndarray:
+        """
+        Checks row by row if the size and position are both greater than the other, like Rect
+
+        :example:
+        >>> print(rects1 > rects2) # [False False]
+        """
+        self.OtherValidator(other)
+        return (self.boxes_ > other.boxes_).all(axis=1)
+
+    def __ge__(self, other: 'RectArray') -> ndarray:
+        """
+        Checks row by row if the size and position are both greater than or equal to the other, like Rect
+
+        :example:
+        >>> print(rects1 >= rects2) # [ True False]
+        """
+        self.OtherValidator(other)
+        return (self.boxes_ >= other.boxes_).all(axis=1)
+
+    def OtherValidator(self, other: 'RectArray') -> None:
+        """
+        Validates the other RectArray
+
+        :example:
+        >>> rects1.OtherValidator(rects2)
+        """
+        assert isinstance(other, RectArray), "other must be of type RectArray"
+        assert len(other) == len(self), "other must have the same number of rectangles"
@@ -1,9 +1,23 @@
 # python version : 3.12.6
 
-from os import listdir
-from os.path import isfile, join
-from numpy import ndarray
+from os import listdir, makedirs, stat, replace
+from os.path import isfile, isdir, join, exists, relpath, basename, dirname
+from shutil import rmtree
+from enum import Enum, unique
+from hashlib import blake2b
+from json import load, dump
+from typing import Iterable, Iterator
+from itertools import count, islice
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, Future
+from threading import BoundedSemaphore, local
+from collections import deque
+from time import perf_counter
+from cv2 import setNumThreads, bitwise_and, imwrite
+from numpy import ndarray, empty, zeros, uint8
 from classes.image_lib import ImageAgent
+from classes.shard_lib import ShardWriter, ShardReader
+from classes.util_lib import Size
+from datasets.label_lib import YoloLabelIndex
 
 
 class VideoDatasetAgent:
@@ -14,26 +28,112 @@ class VideoDatasetAgent:
     Attributes:
         image_agent_ (ImageAgent): Image agent for image operations.
         vid_extensions_ (tuple[str, ...] | str): Video file extensions to read.
-        img_extensions_ (str): Image file extension to save.
+        img_extensions_ (str): Image file extension to save, "png", "jpg" or "webp".
         frame_rate_ (int): Frame rate for video extraction.
+        interval_ (float): Seconds between extracted images, 0 uses frame_rate_ instead.
+        seek_threshold_ (int | None): Seek instead of grabbing when more than this many frames are skipped.
+        encode_threads_ (int): Threads encoding and writing images while the next frames are decoded, 0 encodes in the decoding thread.
+        dedup_threshold_ (int): Maximum hash distance of a dropped near duplicate frame, -1 keeps every frame.
+        change_threshold_ (float): Mean grayscale difference with the last kept frame needed to keep a frame, 0 keeps every sampled frame.
+        min_interval_ (float): Minimum seconds between two frames kept by the adaptive sampling.
+        max_interval_ (float): Maximum seconds between two frames kept by the adaptive sampling, 0 has no maximum.
+        size_ (Size[int] | None): Size of the saved images, None keeps the video size.
+        interpolation_ (ImageAgent.ImageInterpolationEnum): Interpolation used to resize the images.
+        encode_options_ (ImageAgent.EncodeOptions | None): Encoder parameters of the saved images.
+        shard_size_ (int): Size in bytes of the tar shards the images are packed into, 0 saves one file per image.
+        manifest_name_ (str): File name of the extraction manifest in the destination folder.
     
+    Enum:
+        VideoStateEnum: Enum for the state of a video compared with the extraction manifest.
+
+    Classes:
+        VideoExtractResult: Result of extracting a single video.
+
     Methods:
         VideoExtract: Extract images from video files in the dataset folder.
+        ListVideos: List the video files and their destination folders.
+        SplitVideo: Split a video into segments extracted in parallel.
+        ExtractVideo: Extract the images of a single video or segment.
+        ResumeSample: Find the image to resume an interrupted extraction from.
+        ListImages: List the numbers of the images saved in a folder.
+        CheckVideo: Compare a video with its manifest record.
+        ExtractSettings: Settings that change the extracted images.
+        HashFile: Hash the content of a file.
+        LoadSavedImage: Load an extracted image from a file or shard.
+        LoadManifest: Load the extraction manifest.
+        SaveManifest: Save the extraction manifest.
+        InitWorker: Initialize a worker process.
+        SampleVideo: Iterate over the frames of a video selected by the sampling settings.
+        SampleIndices: Indices of the frames selected by the frame rate.
         SaveImages: Save the extracted images.
+        SaveNumberedImages: Save the extracted images under their own numbers.
+        SaveFrame: Resize a frame if needed and save it.
         StripExtension: Strip the extension from the path.
 
     :example:
     >>> dataset_agent : VideoDatasetAgent = VideoDatasetAgent()
     """
 
-    def __init__(self, vid_extensions : tuple[str, ...] | str = (".mp4", ".mov"), img_extensions : str = "png", frame_rate : int = 60) -> None:
+    class VideoExtractResult:
+        """
+        Result of extracting a single video.
+
+        Attributes:
+            video_path_ (str): Path to the video file.
+            dst_path_ (str): Folder the images are saved to.
+            frames_ (int): Number of images saved.
+            error_ (str | None): Error message if the extraction failed.
+            skipped_ (bool): The video was already extracted.
+            dropped_ (int): Number of near duplicate frames that were not saved.
+        """
+
+        def __init__(self, video_path : str, dst_path : str, frames : int, error : str | None = None, skipped : bool = False, dropped : int = 0) -> None:
+            self.video_path_ : str = video_path
+            self.dst_path_ : str = dst_path
+            self.frames_ : int = frames
+            self.error_ : str | None = error
+            self.skipped_ : bool = skipped
+            self.dropped_ : int = dropped
+
+    @unique
+    class VideoStateEnum(Enum):
+        """
+        Enum for the state of a video compared with the extraction manifest.
+
+        complete_ : Unchanged and fully extracted.
+        partial_ : Unchanged and partially extracted.
+        changed_ : New video, changed content or changed sampling settings.
+        """
+        complete_ = "complete"
+        partial_ = "partial"
+        changed_ = "changed"
+
+    def __init__(self, vid_extensions : tuple[str, ...] | str = (".mp4", ".mov"), img_extensions : str = "png", frame_rate : int = 60, interval : float = 0, seek_threshold : int | None = None, encode_threads : int = 0, dedup_threshold : int = -1, change_threshold : float = 0, min_interval : float = 0, max_interval : float = 0, size : Size[int] | None = None, interpolation : ImageAgent.ImageInterpolationEnum = ImageAgent.ImageInterpolationEnum.area_, encode_options : ImageAgent.EncodeOptions | None = None, shard_size : int = 0) -> None:
         """
         Initialize the dataset agent.
 
         Args:
             vid_extensions (tuple[str, ...] | str): Video file extensions to read.
             img_extensions (str): Image file extension to save.
-            frame_rate (int): Frame rate for video extraction.
+            frame_rate (int): Frame rate for video extraction, keep one frame every frame_rate frames.
+            interval (float): Seconds between extracted images, selected by the frame timestamps so variable frame rate videos keep wall clock intervals. 0 uses frame_rate instead.
+            seek_threshold (int | None): Seek instead of grabbing when more than this many frames are skipped, 0 never seeks.
+                None never seeks with frame_rate and seeks past more than one second of video with interval.
+                Seeking pays off when the skipped gap is larger than the keyframe interval of the videos.
+            encode_threads (int): Threads encoding and writing images while the next frames are decoded, 0 encodes in the decoding thread.
+                OpenCV releases the GIL while encoding, so the threads run in parallel with the decoder.
+            dedup_threshold (int): Drop frames whose 64 bit difference hash is within this Hamming distance of the last kept frame, -1 keeps every frame.
+                The first frame of every segment is always kept, so segmented runs may keep a few more frames.
+            change_threshold (float): Adaptive sampling, keep a frame sampled by frame_rate or interval only when its mean grayscale difference
+                with the last kept frame reaches this value (0 - 255). 0 keeps every sampled frame. Adaptive videos are not split into segments.
+            min_interval (float): Adaptive sampling, minimum seconds between two kept frames.
+            max_interval (float): Adaptive sampling, maximum seconds between two kept frames, 0 has no maximum.
+            size (Size[int] | None): Resize every saved image to this size before encoding, None keeps the video size.
+            interpolation (ImageAgent.ImageInterpolationEnum): Interpolation used to resize the images.
+            encode_options (ImageAgent.EncodeOptions | None): Encoder parameters of the saved images, None uses the OpenCV defaults.
+                See ImageAgent.PresetOptions for presets, e.g. the fast preset for intermediate data.
+            shard_size (int): Pack the images into tar shards of about this many bytes instead of one file per image, 0 saves files.
+                Every shard has a sidecar index, the images are read back by name with ShardReader and ImageAgent.LoadShardImage.
 
         :example:
         >>> dataset_agent : VideoDatasetAgent = VideoDatasetAgent()
@@ -42,10 +142,29 @@ class VideoDatasetAgent:
         self.vid_extensions_ : tuple[str, ...] | str = vid_extensions
         self.img_extensions_ : str = img_extensions
         self.frame_rate_ : int = frame_rate
+        self.interval_ : float = interval
+        self.seek_threshold_ : int | None = seek_threshold
+        self.encode_threads_ : int = encode_threads
+        self.dedup_threshold_ : int = dedup_threshold
+        self.change_threshold_ : float = change_threshold
+        self.min_interval_ : float = min_interval
+        self.max_interval_ : float = max_interval
+        self.size_ : Size[int] | None = size
+        self.interpolation_ : ImageAgent.ImageInterpolationEnum = interpolation
+        self.encode_options_ : ImageAgent.EncodeOptions | None = encode_options
+        self.shard_size_ : int = shard_size
+        self.manifest_name_ : str = "manifest.json"
     
-    def VideoExtract(self, *, src_path : str = "./datasets", dst_path : str = "./bin") -> None:
+    def VideoExtract(self, *, src_path : str = "./datasets", dst_path : str = "./bin", workers : int = 1, cv_threads : int = 1, segment_length : float = 0, incremental : bool = False) -> list['VideoDatasetAgent.VideoExtractResult']:
         """
         Extract images from video files in the dataset folder.
+        With workers > 1 every video is extracted in its own process, with the same images as the serial path.
+        With segment_length > 0 videos longer than segment_length seconds are also split into segments extracted in parallel.
+        Segments start with a seek that is checked against the position reported by the decoder, see ImageAgent.SeekFrame,
+        and with dedup_threshold_ >= 0 every segment keeps its first frame, so segmented runs can keep a few more images than a serial run.
+        With incremental the manifest in dst_path is used to skip videos that are already extracted and to resume interrupted ones.
+        Only destination folders of videos recorded in the manifest are deleted, folders written before the manifest are overwritten in place.
+        A video that is not resumed loses the shards of its folder first, so a rerun never serves images of a previous run.
 
         Video Source Structure:
         - datasets
@@ -59,15 +178,133 @@ class VideoDatasetAgent:
                     - 0000000.png
                     - 0000001.png
                     - ...
+            - manifest.json
 
         Args:
             src_path (str): Path to the dataset folder.
             dst_path (str): Path to save the extracted images.
+            workers (int): Number of worker processes, 1 extracts serially in this process.
+            cv_threads (int): OpenCV threads per worker process, keeps workers * cv_threads close to the core count.
+            segment_length (float): Length of a segment in seconds, 0 extracts every video in a single task. Only used with workers > 1.
+            incremental (bool): Skip unchanged videos and resume partially extracted ones, writes the manifest to dst_path.
+                False extracts everything again without a manifest.
+
+        Returns:
+            list[VideoExtractResult]: Result of every video in listing order.
         
         :example:
         >>> dataset_agent : VideoDatasetAgent = VideoDatasetAgent()
-        >>> dataset_agent.VideoExtract()    
+        >>> results : list[VideoDatasetAgent.VideoExtractResult] = dataset_agent.VideoExtract(workers=8)
+        """
+        assert workers > 0, "Invalid number of workers"
+
+        jobs : list[tuple[str, str]] = self.ListVideos(src_path, dst_path)
+        keys : list[str] = [relpath(video_path, src_path) for video_path, _ in jobs]
+        manifest : dict[str, dict] = self.LoadManifest(dst_path) if incremental else {}
+        results : list[VideoDatasetAgent.VideoExtractResult | None] = [None] * len(jobs)
+        pending : list[tuple[int, bool]] = [] # job index and whether to resume it
+
+        # Compare the videos with the manifest of the previous runs
+        for job_index, (video_path, video_dst_path) in enumerate(jobs):
+            if not incremental:
+                pending.append((job_index, False))
+                continue
+
+            recorded : bool = keys[job_index] in manifest
+            state, record = self.CheckVideo(video_path, manifest.get(keys[job_index]))
+            manifest[keys[job_index]] = record
+
+            if state == VideoDatasetAgent.VideoStateEnum.complete_ and len(self.ListImages(video_dst_path)) != record["frames"]:
+                # Images were deleted or added since the video was extracted
+                print(f"Warning: {video_dst_path} no longer has the {record['frames']} extracted images, resuming")
+                state = VideoDatasetAgent.VideoStateEnum.partial_
+
+            if state == VideoDatasetAgent.VideoStateEnum.complete_:
+                print(f"Skipping {video_path}, already extracted")
+                results[job_index] = VideoDatasetAgent.VideoExtractResult(video_path, video_dst_path, 0, skipped=True)
+            elif state == VideoDatasetAgent.VideoStateEnum.partial_:
+                pending.append((job_index, True))
+            else:
+                # Changed content or sampling settings, extract from scratch. Only folders written by a recorded extraction are deleted
+                if recorded and exists(video_dst_path):
+                    rmtree(video_dst_path)
+                elif exists(video_dst_path):
+                    print(f"Warning: {video_dst_path} has no manifest record, overwriting its images in place")
+                pending.append((job_index, False))
+
+        if incremental:
+            self.SaveManifest(dst_path, manifest)
+
+        # Shards of a previous run would still be served next to the new images, whatever their segmentation
+        for job_index, resume in pending:
+            if not resume:
+                ShardWriter.RemoveShards(jobs[job_index][1])
+
+        def FinishVideo(job_index : int, frames : int, dropped : int, errors : list[str]) -> None:
+            video_path, video_dst_path = jobs[job_index]
+            results[job_index] = VideoDatasetAgent.VideoExtractResult(video_path, video_dst_path, frames, "; ".join(errors) or None, dropped=dropped)
+            if incremental:
+                manifest[keys[job_index]]["frames"] = len(self.ListImages(video_dst_path))
+                manifest[keys[job_index]]["complete"] = not errors
+                self.SaveManifest(dst_path, manifest)
+
+        if workers == 1:
+            for job_index, resume in pending:
+                result : VideoDatasetAgent.VideoExtractResult = self.ExtractVideo(*jobs[job_index], resume=resume)
+                FinishVideo(job_index, result.frames_, result.dropped_, [] if result.error_ is None else [result.error_])
+        else:
+            # Split long videos into segments, every segment keeps the global image numbering of its video
+            tasks : list[tuple[int, bool, int, int | None]] = []
+            for job_index, resume in pending:
+                segments : list[tuple[int, int | None]] = self.SplitVideo(jobs[job_index][0], segment_length) if segment_length > 0 else [(0, None)]
+                tasks.extend((job_index, resume, first_sample, stop_sample) for first_sample, stop_sample in segments)
+
+            frames : list[int] = [0] * len(jobs)
+            dropped : list[int] = [0] * len(jobs)
+            errors : list[list[str]] = [[] for _ in jobs]
+
+            with ProcessPoolExecutor(max_workers=workers, initializer=VideoDatasetAgent.InitWorker, initargs=(cv_threads,)) as executor:
+                futures : list[Future] = [executor.submit(self.ExtractVideo, *jobs[job_index], first_sample, stop_sample, resume) for job_index, resume, first_sample, stop_sample in tasks]
+                for task_index, (future, (job_index, _, _, _)) in enumerate(zip(futures, tasks)):
+                    try:
+                        result : VideoDatasetAgent.VideoExtractResult = future.result()
+                        frames[job_index] += result.frames_
+                        dropped[job_index] += result.dropped_
+                        if result.error_ is not None:
+                            errors[job_index].append(result.error_)
+                    except Exception as error:
+                        # The worker process itself failed, e.g. it was killed
+                        errors[job_index].append(repr(error))
+
+                    # Tasks are in video order, the video is done after its last segment
+                    if task_index + 1 == len(tasks) or tasks[task_index + 1][0] != job_index:
+                        FinishVideo(job_index, frames[job_index], dropped[job_index], errors[job_index])
+
+        failed : list[VideoDatasetAgent.VideoExtractResult] = [result for result in results if result.error_ is not None]
+        skipped : int = sum(result.skipped_ for result in results)
+        print(f"Extracted {sum(result.frames_ for result in results)} images from {len(results) - len(failed) - skipped}/{len(results)} videos, skipped {skipped} unchanged videos, dropped {sum(result.dropped_ for result in results)} duplicate frames")
+        for result in failed:
+            print(f"Error: {result.video_path_} failed with {result.error_}")
+
+        return results
+
+    def ListVideos(self, src_path : str, dst_path : str) -> list[tuple[str, str]]:
+        """
+        List the video files of every week folder and the folder their images are saved to.
+
+        Args:
+            src_path (str): Path to the dataset folder.
+            dst_path (str): Path to save the extracted images.
+
+        Returns:
+            list[tuple[str, str]]: Video path and destination folder pairs.
+
+        :example:
+        >>> dataset_agent : VideoDatasetAgent = VideoDatasetAgent()
+        >>> jobs : list[tuple[str, str]] = dataset_agent.ListVideos("./datasets", "./bin")
         """
+        jobs : list[tuple[str, str]] = []
+
         # Read from this folder
         for week_folder in listdir(src_path):
             week_folder_path = join(src_path, week_folder)
@@ -83,30 +320,466 @@ class VideoDatasetAgent:
                     print(f"Warning: Invalid video file on {video_path}")
                     continue
 
-                print(f"Reading {video_path}")
+                jobs.append((video_path, f"{dst_path}/{week_folder}/{self.StripExtension(video, self.vid_extensions_)}"))
 
-                frames : list[ndarray] = self.image_agent_.LoadVideo(video_path, self.frame_rate_)
+        return jobs
 
-                self.SaveImages(frames, f"{dst_path}/{week_folder}/{self.StripExtension(video, self.vid_extensions_)}")
+    def SplitVideo(self, video_path : str, segment_length : float) -> list[tuple[int, int | None]]:
+        """
+        Split a video into segments of about segment_length seconds.
+        Segments are given as ranges of sample numbers so every segment saves the same image numbers as a serial run.
+        The last segment is open ended and runs to the end of the video, in case the container frame count is short.
+
+        Args:
+            video_path (str): Path to the video file.
+            segment_length (float): Length of a segment in seconds.
 
-                print(f"Saved {video_path} in {dst_path}/{week_folder}")
+        Returns:
+            list[tuple[int, int | None]]: First sample and stop sample of every segment.
 
-    
+        :example:
+        >>> dataset_agent : VideoDatasetAgent = VideoDatasetAgent()
+        >>> segments : list[tuple[int, int | None]] = dataset_agent.SplitVideo("datasets/week1/video1.mp4", 600) # [(0, 600), (600, None)]
+        """
+        assert segment_length > 0, "Invalid segment length"
+
+        try:
+            info : ImageAgent.VideoInfo = self.image_agent_.GetVideoInfo(video_path)
+        except Exception:
+            # Let the extraction report the error
+            return [(0, None)]
+
+        # Adaptive sampling depends on the previous kept frame, it can not start in the middle of the video
+        if info.fps_ <= 0 or info.duration_ <= segment_length or self.change_threshold_ > 0:
+            return [(0, None)]
+
+        # Target time of every sample, the frame rate is only used to place the segment bounds
+        times : Iterator[float] = self.image_agent_.IntervalTimes(self.interval_) if self.interval_ > 0 else (index / info.fps_ for index in self.SampleIndices())
+        bounds : list[int] = [0]
+        for sample, time in enumerate(times):
+            if time >= info.duration_:
+                break
+            if time >= len(bounds) * segment_length:
+                bounds.append(sample)
+
+        return [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1)] + [(bounds[-1], None)]
+
+    def ExtractVideo(self, video_path : str, dst_path : str, first_sample : int = 0, stop_sample : int | None = None, resume : bool = False) -> 'VideoDatasetAgent.VideoExtractResult':
+        """
+        Extract the images of a single video, or of the samples first_sample to stop_sample of it.
+        Errors are recorded in the result instead of raised so one bad video does not stop the others.
+        With resume the images already in dst_path are kept and the extraction continues after the last written one.
+        With dedup_threshold_ >= 0 near duplicate frames are not saved and their image numbers are skipped.
+
+        Args:
+            video_path (str): Path to the video file.
+            dst_path (str): Folder to save the images.
+            first_sample (int): Number of the first image to extract.
+            stop_sample (int | None): Number of the image to stop at, None extracts to the end of the video.
+            resume (bool): Continue after the images already in dst_path.
+
+        Returns:
+            VideoExtractResult: Number of images saved or the error.
+
+        :example:
+        >>> dataset_agent : VideoDatasetAgent = VideoDatasetAgent()
+        >>> result : VideoDatasetAgent.VideoExtractResult = dataset_agent.ExtractVideo("datasets/week1/video1.mp4", "bin/week1/video1")
+        """
+        reference : int | None = None # last kept image before a resumed segment, the reference for duplicates
+        if resume:
+            resume_sample : int = self.ResumeSample(dst_path, first_sample, stop_sample)
+            if stop_sample is not None and resume_sample >= stop_sample:
+                return VideoDatasetAgent.VideoExtractResult(video_path, dst_path, 0)
+            previous : int = max((number for number in self.ListImages(dst_path) if first_sample <= number < resume_sample), default=-1)
+            if previous >= 0:
+                reference = previous
+            first_sample = resume_sample
+
+        print(f"Reading {video_path}" if first_sample == 0 and stop_sample is None else f"Reading {video_path} from image {first_sample} to {stop_sample}")
+
+        dropped : int = 0
+
+        def KeepFrames() -> Iterator[tuple[int, ndarray]]:
+            # Drop frames whose perceptual hash is close to the last kept frame, dropped numbers are left out
+            nonlocal dropped
+            last_hash : int | None = None
+            if self.dedup_threshold_ >= 0 and reference is not None:
+                last_hash = self.image_agent_.ImageHash(self.LoadSavedImage(dst_path, reference))
+            for sample, _, frame in self.SampleVideo(video_path, first_sample, stop_sample):
+                if self.dedup_threshold_ >= 0:
+                    frame_hash : int = self.image_agent_.ImageHash(frame)
+                    if last_hash is not None and self.image_agent_.HashDistance(frame_hash, last_hash) <= self.dedup_threshold_:
+                        dropped += 1
+                        continue
+                    last_hash = frame_hash
+                yield sample, frame
+
+        # Every segment writes its own shards, named after its first image
+        writer : ShardWriter | None = ShardWriter(dst_path, f"{first_sample:07d}", self.shard_size_) if self.shard_size_ > 0 else None
+        try:
+            # Frames are streamed from the decoder and saved as they arrive
+            saved : int = self.SaveNumberedImages(KeepFrames(), dst_path, writer)
+        except Exception as error:
+            print(f"Error: Failed to extract {video_path}: {error!r}")
+            return VideoDatasetAgent.VideoExtractResult(video_path, dst_path, 0, repr(error), dropped=dropped)
+        finally:
+            if writer is not None:
+                writer.Close()
+
+        print(f"Saved {saved} images from {video_path} in {dst_path}" + (f", dropped {dropped} duplicates" if dropped else ""))
+        return VideoDatasetAgent.VideoExtractResult(video_path, dst_path, saved, dropped=dropped)
+
+    def ResumeSample(self, dst_path : str, first_sample : int, stop_sample : int | None) -> int:
+        """
+        Find the image to resume an interrupted extraction from.
+        The extraction continues at the first missing image after first_sample, or after the last written image
+        when duplicates are dropped or interval samples skipped. The images that were being written when the extraction stopped are written again,
+        since they may be truncated.
+
+        Args:
+            dst_path (str): Folder of the images.
+            first_sample (int): Number of the first image of the segment.
+            stop_sample (int | None): Number of the image the segment stops at.
+
+        Returns:
+            int: Number of the image to resume from.
+
+        :example:
+        >>> dataset_agent : VideoDatasetAgent = VideoDatasetAgent()
+        >>> first_sample : int = dataset_agent.ResumeSample("bin/week1/video1", 0, None)
+        """
+        written : set[int] = set(self.ListImages(dst_path))
+        sample : int = first_sample
+        if self.dedup_threshold_ >= 0 or self.interval_ > 0:
+            # Dropped duplicates and skipped interval samples leave gaps, continue after the last written image
+            sample = max((number + 1 for number in written if number >= first_sample and (stop_sample is None or number < stop_sample)), default=first_sample)
+        while sample in written and (stop_sample is None or sample < stop_sample):
+            sample += 1
+
+        if sample == first_sample:
+            return first_sample
+        return max(first_sample, sample - max(self.encode_threads_ * 2, 1))
+
+    def ListImages(self, dst_path : str) -> list[int]:
+        """
+        List the numbers of the images saved in a folder, as files or in shards with an index.
+
+        Args:
+            dst_path (str): Folder of the images.
+
+        Returns:
+            list[int]: Image numbers, empty if the folder does not exist.
+
+        :example:
+        >>> dataset_agent : VideoDatasetAgent = VideoDatasetAgent()
+        >>> numbers : list[int] = dataset_agent.ListImages("bin/week1/video1") # [0, 1, 2]
+        """
+        if not exists(dst_path):
+            return []
+
+        suffix : str = f".{self.img_extensions_}"
+        names : set[str] = set(listdir(dst_path))
+        with ShardReader(dst_path) as reader:
+            names.update(reader.Keys())
+        return [int(name[:-len(suffix)]) for name in names if name.endswith(suffix) and name[:-len(suffix)].isdigit()]
+
+    def CheckVideo(self, video_path : str, record : dict | None) -> tuple['VideoDatasetAgent.VideoStateEnum', dict]:
+        """
+        Compare a video with its manifest record from a previous run.
+        The content hash is only computed when the size or modification time changed, or for new videos.
+
+        Args:
+            video_path (str): Path to the video file.
+            record (dict | None): Manifest record of the video, None for new videos.
+
+        Returns:
+            tuple[VideoStateEnum, dict]: State of the video and its updated manifest record.
+
+        :example:
+        >>> dataset_agent : VideoDatasetAgent = VideoDatasetAgent()
+        >>> state, record = dataset_agent.CheckVideo("datasets/week1/video1.mp4", None) # VideoStateEnum.changed_
+        """
+        video_stat = stat(video_path)
+        settings : dict = self.ExtractSettings()
+
+        if record is not None and record["settings"] == settings:
+            same_content : bool = record["size"] == video_stat.st_size and record["mtime"] == video_stat.st_mtime
+            if not same_content and record["size"] == video_stat.st_size:
+                # Touched or copied file, compare the content
+                same_content = record["hash"] == self.HashFile(video_path)
+
+            if same_content:
+                record = dict(record, mtime=video_stat.st_mtime)
+                state : VideoDatasetAgent.VideoStateEnum = VideoDatasetAgent.VideoStateEnum.complete_ if record["complete"] else VideoDatasetAgent.VideoStateEnum.partial_
+                return state, record
+
+        return VideoDatasetAgent.VideoStateEnum.changed_, {
+            "size" : video_stat.st_size,
+            "mtime" : video_stat.st_mtime,
+            "hash" : self.HashFile(video_path),
+            "settings" : settings,
+            "frames" : 0,
+            "complete" : False,
+        }
+
+    def ExtractSettings(self) -> dict:
+        """
+        Settings that change the extracted images, a video is extracted again when they change.
+        The interpolation is only recorded with a size, frames that are not resized do not depend on it.
+
+        Returns:
+            dict: Sampling and output settings.
+        """
+        settings : dict = {
+            "frame_rate" : self.frame_rate_,
+            "interval" : self.interval_,
+            "img_extensions" : self.img_extensions_,
+            "dedup_threshold" : self.dedup_threshold_,
+            "change_threshold" : self.change_threshold_,
+            "min_interval" : self.min_interval_,
+            "max_interval" : self.max_interval_,
+            "size" : None if self.size_ is None else [self.size_.width_, self.size_.height_],
+            "encode_options" : None if self.encode_options_ is None else vars(self.encode_options_),
+            "shard_size" : self.shard_size_,
+        }
+        if self.size_ is not None:
+            settings["interpolation"] = self.interpolation_.name
+        return settings
+
+    def LoadSavedImage(self, dst_path : str, number : int) -> ndarray:
+        """
+        Load an extracted image from a file or, when shard_size_ > 0, from the shards of the folder.
+
+        Args:
+            dst_path (str): Folder of the images.
+            number (int): Number of the image.
+
+        Returns:
+            ndarray: Loaded image.
+
+        :example:
+        >>> dataset_agent : VideoDatasetAgent = VideoDatasetAgent()
+        >>> image : ndarray = dataset_agent.LoadSavedImage("bin/week1/video1", 0)
+        """
+        name : str = f"{number:07d}.{self.img_extensions_}"
+        if self.shard_size_ <= 0:
+            return self.image_agent_.LoadImage(f"{dst_path}/{name}", ImageAgent.ColorModeEnum.rgb_)
+        with ShardReader(dst_path) as reader:
+            return self.image_agent_.LoadShardImage(reader, name, ImageAgent.ColorModeEnum.rgb_)
+
+    def HashFile(self, path : str) -> str:
+        """
+        Hash the content of a file.
+
+        Args:
+            path (str): Path to the file.
+
+        Returns:
+            str: BLAKE2b hex digest of the file.
+        """
+        digest = blake2b()
+        with open(path, "rb") as file:
+            while chunk := file.read(1 << 20):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def LoadManifest(self, dst_path : str) -> dict[str, dict]:
+        """
+        Load the extraction manifest of a destination folder.
+
+        Args:
+            dst_path (str): Path of the extracted images.
+
+        Returns:
+            dict[str, dict]: Manifest records by video path relative to the source folder, empty if there is no manifest.
+        """
+        manifest_path : str = join(dst_path, self.manifest_name_)
+        if not exists(manifest_path):
+            return {}
+        with open(manifest_path, "r") as file:
+            return load(file)
+
+    def SaveManifest(self, dst_path : str, manifest : dict[str, dict]) -> None:
+        """
+        Save the extraction manifest of a destination folder.
+        The manifest is written to a temporary file first so an interruption never leaves a truncated manifest.
+
+        Args:
+            dst_path (str): Path of the extracted images.
+            manifest (dict[str, dict]): Manifest records by video path relative to the source folder.
+        """
+        makedirs(dst_path, exist_ok=True)
+        manifest_path : str = join(dst_path, self.manifest_name_)
+        with open(f"{manifest_path}.tmp", "w") as file:
+            dump(manifest, file, indent=4)
+        replace(f"{manifest_path}.tmp", manifest_path)
+
+    @staticmethod
+    def InitWorker(cv_threads : int) -> None:
+        """
+        Initialize a worker process.
+        Caps the OpenCV thread pool so the worker processes do not oversubscribe the cores.
+
+        Args:
+            cv_threads (int): Number of OpenCV threads in the worker.
+        """
+        setNumThreads(cv_threads)
+
+    def SampleVideo(self, video_path : str, first_sample : int = 0, stop_sample : int | None = None) -> Iterator[tuple[int, float, ndarray]]:
+        """
+        Iterate over the frames of a video selected by the sampling settings, numbered by sample.
+        Uses interval_ seconds between frames when set, selected by the frame timestamps so variable frame rate videos keep
+        wall clock intervals, otherwise one frame every frame_rate_ frames. An interval sample whose target time falls on the frame
+        of the previous sample is skipped and leaves a gap in the numbers, so every number always stands for the same target time.
+        With change_threshold_ > 0 these frames are only candidates and a frame is kept when the scene changed.
+        When first_sample > 0 the capture is seeked straight to the first selected frame, adaptive sampling has to read the frames before it.
+
+        Args:
+            video_path (str): Path to the video file.
+            first_sample (int): Number of the first sample to read.
+            stop_sample (int | None): Number of the sample to stop at, None reads to the end of the video.
 
-    def SaveImages(self, frames : list[ndarray], dst_path : str):
+        Yields:
+            tuple[int, float, ndarray]: Sample number, saved as the image number, timestamp in seconds and frame.
+
+        :example:
+        >>> dataset_agent : VideoDatasetAgent = VideoDatasetAgent(interval=3.0)
+        >>> for sample, timestamp, frame in dataset_agent.SampleVideo("video.mp4"):
+        >>>     print(sample, timestamp)
+        """
+        # None never seeks with frame_rate_, IterVideoTimes seeks past more than one second of video with interval_
+        seek_threshold : int = self.seek_threshold_ if self.seek_threshold_ is not None else 0
+
+        if self.change_threshold_ > 0:
+            if self.interval_ > 0:
+                candidates : Iterator[tuple[int, float, ndarray]] = self.image_agent_.IterVideoTimes(video_path, self.image_agent_.IntervalTimes(self.interval_), self.seek_threshold_)
+            else:
+                candidates = self.image_agent_.IterVideoFrames(video_path, self.SampleIndices(), seek_threshold)
+            kept : Iterator[tuple[int, float, ndarray]] = self.image_agent_.SelectChangedFrames(candidates, self.change_threshold_, self.min_interval_, self.max_interval_)
+            return ((sample, timestamp, frame) for sample, (_, timestamp, frame) in enumerate(islice(kept, first_sample, stop_sample), first_sample))
+
+        if self.interval_ > 0:
+            times : Iterator[float] = islice(self.image_agent_.IntervalTimes(self.interval_), first_sample, stop_sample)
+            previous_time : float | None = (first_sample - 1) * self.interval_ if first_sample > 0 else None
+            frames : Iterator[tuple[int, float, ndarray]] = self.image_agent_.IterVideoTimes(video_path, times, self.seek_threshold_, previous_time)
+            return ((first_sample + sample, timestamp, frame) for sample, timestamp, frame in frames)
+
+        frame_indices : Iterator[int] = islice(self.SampleIndices(), first_sample, stop_sample)
+        frames = self.image_agent_.IterVideoFrames(video_path, frame_indices, seek_threshold, first_sample * self.frame_rate_)
+        return ((sample, timestamp, frame) for sample, (_, timestamp, frame) in enumerate(frames, first_sample))
+
+    def SampleIndices(self) -> Iterator[int]:
+        """
+        Indices of the frames selected by frame_rate_, the n-th index is saved as image n. Interval sampling selects frames by timestamp instead.
+
+        Yields:
+            int: Frame index.
+
+        :example:
+        >>> dataset_agent : VideoDatasetAgent = VideoDatasetAgent(frame_rate=60)
+        >>> indices : Iterator[int] = dataset_agent.SampleIndices() # 0, 60, 120, ...
+        """
+        assert self.frame_rate_ > 0, "Invalid frame rate"
+        return count(0, self.frame_rate_)
+
+    def SaveImages(self, frames : Iterable[ndarray], dst_path : str, start : int = 0) -> int:
         """
         Save the extracted images.
+        Frames may be a list or a generator, each frame is written as soon as it is received.
 
         Args:
-            frames (list[ndarray]): Extracted images.
+            frames (Iterable[ndarray]): Extracted images.
             dst_path (str): Path to save the images.
+            start (int): Number of the first image.
+
+        Returns:
+            int: Number of images saved.
 
         :example:
         >>> dataset_agent : VideoDatasetAgent = VideoDatasetAgent()
         >>> dataset_agent.SaveImages(frames, dst_path)
         """
-        for i, frame in enumerate(frames):
-            self.image_agent_.SaveImage(f"{dst_path}/{i:07d}.{self.img_extensions_}", frame)
+        return self.SaveNumberedImages(enumerate(frames, start), dst_path)
+
+    def SaveNumberedImages(self, frames : Iterable[tuple[int, ndarray]], dst_path : str, writer : ShardWriter | None = None) -> int:
+        """
+        Save the extracted images under their own numbers.
+        With encode_threads_ > 0 frames are handed to a thread pool through a bounded queue,
+        so decoding the next frames overlaps with encoding and the number of frames in memory stays constant.
+
+        Args:
+            frames (Iterable[tuple[int, ndarray]]): Image numbers and extracted images.
+            dst_path (str): Path to save the images.
+            writer (ShardWriter | None): Shard writer to pack the images into, None saves one file per image.
+
+        Returns:
+            int: Number of images saved.
+
+        :example:
+        >>> dataset_agent : VideoDatasetAgent = VideoDatasetAgent()
+        >>> dataset_agent.SaveNumberedImages([(0, frame0), (2, frame2)], dst_path)
+        """
+        saved : int = 0
+        buffers : local = local() # resize buffer of every encoding thread
+
+        if self.encode_threads_ <= 0:
+            for number, frame in frames:
+                self.SaveFrame(f"{dst_path}/{number:07d}.{self.img_extensions_}", frame, buffers, writer)
+                saved += 1
+            return saved
+
+        makedirs(dst_path, exist_ok=True)
+
+        # Backpressure, the decoder blocks while this many frames wait to be encoded
+        pending : BoundedSemaphore = BoundedSemaphore(self.encode_threads_ * 2)
+        futures : deque[Future] = deque()
+
+        with ThreadPoolExecutor(max_workers=self.encode_threads_) as executor:
+            for number, frame in frames:
+                pending.acquire()
+                future : Future = executor.submit(self.SaveFrame, f"{dst_path}/{number:07d}.{self.img_extensions_}", frame, buffers, writer)
+                future.add_done_callback(lambda _: pending.release())
+                futures.append(future)
+                saved += 1
+
+                # Raise encoding errors early and drop finished futures
+                while futures and futures[0].done():
+                    futures.popleft().result()
+
+        for future in futures:
+            future.result()
+
+        return saved
+
+    def SaveFrame(self, path : str, frame : ndarray, buffers : local, writer : ShardWriter | None = None) -> None:
+        """
+        Resize a frame to size_ if set and save it.
+        Every thread resizes into its own buffer from buffers, allocated once and reused for every frame of the same shape.
+        With a writer the frame is encoded in memory and appended to the shard under the file name of path.
+
+        Args:
+            path (str): Path to save the image.
+            frame (ndarray): Extracted frame.
+            buffers (local): Thread local storage for the resize buffers.
+            writer (ShardWriter | None): Shard writer to pack the image into, None saves the file.
+
+        :example:
+        >>> dataset_agent : VideoDatasetAgent = VideoDatasetAgent(size=Size(640, 360))
+        >>> dataset_agent.SaveFrame("bin/week1/video1/0000000.png", frame, local())
+        """
+        if self.size_ is not None:
+            shape : tuple[int, ...] = (self.size_.height_, self.size_.width_) + frame.shape[2:]
+            buffer : ndarray | None = getattr(buffers, "frame", None)
+            if buffer is None or buffer.shape != shape or buffer.dtype != frame.dtype:
+                buffer = empty(shape, dtype=frame.dtype)
+                buffers.frame = buffer
+            frame = self.image_agent_.ResizeImage(frame, self.size_, self.interpolation_, buffer)
+
+        if writer is not None:
+            writer.Write(basename(path), self.image_agent_.EncodeImage(frame, f".{self.img_extensions_}", self.encode_options_).tobytes())
+            return
+
+        self.image_agent_.SaveImage(path, frame, self.encode_options_)
 
     def StripExtension(self, path : str, extensions : tuple[str, ...] | str) -> str:
         """
@@ -130,4 +803,315 @@ class VideoDatasetAgent:
         for ext in extensions:
             if path.endswith(ext):
                 return path.replace(ext, "")
-        return path
\ No newline at end of file
+        return path
+
+
+class YoloMaskAgent:
+    """
+    Agent for YOLO segmentation datasets.
+    Used for creating black and white plant masks and background removed images from the polygon labels.
+
+    Attributes:
+        image_agent_ (ImageAgent): Image agent for image operations.
+        image_folder_name_ (str): Name of the image folder of every split.
+        label_folder_name_ (str): Name of the label folder of every split.
+        mask_dir_name_ (str): Name of the output folder of the masks.
+        bgrm_dir_name_ (str): Name of the output folder of the background removed images.
+        index_dir_name_ (str): Name of the output folder of the label indexes.
+        remove_background_ (bool): Save background removed images next to the masks.
+        label_indexes_ (dict[str, YoloLabelIndex]): Open label index of every label folder.
+        refresh_labels_ (bool): Check the label indexes against the label files when opening them, off in worker processes.
+
+    Classes:
+        YoloMaskResult: Result of converting a single image.
+
+    Methods:
+        MaskExtract: Create the masks of every split of the dataset.
+        ListPairs: List the image and label pairs and their output paths.
+        ConvertImage: Create the mask and background removed image of a single image.
+        YoloToMask: Draw the polygons of a label file into a mask.
+        LabelIndex: Open the label index of a label folder.
+
+    :example:
+    >>> yolo_agent : YoloMaskAgent = YoloMaskAgent()
+    """
+
+    class YoloMaskResult:
+        """
+        Result of converting a single image.
+
+        Attributes:
+            image_path_ (str): Path to the image file.
+            error_ (str | None): Error message if the conversion failed.
+        """
+
+        def __init__(self, image_path : str, error : str | None = None) -> None:
+            self.image_path_ : str = image_path
+            self.error_ : str | None = error
+
+    def __init__(self, image_folder_name : str = "images", label_folder_name : str = "labels", mask_dir_name : str = "mask", bgrm_dir_name : str = "bgrm", index_dir_name : str = "labels.index", remove_background : bool = True) -> None:
+        """
+        Initialize the YOLO mask agent.
+
+        Args:
+            image_folder_name (str): Name of the image folder of every split.
+            label_folder_name (str): Name of the label folder of every split.
+            mask_dir_name (str): Name of the output folder of the masks.
+            bgrm_dir_name (str): Name of the output folder of the background removed images.
+            index_dir_name (str): Name of the output folder of the label indexes, with a folder per split, an absolute path keeps them outside the output.
+            remove_background (bool): Save background removed images next to the masks, False only saves the masks.
+
+        :example:
+        >>> yolo_agent : YoloMaskAgent = YoloMaskAgent(remove_background=False)
+        """
+        self.image_agent_ : ImageAgent = ImageAgent()
+        self.image_folder_name_ : str = image_folder_name
+        self.label_folder_name_ : str = label_folder_name
+        self.mask_dir_name_ : str = mask_dir_name
+        self.bgrm_dir_name_ : str = bgrm_dir_name
+        self.index_dir_name_ : str = index_dir_name
+        self.remove_background_ : bool = remove_background
+        self.label_indexes_ : dict[str, YoloLabelIndex] = {}
+        self.refresh_labels_ : bool = True
+
+    def __getstate__(self) -> dict:
+        # Sent once to every worker process, which memory maps the label indexes the run already refreshed, see InitMaskWorker
+        state : dict = self.__dict__.copy()
+        state["label_indexes_"] = {}
+        state["refresh_labels_"] = False
+        return state
+
+    def MaskExtract(self, *, src_path : str = "data-test2", dst_path : str = "bg_bin", splits : tuple[str, ...] = ("test", "train", "valid"), workers : int = 1, cv_threads : int = 1, chunk_size : int = 64, progress_every : int = 1000) -> list['YoloMaskAgent.YoloMaskResult']:
+        """
+        Create the masks and background removed images of every split of the dataset.
+        With workers > 1 the images are converted in a process pool, in chunks of chunk_size images per task.
+        Progress is printed for the whole dataset every progress_every images instead of once per image.
+
+        Dataset Source Structure:
+        - data-test2
+            - train
+                - images
+                    - image1.jpg
+                - labels
+                    - image1.txt
+
+        Destination Structure:
+        - bg_bin
+            - mask
+                - image1.jpg
+            - bgrm
+                - image1.jpg
+            - labels.index
+                - train
+
+        Args:
+            src_path (str): Path to the dataset folder.
+            dst_path (str): Path to save the masks and images.
+            splits (tuple[str, ...]): Split folders to convert.
+            workers (int): Number of worker processes, 1 converts serially in this process.
+            cv_threads (int): OpenCV threads per worker process.
+            chunk_size (int): Images sent to a worker process at once.
+            progress_every (int): Print the progress after this many images.
+
+        Returns:
+            list[YoloMaskResult]: Result of every image in listing order.
+
+        :example:
+        >>> yolo_agent : YoloMaskAgent = YoloMaskAgent()
+        >>> results : list[YoloMaskAgent.YoloMaskResult] = yolo_agent.MaskExtract(src_path="data-test2", dst_path="bg_bin", workers=8)
+        """
+        assert workers > 0, "Invalid number of workers"
+        assert chunk_size > 0, "Invalid chunk size"
+
+        pairs : list[tuple[str, str, str, str]] = self.ListPairs(src_path, dst_path, splits)
+        # Parse new and changed label files once before the workers start, the indexes are kept with the output
+        index_dirs : dict[str, str] = {label_dir: join(dst_path, self.index_dir_name_, basename(dirname(label_dir))) for label_dir in sorted({dirname(label_path) for _, label_path, _, _ in pairs})}
+        self.label_indexes_ = {}
+        for label_dir, index_dir in index_dirs.items():
+            self.LabelIndex(label_dir, index_dir)
+        makedirs(join(dst_path, self.mask_dir_name_), exist_ok=True)
+        if self.remove_background_:
+            makedirs(join(dst_path, self.bgrm_dir_name_), exist_ok=True)
+
+        results : list[YoloMaskAgent.YoloMaskResult] = []
+        failed : int = 0
+        start : float = perf_counter()
+
+        def Progress(done : int) -> None:
+            elapsed : float = perf_counter() - start
+            print(f"Converted {done}/{len(pairs)} images, {failed} failed, {done / elapsed if elapsed > 0 else 0:.1f} images/s")
+
+        if workers == 1:
+            converted : Iterator[YoloMaskAgent.YoloMaskResult] = (self.ConvertImage(*pair) for pair in pairs)
+            executor : ProcessPoolExecutor | None = None
+        else:
+            # The agent and its open label indexes are set up once per worker process, the tasks only carry the paths
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=InitMaskWorker, initargs=(self, cv_threads, index_dirs))
+            converted = executor.map(ConvertMaskPair, pairs, chunksize=chunk_size)
+
+        try:
+            for result in converted:
+                results.append(result)
+                failed += result.error_ is not None
+                if len(results) % progress_every == 0:
+                    Progress(len(results))
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        Progress(len(results))
+        for result in results:
+            if result.error_ is not None:
+                print(f"Error: {result.image_path_} failed with {result.error_}")
+
+        return results
+
+    def ListPairs(self, src_path : str, dst_path : str, splits : tuple[str, ...]) -> list[tuple[str, str, str, str]]:
+        """
+        List the images of every split with their label file and output paths.
+
+        Args:
+            src_path (str): Path to the dataset folder.
+            dst_path (str): Path to save the masks and images.
+            splits (tuple[str, ...]): Split folders to list.
+
+        Returns:
+            list[tuple[str, str, str, str]]: Image path, label path, background removed image path and mask path.
+
+        :example:
+        >>> yolo_agent : YoloMaskAgent = YoloMaskAgent()
+        >>> pairs : list[tuple[str, str, str, str]] = yolo_agent.ListPairs("data-test2", "bg_bin", ("train",))
+        """
+        pairs : list[tuple[str, str, str, str]] = []
+        for split in splits:
+            image_dir : str = join(src_path, split, self.image_folder_name_)
+            label_dir : str = join(src_path, split, self.label_folder_name_)
+            if not isdir(image_dir):
+                print(f"Warning: Split folder {image_dir} not found")
+                continue
+
+            for image_name in sorted(listdir(image_dir)):
+                label_path : str = join(label_dir, image_name.rsplit(".", 1)[0] + ".txt")
+                pairs.append((join(image_dir, image_name), label_path, join(dst_path, self.bgrm_dir_name_, image_name), join(dst_path, self.mask_dir_name_, image_name)))
+
+        return pairs
+
+    def ConvertImage(self, image_path : str, label_path : str, output_image_path : str, output_mask_path : str) -> 'YoloMaskAgent.YoloMaskResult':
+        """
+        Create the mask and background removed image of a single image, the image is decoded once for both.
+        Without remove_background_ the image is not decoded, its size is read from the header.
+        The label index of the folder has to be opened with LabelIndex first, MaskExtract opens them.
+        A failed image returns its error in the result, MaskExtract lists the failures at the end of the run.
+
+        Args:
+            image_path (str): Path to the image file.
+            label_path (str): Path to the YOLO segmentation label file.
+            output_image_path (str): Path to save the background removed image.
+            output_mask_path (str): Path to save the mask.
+
+        Returns:
+            YoloMaskResult: Result of the conversion.
+
+        :example:
+        >>> yolo_agent : YoloMaskAgent = YoloMaskAgent()
+        >>> yolo_agent.LabelIndex("train/labels", "bg_bin/labels.index/train")
+        >>> result : YoloMaskAgent.YoloMaskResult = yolo_agent.ConvertImage("train/images/a.jpg", "train/labels/a.txt", "bg_bin/bgrm/a.jpg", "bg_bin/mask/a.jpg")
+        """
+        try:
+            if basename(label_path)[:-len(".txt")] not in self.LabelIndex(dirname(label_path)):
+                raise IOError(f"Label file {label_path} not found")
+
+            if not self.remove_background_:
+                # Masks only need the image size, read it from the header without decoding the pixels
+                size : Size[int] = self.image_agent_.ProbeImageSize(image_path)
+                if not imwrite(output_mask_path, self.YoloToMask(label_path, size.height_, size.width_)):
+                    raise IOError(f"Failed to write {output_mask_path}")
+                return YoloMaskAgent.YoloMaskResult(image_path)
+
+            loaded : ImageAgent.LoadResult = self.image_agent_.TryLoadImage(0, image_path, ImageAgent.ColorModeEnum.rgb_)
+            if loaded.error_ is not None:
+                raise IOError(loaded.error_)
+            image : ndarray = loaded.image_
+            mask : ndarray = self.YoloToMask(label_path, image.shape[0], image.shape[1])
+
+            if not imwrite(output_mask_path, mask):
+                raise IOError(f"Failed to write {output_mask_path}")
+            if not imwrite(output_image_path, bitwise_and(image, image, mask=mask)):
+                raise IOError(f"Failed to write {output_image_path}")
+        except Exception as error:
+            return YoloMaskAgent.YoloMaskResult(image_path, repr(error))
+
+        return YoloMaskAgent.YoloMaskResult(image_path)
+
+    def YoloToMask(self, label_path : str, height : int, width : int) -> ndarray:
+        """
+        Draw the polygons of a YOLO segmentation label file into a mask, reading them from the label index.
+        Polygons with fewer than 3 points are bounding boxes mixed into the labels and are dropped in bulk by the index,
+        the rest are filled with one fillPoly call per group of non overlapping polygons.
+
+        Args:
+            label_path (str): Path to the label file.
+            height (int): Height of the image.
+            width (int): Width of the image.
+
+        Returns:
+            ndarray: Mask with the polygons filled white.
+
+        :example:
+        >>> yolo_agent : YoloMaskAgent = YoloMaskAgent()
+        >>> yolo_agent.LabelIndex("train/labels", "bg_bin/labels.index/train")
+        >>> mask : ndarray = yolo_agent.YoloToMask("train/labels/a.txt", 1080, 1920)
+        """
+        _, offsets, points, boxes = self.LabelIndex(dirname(label_path)).PixelPolygons(basename(label_path)[:-len(".txt")], width, height)
+        return self.image_agent_.FillPolygons(zeros((height, width), dtype=uint8), points, offsets, boxes)
+
+    def LabelIndex(self, label_dir : str, index_dir : str | None = None) -> YoloLabelIndex:
+        """
+        Open the label index of a label folder, building or refreshing it the first time it is opened in the run.
+
+        Args:
+            label_dir (str): Folder of the label files.
+            index_dir (str | None): Folder of the index files, needed the first time the folder is opened.
+
+        Returns:
+            YoloLabelIndex: Label index of the folder.
+
+        :example:
+        >>> yolo_agent : YoloMaskAgent = YoloMaskAgent()
+        >>> index : YoloLabelIndex = yolo_agent.LabelIndex("data-test2/train/labels", "bg_bin/labels.index/train")
+        """
+        if label_dir not in self.label_indexes_:
+            assert index_dir is not None, f"Label index of {label_dir} not opened"
+            self.label_indexes_[label_dir] = YoloLabelIndex(label_dir, index_dir, refresh=self.refresh_labels_)
+        return self.label_indexes_[label_dir]
+
+
+# Agent of a YoloMaskAgent.MaskExtract worker process, set once per process by InitMaskWorker
+mask_worker : YoloMaskAgent | None = None
+
+def InitMaskWorker(yolo_agent : YoloMaskAgent, cv_threads : int, index_dirs : dict[str, str]) -> None:
+    """
+    Initialize a worker process of YoloMaskAgent.MaskExtract, the label indexes stay open for all the tasks of the process.
+
+    Args:
+        yolo_agent (YoloMaskAgent): Agent sent to the worker, without its open label indexes.
+        cv_threads (int): Number of OpenCV threads in the worker.
+        index_dirs (dict[str, str]): Index folder of every label folder of the images converted by the run.
+    """
+    global mask_worker
+    setNumThreads(cv_threads)
+    for label_dir, index_dir in index_dirs.items():
+        yolo_agent.LabelIndex(label_dir, index_dir)
+    mask_worker = yolo_agent
+
+def ConvertMaskPair(pair : tuple[str, str, str, str]) -> YoloMaskAgent.YoloMaskResult:
+    """
+    Convert a single image in a worker process with the agent of InitMaskWorker.
+
+    Args:
+        pair (tuple[str, str, str, str]): Image path, label path, background removed image path and mask path.
+
+    Returns:
+        YoloMaskResult: Result of the conversion.
+    """
+    return mask_worker.ConvertImage(*pair)
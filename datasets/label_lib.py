@@ -0,0 +1,286 @@
+# python version : 3.12.6
+
+from os import listdir, makedirs, stat, replace
+from os.path import join, exists, isdir
+from json import load, dump
+from numpy import ndarray, array, empty, zeros, repeat, diff, minimum, maximum, float32, int32, int64, load as load_array, save as save_array, concatenate, cumsum
+
+
+class YoloLabelIndex:
+    """
+    Columnar index of the YOLO segmentation labels of a folder.
+    Every label file is parsed once into flat NumPy arrays, saved to an index folder chosen by the caller and memory mapped by the next runs.
+    The index is rebuilt when a label file is added, removed or its modification time or size changed.
+    A missing label folder gives an empty index and nothing is written.
+
+    Index Structure:
+    - labels
+        - image1.txt
+    - index_dir
+        - coords.npy        (M, 2) float32 normalized x, y of every polygon point
+        - point_offsets.npy (P + 1,) int64 first point of every polygon in coords
+        - class_ids.npy     (P,) int32 class of every polygon
+        - file_offsets.npy  (F + 1,) int64 first polygon of every file
+        - index.json        file names, modification times and sizes, written last
+
+    Attributes:
+        label_dir_ (str): Folder of the label files.
+        index_dir_ (str): Folder of the index files.
+        names_ (list[str]): Label file names without the .txt extension, in index order.
+        coords_ (ndarray): Normalized x, y of every polygon point.
+        point_offsets_ (ndarray): First point of every polygon in coords_.
+        class_ids_ (ndarray): Class of every polygon.
+        file_offsets_ (ndarray): First polygon of every file.
+
+    Methods:
+        Lookup: Polygons of a label file as columnar arrays.
+        Polygons: Polygons of a label file as a list of point arrays.
+        PixelPolygons: Valid polygons of a label file in pixel coordinates with their bounding boxes.
+        Names: Label file names in the index.
+        Stale: Check the index against the label files.
+        Build: Parse every label file and save the index.
+        Load: Memory map the saved index.
+        ParseFile: Parse a single label file.
+
+    :example:
+    >>> index: YoloLabelIndex = YoloLabelIndex("data-test2/train/labels", "bg_bin/labels.index/train")
+    >>> class_ids, offsets, coords = index.Lookup("image1")
+    """
+
+    arrays_: tuple[str, ...] = ("coords", "point_offsets", "class_ids", "file_offsets")
+
+    def __init__(self, label_dir: str, index_dir: str, refresh: bool = True) -> None:
+        """
+        Constructor for YoloLabelIndex class, loads the saved index or builds it.
+
+        Args:
+            label_dir (str): Folder of the label files.
+            index_dir (str): Folder of the index files, every label folder needs its own.
+            refresh (bool): Rebuild the index when it is missing or stale, False loads the saved index without checking it,
+                for worker processes of a run that already refreshed it.
+
+        :example:
+        >>> index: YoloLabelIndex = YoloLabelIndex("data-test2/train/labels", "bg_bin/labels.index/train")
+        """
+        self.label_dir_: str = label_dir.rstrip("/")
+        self.index_dir_: str = index_dir
+        self.names_: list[str] = []
+        self.positions_: dict[str, int] = {}
+        self.coords_: ndarray = empty((0, 2), dtype=float32)
+        self.point_offsets_: ndarray = zeros(1, dtype=int64)
+        self.class_ids_: ndarray = empty(0, dtype=int32)
+        self.file_offsets_: ndarray = zeros(1, dtype=int64)
+
+        if not isdir(self.label_dir_):
+            print(f"Warning: Label folder {self.label_dir_} not found")
+            return
+        if refresh and self.Stale():
+            self.Build()
+        self.Load()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.positions_
+
+    def __len__(self) -> int:
+        return len(self.names_)
+
+    def Lookup(self, name: str) -> tuple[ndarray, ndarray, ndarray]:
+        """
+        Polygons of a label file as columnar arrays, views into the memory mapped index.
+
+        Args:
+            name (str): Label file name without the .txt extension.
+
+        Returns:
+            tuple[ndarray, ndarray, ndarray]: Class ids (P,), point offsets (P + 1,) starting at 0 and normalized points (M, 2).
+
+        :example:
+        >>> class_ids, offsets, coords = index.Lookup("image1")
+        >>> first_polygon: ndarray = coords[offsets[0]:offsets[1]]
+        """
+        assert name in self.positions_, f"Label {name} not found"
+        position: int = self.positions_[name]
+        first, stop = self.file_offsets_[position], self.file_offsets_[position + 1]
+        offsets: ndarray = self.point_offsets_[first:stop + 1]
+        return self.class_ids_[first:stop], offsets - offsets[0], self.coords_[offsets[0]:offsets[-1]]
+
+    def Polygons(self, name: str) -> list[tuple[int, ndarray]]:
+        """
+        Polygons of a label file as a list of class ids and point arrays.
+
+        Args:
+            name (str): Label file name without the .txt extension.
+
+        Returns:
+            list[tuple[int, ndarray]]: Class id and normalized (N, 2) float32 points of every polygon.
+
+        :example:
+        >>> for class_id, points in index.Polygons("image1"):
+        >>>     print(class_id, len(points))
+        """
+        class_ids, offsets, coords = self.Lookup(name)
+        return [(int(class_ids[i]), coords[offsets[i]:offsets[i + 1]]) for i in range(len(class_ids))]
+
+    def PixelPolygons(self, name: str, width: int, height: int) -> tuple[ndarray, ndarray, ndarray, ndarray]:
+        """
+        Polygons of a label file scaled to pixel coordinates, with the bounding box of every polygon.
+        Polygons with fewer than 3 points are bounding boxes or degenerate entries mixed into the labels and are dropped in bulk.
+        The boxes match cv2.boundingRect of every polygon, computed with one reduction over all the points of the file.
+
+        Args:
+            name (str): Label file name without the .txt extension.
+            width (int): Width of the image.
+            height (int): Height of the image.
+
+        Returns:
+            tuple[ndarray, ndarray, ndarray, ndarray]: Class ids (N,), point offsets (N + 1,) starting at 0,
+                int32 pixel points (M, 2) and int32 boxes (N, 4) of x, y, width, height.
+
+        :example:
+        >>> class_ids, offsets, points, boxes = index.PixelPolygons("image1", 1920, 1080)
+        >>> first_polygon: ndarray = points[offsets[0]:offsets[1]]
+        """
+        class_ids, offsets, coords = self.Lookup(name)
+        counts: ndarray = diff(offsets)
+        valid: ndarray = counts >= 3
+        # Convert normalized coordinates to pixel coordinates, truncated like a per polygon conversion
+        points: ndarray = (coords[repeat(valid, counts)] * array([width, height], dtype=float32)).astype(int32)
+        counts = counts[valid]
+        offsets = concatenate([zeros(1, dtype=int64), cumsum(counts)])
+
+        boxes: ndarray = empty((len(counts), 4), dtype=int32)
+        if len(counts):
+            low: ndarray = minimum.reduceat(points, offsets[:-1], axis=0)
+            high: ndarray = maximum.reduceat(points, offsets[:-1], axis=0)
+            boxes[:, :2] = low
+            boxes[:, 2:] = high - low + 1
+        return class_ids[valid], offsets, points, boxes
+
+    def Names(self) -> list[str]:
+        """
+        Label file names in the index.
+
+        Returns:
+            list[str]: Names without the .txt extension.
+        """
+        return list(self.names_)
+
+    def Stale(self) -> bool:
+        """
+        Check the saved index against the label files, by name, modification time and size.
+
+        Returns:
+            bool: True if the index is missing or a label file was added, removed or changed.
+        """
+        sidecar: str = join(self.index_dir_, "index.json")
+        if not exists(sidecar):
+            return True
+        with open(sidecar, "r") as file:
+            saved: dict = load(file)
+
+        files: list[str] = self.ListFiles()
+        if [name for name, _, _ in saved["files"]] != files:
+            return True
+        for (name, mtime, size), file_name in zip(saved["files"], files):
+            file_stat = stat(join(self.label_dir_, f"{file_name}.txt"))
+            if file_stat.st_mtime_ns != mtime or file_stat.st_size != size:
+                return True
+        return False
+
+    def ListFiles(self) -> list[str]:
+        """
+        List the label files of the folder.
+
+        Returns:
+            list[str]: Sorted names without the .txt extension, empty if the folder does not exist.
+        """
+        if not isdir(self.label_dir_):
+            return []
+        return sorted(name[:-len(".txt")] for name in listdir(self.label_dir_) if name.endswith(".txt"))
+
+    def Build(self) -> None:
+        """
+        Parse every label file and save the index, the sidecar is written last so an interrupted build is rebuilt.
+
+        :example:
+        >>> index.Build()
+        """
+        files: list[str] = self.ListFiles()
+        records: list[list] = []
+        coords: list[ndarray] = []
+        counts: list[int] = []
+        class_ids: list[int] = []
+        file_counts: list[int] = []
+
+        for name in files:
+            path: str = join(self.label_dir_, f"{name}.txt")
+            file_stat = stat(path)
+            polygons: list[tuple[int, ndarray]] = self.ParseFile(path)
+            for class_id, points in polygons:
+                class_ids.append(class_id)
+                counts.append(len(points))
+                coords.append(points)
+            file_counts.append(len(polygons))
+            records.append([name, file_stat.st_mtime_ns, file_stat.st_size])
+
+        columns: dict[str, ndarray] = {
+            "coords": concatenate(coords) if coords else empty((0, 2), dtype=float32),
+            "point_offsets": concatenate([zeros(1, dtype=int64), cumsum(array(counts, dtype=int64))]),
+            "class_ids": array(class_ids, dtype=int32),
+            "file_offsets": concatenate([zeros(1, dtype=int64), cumsum(array(file_counts, dtype=int64))]),
+        }
+
+        makedirs(self.index_dir_, exist_ok=True)
+        for column in YoloLabelIndex.arrays_:
+            with open(join(self.index_dir_, f"{column}.npy.tmp"), "wb") as file:
+                save_array(file, columns[column])
+            replace(join(self.index_dir_, f"{column}.npy.tmp"), join(self.index_dir_, f"{column}.npy"))
+
+        with open(join(self.index_dir_, "index.json.tmp"), "w") as file:
+            dump({"files": records}, file)
+        replace(join(self.index_dir_, "index.json.tmp"), join(self.index_dir_, "index.json"))
+        print(f"Indexed {len(class_ids)} polygons from {len(files)} label files in {self.label_dir_}")
+
+    def Load(self) -> None:
+        """
+        Memory map the saved index, an index that was never built stays empty.
+
+        :example:
+        >>> index.Load()
+        """
+        sidecar: str = join(self.index_dir_, "index.json")
+        if not exists(sidecar):
+            return
+        with open(sidecar, "r") as file:
+            self.names_ = [name for name, _, _ in load(file)["files"]]
+        self.positions_ = {name: position for position, name in enumerate(self.names_)}
+        self.coords_ = load_array(join(self.index_dir_, "coords.npy"), mmap_mode="r")
+        self.point_offsets_ = load_array(join(self.index_dir_, "point_offsets.npy"), mmap_mode="r")
+        self.class_ids_ = load_array(join(self.index_dir_, "class_ids.npy"), mmap_mode="r")
+        self.file_offsets_ = load_array(join(self.index_dir_, "file_offsets.npy"), mmap_mode="r")
+
+    def ParseFile(self, path: str) -> list[tuple[int, ndarray]]:
+        """
+        Parse a single YOLO segmentation label file, one polygon per line of a class id and normalized x y pairs.
+        Empty lines are skipped, lines with an odd number of coordinates are skipped with a warning.
+
+        Args:
+            path (str): Path to the label file.
+
+        Returns:
+            list[tuple[int, ndarray]]: Class id and normalized (N, 2) float32 points of every polygon.
+
+        :example:
+        >>> polygons: list[tuple[int, ndarray]] = index.ParseFile("data-test2/train/labels/image1.txt")
+        """
+        polygons: list[tuple[int, ndarray]] = []
+        with open(path, "r") as file:
+            for line_number, line in enumerate(file, 1):
+                data: list[str] = line.split()
+                if not data:
+                    continue
+                if len(data) % 2 == 0:
+                    print(f"Warning: Skipping line {line_number} of {path} with an odd number of coordinates")
+                    continue
+                polygons.append((int(data[0]), array(data[1:], dtype=float32).reshape(-1, 2)))
+        return polygons
@@ -1,9 +1,13 @@
 import re
 from os import listdir, makedirs
-from os.path import exists, join
+from os.path import exists, join, dirname, basename
 from shutil import rmtree
-from cv2 import imread, imwrite, boundingRect, fillPoly
-from numpy import ndarray, zeros, uint8, array, float32, int32
+from cv2 import imwrite, imencode, fillPoly
+from numpy import ndarray, zeros, uint8
+from classes.shard_lib import ShardWriter
+from classes.image_lib import ImageAgent
+from classes.util_lib import Size
+from datasets.label_lib import YoloLabelIndex
 
 # Paths
 input_root: str = "data-test2"
@@ -13,6 +17,15 @@ input_source: list[str] = ["test", "train", "valid"]
 output_root: str = "processed"
 mask_dir_name: str = "mask"
 cropped_dir_name: str = "cropped"
+# Parsed labels of every split, kept between runs and rebuilt when a label file changes
+index_dir_name: str = "labels.index"
+# Pack the crops and masks into tar shards of this many bytes instead of one file per object, 0 saves files
+shard_size: int = 0
+# Decoded images kept in memory, only the second pass decodes the images since the sizes are read from the headers
+cache_bytes: int = 0
+
+image_agent: ImageAgent = ImageAgent(cache_bytes)
+label_indexes: dict[str, YoloLabelIndex] = {}  # label folder -> parsed labels, shared by both passes
 
 # Regex Patterns to Extract Week Number
 pattern1 = re.compile(r"(?:week|Week)?(\d+)_60degrees_(\d+)_\w+\.\w+\.[a-z0-9]+\.(jpg|png)", re.IGNORECASE)
@@ -27,6 +40,21 @@ def CleanDir(dir_path: str) -> None:
         rmtree(dir_path)
     makedirs(dir_path)
 
+def SaveOutput(folder: str, name: str, image: ndarray, writer: ShardWriter | None) -> None:
+    if writer is None:
+        imwrite(join(folder, name), image)
+        return
+
+    ok, data = imencode("." + name.rsplit('.', 1)[1], image)
+    if not ok:
+        raise IOError(f"Failed to encode {name}")
+    writer.Write(name, data.tobytes())
+
+def LabelIndex(label_dir: str) -> YoloLabelIndex:
+    if label_dir not in label_indexes:
+        label_indexes[label_dir] = YoloLabelIndex(label_dir, join(output_root, index_dir_name, basename(dirname(label_dir))))
+    return label_indexes[label_dir]
+
 def extract_week(image_name: str):
     match1 = pattern1.match(image_name)
     match2 = pattern2.match(image_name)
@@ -38,45 +66,48 @@ def extract_week(image_name: str):
     return None  # No match found
 
 def yolo_to_objects(image_path: str, label_path: str):
-    # Read image
-    image: ndarray = imread(image_path)
-    h, w, _ = image.shape  # height, width, channel
+    # Read the image size from the header, the pixels are not needed
+    size: Size[int] = image_agent.ProbeImageSize(image_path)
+    h, w = size.height_, size.width_
     
-    objects = []  # List to store valid objects (bounding box and mask)
-    max_width, max_height = 0, 0  # Track maximum object size
+    # Read YOLO Segmentation labels from the label index, invalid objects are dropped and the boxes computed for all of them at once
+    _, offsets, points, boxes = LabelIndex(dirname(label_path)).PixelPolygons(basename(label_path)[:-len(".txt")], w, h)
+    if len(boxes) == 0:
+        return [], 0, 0
+    max_width, max_height = int(boxes[:, 2].max()), int(boxes[:, 3].max())  # Track maximum object size
     
-    # Read YOLO Segmentation labels
-    with open(label_path, "r") as file:
-        lines = file.readlines()
-    
-    for line in lines:
-        data = line.strip().split(" ")
-        polygon_points = array(data[1:], dtype=float32).reshape(-1, 2)
-        
-        if len(polygon_points) < 3:
-            continue  # Ignore invalid objects
-        
-        # Convert normalized coordinates to pixel coordinates
-        polygon_points[:, 0] *= w
-        polygon_points[:, 1] *= h
-        polygon_points = polygon_points.astype(int32)
-        
-        # Create mask
-        mask = zeros((h, w), dtype=uint8)
-        fillPoly(mask, [polygon_points], 255)
-        
-        # Get bounding box
-        x, y, width, height = boundingRect(polygon_points)
-        max_width = max(max_width, width)
-        max_height = max(max_height, height)
-        
-        objects.append((x, y, width, height, mask))
+    # Masks are rasterized later into the crop window of every object, only its polygon is kept here
+    objects = [(x, y, width, height, points[offsets[polygon]:offsets[polygon + 1]]) for polygon, (x, y, width, height) in enumerate(boxes.tolist())]
     
     return objects, max_width, max_height
 
+def CropMask(polygon_points: ndarray, box: tuple[int, int, int, int], image_shape: tuple[int, int], crop_x: int, crop_y: int, crop_width: int, crop_height: int) -> ndarray:
+    # Rasterize the object into a buffer of its crop window instead of a full size mask, the window is resolved
+    # like the slice of the cropped image so both always have the same shape
+    left, right, _ = slice(crop_x, crop_x + crop_width).indices(image_shape[1])
+    top, bottom, _ = slice(crop_y, crop_y + crop_height).indices(image_shape[0])
+    mask = zeros((max(bottom - top, 0), max(right - left, 0)), dtype=uint8)
+    x, y, width, height = box
+    if left <= x and top <= y and x + width <= right and y + height <= bottom:
+        fillPoly(mask, [polygon_points], 255, offset=(-left, -top))
+        return mask
+
+    # The window cuts the object, or the object reaches past the image like a vertex at a normalized 1.0 does.
+    # fillPoly clips at the edges of the buffer, so fill the object in a buffer of its bounding box clipped to the
+    # image, which clips at the same edges as the full size mask, and copy the part inside the window
+    object_width, object_height = min(x + width, image_shape[1]) - x, min(y + height, image_shape[0]) - y
+    if object_width <= 0 or object_height <= 0:
+        return mask
+    object_mask = zeros((object_height, object_width), dtype=uint8)
+    fillPoly(object_mask, [polygon_points], 255, offset=(-x, -y))
+    x1, y1, x2, y2 = max(x, left), max(y, top), min(x + object_width, right), min(y + object_height, bottom)
+    if x1 < x2 and y1 < y2:
+        mask[y1 - top:y2 - top, x1 - left:x2 - left] = object_mask[y1 - y:y2 - y, x1 - x:x2 - x]
+    return mask
+
 def process_images():
-    # Clean processed folders
-    CleanDir(output_root)
+    # Clean processed folders, the label indexes are kept for the next run
+    CheckDir(output_root)
     CleanDir(join(output_root, cropped_dir_name))
     CleanDir(join(output_root, mask_dir_name))
     
@@ -95,7 +126,7 @@ def process_images():
             image_path = join(image_dir, img_name)
             label_path = join(label_dir, img_name.rsplit('.', 1)[0] + ".txt")
             
-            if not exists(label_path):
+            if img_name.rsplit(".", 1)[0] not in LabelIndex(label_dir):
                 continue  # Skip images without labels
             
             objects, max_width, max_height = yolo_to_objects(image_path, label_path)
@@ -108,6 +139,8 @@ def process_images():
                     week_max_size[week_num] = (max(prev_max_w, max_width), max(prev_max_h, max_height))
 
     # Second pass: Crop and save objects based on week's max size
+    cropped_writer: ShardWriter | None = ShardWriter(join(output_root, cropped_dir_name), "cropped", shard_size) if shard_size > 0 else None
+    mask_writer: ShardWriter | None = ShardWriter(join(output_root, mask_dir_name), "mask", shard_size) if shard_size > 0 else None
     for source in input_source:
         image_dir = join(input_root, source, image_folder_name)
         label_dir = join(input_root, source, label_folder_name)
@@ -120,16 +153,16 @@ def process_images():
             image_path = join(image_dir, img_name)
             label_path = join(label_dir, img_name.rsplit('.', 1)[0] + ".txt")
             
-            if not exists(label_path):
+            if img_name.rsplit(".", 1)[0] not in LabelIndex(label_dir):
                 continue
             
             objects, _, _ = yolo_to_objects(image_path, label_path)
-            image = imread(image_path)
+            image = image_agent.LoadImage(image_path, ImageAgent.ColorModeEnum.rgb_)
             
             max_width, max_height = week_max_size[week_num]  # Get max crop size for this week
             
             obj_count = 1
-            for x, y, width, height, mask in objects:
+            for x, y, width, height, polygon_points in objects:
                 # Ensure uniform crop size based on week's max size
                 crop_x = max(0, x + width // 2 - max_width // 2)
                 crop_y = max(0, y + height // 2 - max_height // 2)
@@ -138,18 +171,25 @@ def process_images():
                 
                 # Extract the cropped region
                 cropped_img = image[crop_y:crop_y + max_height, crop_x:crop_x + max_width]
-                cropped_mask = mask[crop_y:crop_y + max_height, crop_x:crop_x + max_width]
+                cropped_mask = CropMask(polygon_points, (x, y, width, height), image.shape[:2], crop_x, crop_y, max_width, max_height)
                 
                 # Save with numbered format
                 base_name = img_name.rsplit('.', 1)[0]
                 cropped_img_name = f"{base_name}_{obj_count:02}.jpg"
                 cropped_mask_name = f"{base_name}_{obj_count:02}.png"
                 
-                imwrite(join(output_root, cropped_dir_name, cropped_img_name), cropped_img)
-                imwrite(join(output_root, mask_dir_name, cropped_mask_name), cropped_mask)
+                SaveOutput(join(output_root, cropped_dir_name), cropped_img_name, cropped_img, cropped_writer)
+                SaveOutput(join(output_root, mask_dir_name), cropped_mask_name, cropped_mask, mask_writer)
                 
                 print(f"Processed: {cropped_img_name}")
                 obj_count += 1
 
+    for writer in (cropped_writer, mask_writer):
+        if writer is not None:
+            writer.Close()
+
+    if cache_bytes > 0:
+        print(f"Image cache: {image_agent.cache_hits_} hits, {image_agent.cache_misses_} misses")
+
 if __name__ == "__main__":
     process_images()
@@ -0,0 +1,36 @@
+from cv2 import fillPoly, boundingRect
+from numpy import ndarray, zeros, uint8, int32
+from numpy.random import default_rng, Generator
+
+from individual_plant import CropMask
+
+def FullCrop(points : ndarray, height : int, width : int, crop_x : int, crop_y : int, crop_width : int, crop_height : int) -> ndarray:
+    mask : ndarray = zeros((height, width), dtype=uint8)
+    fillPoly(mask, [points], 255)
+    return mask[crop_y:crop_y + crop_height, crop_x:crop_x + crop_width]
+
+def CheckPolygon(points : ndarray, height : int, width : int, crop_width : int, crop_height : int) -> None:
+    # Same window placement as process_images
+    x, y, box_width, box_height = boundingRect(points)
+    crop_x : int = min(max(0, x + box_width // 2 - crop_width // 2), width - crop_width)
+    crop_y : int = min(max(0, y + box_height // 2 - crop_height // 2), height - crop_height)
+    expected : ndarray = FullCrop(points, height, width, crop_x, crop_y, crop_width, crop_height)
+    cropped : ndarray = CropMask(points, (x, y, box_width, box_height), (height, width), crop_x, crop_y, crop_width, crop_height)
+    assert cropped.shape == expected.shape and (cropped == expected).all()
+
+def test_edge_polygons() -> None:
+    # Normalized coordinates of 1.0 put a vertex on x == width or y == height, outside the image
+    rng : Generator = default_rng(0)
+    for _ in range(2000):
+        height, width = int(rng.integers(10, 120)), int(rng.integers(10, 120))
+        points : ndarray = (rng.random((int(rng.integers(3, 10)), 2)) * [width, height]).astype(int32)
+        points[rng.integers(0, len(points)), 0] = width
+        points[rng.integers(0, len(points)), 1] = height
+        CheckPolygon(points, height, width, int(rng.integers(1, 2 * width)), int(rng.integers(1, 2 * height)))
+
+def test_inner_polygons() -> None:
+    rng : Generator = default_rng(1)
+    for _ in range(2000):
+        height, width = int(rng.integers(10, 120)), int(rng.integers(10, 120))
+        points : ndarray = (rng.random((int(rng.integers(3, 10)), 2)) * [width, height]).astype(int32)
+        CheckPolygon(points, height, width, int(rng.integers(1, 2 * width)), int(rng.integers(1, 2 * height)))
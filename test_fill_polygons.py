@@ -0,0 +1,58 @@
+from cv2 import fillPoly, boundingRect
+from numpy import ndarray, zeros, uint8, int32, int64, array, concatenate, cumsum
+from numpy.random import default_rng, Generator
+
+from classes.image_lib import ImageAgent
+
+def RandomPolygons(rng : Generator, count : int, height : int, width : int) -> tuple[ndarray, ndarray, ndarray]:
+    # Star shaped polygons of 3 to 12 points around random centers, self intersecting ones included
+    polygons : list[ndarray] = []
+    for _ in range(count):
+        center : ndarray = array([rng.integers(0, width), rng.integers(0, height)])
+        radius : int = int(rng.integers(2, 40))
+        polygons.append((center + rng.integers(-radius, radius + 1, (int(rng.integers(3, 13)), 2))).astype(int32))
+    points : ndarray = concatenate(polygons) if polygons else zeros((0, 2), dtype=int32)
+    offsets : ndarray = concatenate([zeros(1, dtype=int64), cumsum([len(polygon) for polygon in polygons], dtype=int64)])
+    boxes : ndarray = array([boundingRect(polygon) for polygon in polygons], dtype=int32).reshape(-1, 4)
+    return points, offsets, boxes
+
+def OneByOne(shape : tuple[int, int], points : ndarray, offsets : ndarray, offset : tuple[int, int] = (0, 0)) -> ndarray:
+    mask : ndarray = zeros(shape, dtype=uint8)
+    for polygon in range(len(offsets) - 1):
+        fillPoly(mask, [points[offsets[polygon]:offsets[polygon + 1]]], 255, offset=offset)
+    return mask
+
+def test_matches_one_by_one() -> None:
+    image_agent : ImageAgent = ImageAgent()
+    rng : Generator = default_rng(0)
+    for case in range(50):
+        height, width = int(rng.integers(20, 200)), int(rng.integers(20, 200))
+        points, offsets, boxes = RandomPolygons(rng, int(rng.integers(0, 40)), height, width)
+        filled : ndarray = image_agent.FillPolygons(zeros((height, width), dtype=uint8), points, offsets, boxes)
+        assert (filled == OneByOne((height, width), points, offsets)).all(), f"case {case}"
+
+def test_overlapping_polygons() -> None:
+    # Filled in one call, the overlap of the two squares would cancel out like a hole
+    image_agent : ImageAgent = ImageAgent()
+    points : ndarray = array([[10, 10], [40, 10], [40, 40], [10, 40], [25, 25], [60, 25], [60, 60], [25, 60]], dtype=int32)
+    offsets : ndarray = array([0, 4, 8], dtype=int64)
+    boxes : ndarray = array([[10, 10, 31, 31], [25, 25, 36, 36]], dtype=int32)
+    filled : ndarray = image_agent.FillPolygons(zeros((80, 80), dtype=uint8), points, offsets, boxes)
+    assert filled[30, 30] == 255
+    assert (filled == OneByOne((80, 80), points, offsets)).all()
+
+def test_touching_boxes() -> None:
+    # Boxes sharing only an edge pixel still have to be filled in different layers
+    image_agent : ImageAgent = ImageAgent()
+    points : ndarray = array([[0, 0], [10, 0], [10, 10], [0, 10], [10, 0], [20, 0], [20, 10], [10, 10]], dtype=int32)
+    offsets : ndarray = array([0, 4, 8], dtype=int64)
+    boxes : ndarray = array([boundingRect(points[:4]), boundingRect(points[4:])], dtype=int32)
+    filled : ndarray = image_agent.FillPolygons(zeros((12, 22), dtype=uint8), points, offsets, boxes)
+    assert (filled == OneByOne((12, 22), points, offsets)).all()
+
+def test_offset_and_color() -> None:
+    image_agent : ImageAgent = ImageAgent()
+    points, offsets, boxes = RandomPolygons(default_rng(1), 20, 100, 100)
+    filled : ndarray = image_agent.FillPolygons(zeros((60, 60), dtype=uint8), points, offsets, boxes, color=1, offset=(-20, -30))
+    assert set(filled.ravel().tolist()) <= {0, 1}
+    assert (filled * 255 == OneByOne((60, 60), points, offsets, (-20, -30))).all()
@@ -0,0 +1,75 @@
+from io import BytesIO
+from os.path import join
+from struct import pack
+from tempfile import TemporaryDirectory
+
+from cv2 import imencode, imdecode, IMREAD_COLOR, IMWRITE_JPEG_PROGRESSIVE
+from numpy import ndarray, frombuffer, uint8
+from numpy.random import default_rng, Generator
+
+from classes.image_lib import ImageAgent
+from classes.util_lib import Size
+
+def Encode(image : ndarray, extension : str, params : tuple[int, ...] = ()) -> bytes:
+    ok, data = imencode(extension, image, params)
+    assert ok
+    return data.tobytes()
+
+def ExifSegment(orientation : int, order : bytes) -> bytes:
+    # APP1 segment with a TIFF structure of a single orientation entry
+    endian : str = "<" if order == b"II" else ">"
+    tiff : bytes = order + pack(f"{endian}HI", 42, 8) + pack(f"{endian}H", 1) + pack(f"{endian}HHIHH", 0x0112, 3, 1, orientation, 0) + pack(f"{endian}I", 0)
+    payload : bytes = b"Exif\x00\x00" + tiff
+    return b"\xff\xe1" + pack(">H", len(payload) + 2) + payload
+
+def WithExif(jpeg : bytes, orientation : int, order : bytes = b"II") -> bytes:
+    return jpeg[:2] + ExifSegment(orientation, order) + jpeg[2:]
+
+def HeaderSize(data : bytes) -> Size[int] | None:
+    return ImageAgent().ReadHeaderSize(BytesIO(data))
+
+def DecodedSize(data : bytes) -> tuple[int, int]:
+    image : ndarray = imdecode(frombuffer(data, dtype=uint8), IMREAD_COLOR)
+    return image.shape[1], image.shape[0]
+
+def test_png_jpeg_sizes() -> None:
+    rng : Generator = default_rng(0)
+    for _ in range(10):
+        image : ndarray = rng.integers(0, 256, (int(rng.integers(1, 300)), int(rng.integers(1, 300)), 3), dtype=uint8)
+        for data in (Encode(image, ".png"), Encode(image[:, :, 0], ".png"), Encode(image, ".jpg"), Encode(image, ".jpg", (IMWRITE_JPEG_PROGRESSIVE, 1))):
+            size : Size[int] | None = HeaderSize(data)
+            assert size is not None
+            assert (size.width_, size.height_) == DecodedSize(data)
+
+def test_exif_orientation() -> None:
+    jpeg : bytes = Encode(default_rng(1).integers(0, 256, (40, 70, 3), dtype=uint8), ".jpg")
+    for orientation in range(1, 9):
+        for order in (b"II", b"MM"):
+            data : bytes = WithExif(jpeg, orientation, order)
+            size : Size[int] | None = HeaderSize(data)
+            assert (size.width_, size.height_) == ((40, 70) if orientation >= 5 else (70, 40))
+            assert (size.width_, size.height_) == DecodedSize(data), f"orientation {orientation}"
+
+def test_exif_transposed() -> None:
+    image_agent : ImageAgent = ImageAgent()
+    assert image_agent.ExifTransposed(ExifSegment(6, b"MM")[10:])
+    assert not image_agent.ExifTransposed(ExifSegment(3, b"II")[10:])
+    assert not image_agent.ExifTransposed(b"")
+    assert not image_agent.ExifTransposed(b"XX\x00\x2a\x00\x00\x00\x08")
+    assert not image_agent.ExifTransposed(ExifSegment(6, b"II")[10:20]) # truncated entry
+
+def test_not_parsed() -> None:
+    jpeg : bytes = Encode(default_rng(2).integers(0, 256, (16, 16, 3), dtype=uint8), ".jpg")
+    assert HeaderSize(b"GIF89a" + bytes(32)) is None
+    assert HeaderSize(b"") is None
+    assert HeaderSize(jpeg[:20]) is None
+
+def test_probe_falls_back_to_decode() -> None:
+    image : ndarray = default_rng(3).integers(0, 256, (21, 34, 3), dtype=uint8)
+    with TemporaryDirectory() as folder:
+        for extension in (".bmp", ".png", ".jpg"):
+            path : str = join(folder, f"image{extension}")
+            with open(path, "wb") as file:
+                file.write(Encode(image, extension))
+            size : Size[int] = ImageAgent().ProbeImageSize(path)
+            assert (size.width_, size.height_) == (34, 21)
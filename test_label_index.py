@@ -0,0 +1,90 @@
+from os import listdir, makedirs, utime, remove, stat
+from os.path import join, exists
+from tempfile import TemporaryDirectory
+
+from cv2 import boundingRect
+from numpy import array, float32, int32
+
+from datasets.label_lib import YoloLabelIndex
+
+def WriteLabel(folder : str, name : str, lines : list[str]) -> None:
+    with open(join(folder, f"{name}.txt"), "w") as file:
+        file.write("\n".join(lines) + "\n")
+
+def LabelFolder(root : str) -> str:
+    label_dir : str = join(root, "train", "labels")
+    makedirs(label_dir)
+    WriteLabel(label_dir, "a", ["0 0.1 0.1 0.5 0.1 0.5 0.6", "1 0.2 0.2 0.3 0.3"])
+    WriteLabel(label_dir, "b", ["2 0.0 0.0 1.0 0.0 1.0 1.0 0.0 1.0"])
+    WriteLabel(label_dir, "c", [])
+    return label_dir
+
+def test_lookup() -> None:
+    with TemporaryDirectory() as root:
+        index : YoloLabelIndex = YoloLabelIndex(LabelFolder(root), join(root, "index"))
+        assert index.Names() == ["a", "b", "c"]
+        assert "a" in index and "missing" not in index
+
+        class_ids, offsets, coords = index.Lookup("a")
+        assert class_ids.tolist() == [0, 1]
+        assert offsets.tolist() == [0, 3, 5]
+        assert coords.tolist() == array([[0.1, 0.1], [0.5, 0.1], [0.5, 0.6], [0.2, 0.2], [0.3, 0.3]], dtype=float32).tolist()
+        assert [class_id for class_id, _ in index.Polygons("b")] == [2]
+        assert len(index.Lookup("c")[0]) == 0
+
+def test_pixel_polygons() -> None:
+    with TemporaryDirectory() as root:
+        index : YoloLabelIndex = YoloLabelIndex(LabelFolder(root), join(root, "index"))
+        class_ids, offsets, points, boxes = index.PixelPolygons("a", 640, 480)
+        assert class_ids.tolist() == [0] # the two point polygon is dropped
+        assert offsets.tolist() == [0, 3]
+        assert points.dtype == int32
+
+        for name in ("a", "b"):
+            _, offsets, points, boxes = index.PixelPolygons(name, 333, 251)
+            for polygon in range(len(boxes)):
+                assert tuple(boxes[polygon]) == boundingRect(points[offsets[polygon]:offsets[polygon + 1]])
+
+        _, offsets, points, boxes = index.PixelPolygons("c", 640, 480)
+        assert offsets.tolist() == [0] and points.shape == (0, 2) and boxes.shape == (0, 4)
+
+def test_stale() -> None:
+    with TemporaryDirectory() as root:
+        label_dir : str = LabelFolder(root)
+        index_dir : str = join(root, "index")
+        index : YoloLabelIndex = YoloLabelIndex(label_dir, index_dir)
+        assert not index.Stale()
+
+        WriteLabel(label_dir, "d", ["0 0.1 0.1 0.2 0.1 0.2 0.2"])
+        assert index.Stale()
+        index = YoloLabelIndex(label_dir, index_dir)
+        assert not index.Stale() and "d" in index
+
+        # Same size, only the modification time changed
+        path : str = join(label_dir, "d.txt")
+        utime(path, ns=(stat(path).st_atime_ns, stat(path).st_mtime_ns + 10**9))
+        assert index.Stale()
+        index = YoloLabelIndex(label_dir, index_dir)
+        assert not index.Stale()
+
+        WriteLabel(label_dir, "d", ["1 0.1 0.1 0.2 0.1 0.2 0.2 0.3 0.3"])
+        assert YoloLabelIndex(label_dir, index_dir).Lookup("d")[0].tolist() == [1]
+
+        remove(path)
+        assert index.Stale()
+        assert "d" not in YoloLabelIndex(label_dir, index_dir)
+
+def test_saved_index_loaded_without_refresh() -> None:
+    with TemporaryDirectory() as root:
+        label_dir : str = LabelFolder(root)
+        YoloLabelIndex(label_dir, join(root, "index"))
+        WriteLabel(label_dir, "d", ["0 0.1 0.1 0.2 0.1 0.2 0.2"])
+        index : YoloLabelIndex = YoloLabelIndex(label_dir, join(root, "index"), refresh=False)
+        assert index.Names() == ["a", "b", "c"]
+
+def test_missing_label_folder() -> None:
+    with TemporaryDirectory() as root:
+        index : YoloLabelIndex = YoloLabelIndex(join(root, "missing", "labels"), join(root, "index"))
+        assert len(index) == 0 and "a" not in index
+        assert listdir(root) == []
+        assert not exists(join(root, "index"))
@@ -0,0 +1,52 @@
+from numpy import ndarray, zeros, uint8, lexsort
+from numpy.random import default_rng, Generator
+
+from classes.image_lib import ImageAgent
+
+def PlantImage(rng : Generator, height : int, width : int, blobs : int) -> ndarray:
+    # Green rectangles and specks on a black background, green is inside the default plant color range
+    image : ndarray = zeros((height, width, 3), dtype=uint8)
+    for _ in range(blobs):
+        y, x = rng.integers(0, height), rng.integers(0, width)
+        image[y:y + rng.integers(1, 30), x:x + rng.integers(1, 30)] = (0, 200, 0)
+    image[rng.random((height, width)) < 0.02] = (0, 200, 0)
+    return image
+
+def SortedBoxes(boxes : ndarray) -> ndarray:
+    return boxes[lexsort(boxes.T[::-1])]
+
+def test_tiled_matches_full() -> None:
+    image_agent : ImageAgent = ImageAgent()
+    rng : Generator = default_rng(0)
+    for case in range(20):
+        image : ndarray = PlantImage(rng, int(rng.integers(40, 200)), int(rng.integers(40, 200)), 30)
+        tile_size : int = int(rng.integers(7, 64))
+        full : ndarray = image_agent.FindPlantComponents(image_agent.FindPlantMask(image), k=10000)
+        tiled : ndarray = image_agent.FindPlantComponentsTiled(image, k=10000, tile_size=tile_size, workers=case % 3)
+        assert (SortedBoxes(full) == SortedBoxes(tiled)).all(), f"case {case} tile size {tile_size}"
+
+def test_tiled_top_k() -> None:
+    image_agent : ImageAgent = ImageAgent()
+    image : ndarray = zeros((100, 100, 3), dtype=uint8)
+    image[10:40, 10:60] = (0, 200, 0) # crosses the tile borders
+    image[70:75, 70:75] = (0, 200, 0)
+    image[90:91, 0:3] = (0, 200, 0)
+    boxes : ndarray = image_agent.FindPlantComponentsTiled(image, k=2, tile_size=16)
+    assert boxes.tolist() == [[10, 10, 50, 30], [70, 70, 5, 5]]
+    assert image_agent.FindPlantComponentsTiled(image, k=5, min_area=20, tile_size=16).tolist() == [[10, 10, 50, 30], [70, 70, 5, 5]]
+
+def test_tiled_open_matches_full() -> None:
+    image_agent : ImageAgent = ImageAgent()
+    rng : Generator = default_rng(1)
+    for case in range(20):
+        image : ndarray = PlantImage(rng, int(rng.integers(40, 160)), int(rng.integers(40, 160)), 40)
+        open_size : int = int(rng.integers(2, 6))
+        tile_size : int = int(rng.integers(8, 48))
+        full : ndarray = image_agent.FindPlantComponents(image_agent.FindPlantMask(image), k=10000, open_size=open_size)
+        tiled : ndarray = image_agent.FindPlantComponentsTiled(image, k=10000, tile_size=tile_size, open_size=open_size)
+        assert (SortedBoxes(full) == SortedBoxes(tiled)).all(), f"case {case} open size {open_size} tile size {tile_size}"
+
+def test_tiled_mask_matches_full() -> None:
+    image_agent : ImageAgent = ImageAgent()
+    image : ndarray = PlantImage(default_rng(2), 123, 77, 20)
+    assert (image_agent.FindPlantMaskTiled(image, tile_size=20, workers=2) == image_agent.FindPlantMask(image)).all()
@@ -0,0 +1,91 @@
+from os import listdir, makedirs
+from os.path import join
+from tarfile import open as open_tar
+from tempfile import TemporaryDirectory
+
+from cv2 import VideoWriter, VideoWriter_fourcc
+from numpy import full, uint8
+
+from classes.image_lib import ImageAgent
+from classes.shard_lib import ShardWriter, ShardReader
+from classes.util_lib import Size
+from datasets.dataset_lib import VideoDatasetAgent
+
+def Payload(number : int) -> bytes:
+    return bytes([number % 256]) * (number * 97 % 3000 + 1)
+
+def test_round_trip() -> None:
+    with TemporaryDirectory() as folder:
+        with ShardWriter(folder, "images", 16 << 10) as writer:
+            for number in range(50):
+                writer.Write(f"{number:07d}.png", Payload(number))
+            assert writer.written_ == 50
+            assert writer.shard_count_ > 1
+
+        with ShardReader(folder) as reader:
+            assert len(reader) == 50
+            assert reader.Keys() == [f"{number:07d}.png" for number in range(50)]
+            for number in range(50):
+                assert reader.Read(f"{number:07d}.png") == Payload(number)
+
+        # The shards stay plain tar files
+        with open_tar(join(folder, "images-00000.tar")) as tar:
+            member = tar.getmembers()[0]
+            assert tar.extractfile(member).read() == Payload(int(member.name[:7]))
+
+def test_incomplete_shard_ignored() -> None:
+    with TemporaryDirectory() as folder:
+        with ShardWriter(folder, "images", 1 << 20) as writer:
+            writer.Write("a.png", b"a")
+        writer = ShardWriter(folder, "other", 1 << 20)
+        writer.Write("b.png", b"b") # never closed, no index
+        writer.file_.flush()
+
+        with ShardReader(folder) as reader:
+            assert "a.png" in reader
+            assert "b.png" not in reader
+        writer.file_.close()
+
+def test_rerun_removes_old_shards() -> None:
+    with TemporaryDirectory() as folder:
+        with ShardWriter(folder, "images", 4 << 10) as writer:
+            for number in range(40):
+                writer.Write(f"{number:07d}.png", Payload(number))
+        with ShardWriter(folder, "keep", 4 << 10) as writer:
+            writer.Write("keep.png", b"keep")
+
+        # A smaller rerun of the same prefix does not serve the keys of the first run
+        with ShardWriter(folder, "images", 4 << 10) as writer:
+            writer.Write("0000000.png", b"new")
+
+        assert sorted(name for name in listdir(folder) if name.startswith("images")) == ["images-00000.idx.json", "images-00000.tar"]
+        with ShardReader(folder) as reader:
+            assert reader.Keys() == ["0000000.png", "keep.png"]
+            assert reader.Read("0000000.png") == b"new"
+
+def test_rerun_with_other_segments() -> None:
+    # A segmented run writes a shard prefix per segment, a serial rerun only writes the prefix of image 0
+    with TemporaryDirectory() as folder:
+        makedirs(join(folder, "datasets", "week1"))
+        video : VideoWriter = VideoWriter(join(folder, "datasets", "week1", "video1.mp4"), VideoWriter_fourcc(*"mp4v"), 20, (160, 120))
+        for frame in range(300):
+            video.write(full((120, 160, 3), frame % 256, dtype=uint8))
+        video.release()
+
+        src_path, dst_path = join(folder, "datasets"), join(folder, "bin")
+        VideoDatasetAgent(frame_rate=1, shard_size=64 << 10).VideoExtract(src_path=src_path, dst_path=dst_path, workers=3, segment_length=5)
+        VideoDatasetAgent(frame_rate=1, shard_size=64 << 10, size=Size(80, 60)).VideoExtract(src_path=src_path, dst_path=dst_path)
+
+        image_agent : ImageAgent = ImageAgent()
+        with ShardReader(join(dst_path, "week1", "video1")) as reader:
+            assert len(reader) == 300
+            for number in (0, 50, 100, 250):
+                assert image_agent.LoadShardImage(reader, f"{number:07d}.png", ImageAgent.ColorModeEnum.rgb_).shape == (60, 80, 3)
+
+def test_missing_folder() -> None:
+    with TemporaryDirectory() as folder:
+        with ShardReader(join(folder, "missing")) as reader:
+            assert len(reader) == 0
+        with ShardWriter(folder, "images") as writer:
+            pass
+        assert listdir(folder) == []
@@ -0,0 +1,114 @@
+from numpy import array, int32, float32
+from numpy.random import default_rng, Generator
+from pytest import raises
+
+from classes import util_lib
+from classes.util_lib import Size, Point, Rect, RectArray, SetValidation
+
+def test_slots() -> None:
+    for value in (Size(1, 2), Point(1, 2), Rect(1, 2, 3, 4)):
+        assert not hasattr(value, "__dict__")
+        with raises(AttributeError):
+            value.other_ = 1
+    rect : Rect[int] = Rect(1, 2, 3, 4)
+    assert (rect.size_.width_, rect.size_.height_, rect.point_.x_, rect.point_.y_) == (1, 2, 3, 4)
+
+def test_operations() -> None:
+    assert Size(10, 10) + Size(5, 2) == Size(15, 12)
+    assert Point(4, 6) // Point(2, 4) == Point(2, 1)
+    assert Rect(10, 10, 5, 5).Mul(2) == Rect(20, 20, 10, 10)
+    assert Rect(1, 2, 3, 4) + Rect(1, 1, 1, 1) == Rect(2, 3, 4, 5)
+    assert Rect(1, 2, 3, 4) != Rect(1, 2, 3, 5)
+    assert Size(1, 1) < Size(2, 2) and not Size(1, 3) < Size(2, 2)
+    assert str(Rect(1, 2, 3, 4)) == "Rect(size=Size(width=1, height=2), point=Point(x=3, y=4))"
+
+def test_operand_class_asserted() -> None:
+    # A wrong operand class is an AssertionError whether the validation is on or not
+    validation : bool = util_lib.validation_enabled
+    try:
+        for enabled in (False, True):
+            SetValidation(enabled)
+            for value, other in ((Size(1, 2), Point(1, 2)), (Point(1, 2), None), (Rect(1, 2, 3, 4), Size(1, 2))):
+                for operation in (lambda: value == other, lambda: value != other, lambda: value + other, lambda: value < other, lambda: value >= other):
+                    with raises(AssertionError):
+                        operation()
+    finally:
+        SetValidation(validation)
+
+def test_validation_toggle() -> None:
+    validation : bool = util_lib.validation_enabled
+    try:
+        SetValidation(False)
+        assert Size(1, 2) + Size(1.5, 2.5) == Size(2.5, 4.5)
+        SetValidation(True)
+        with raises(AssertionError):
+            Size(1, 2) + Size(1.5, 2.5)
+        with raises(AssertionError):
+            Rect(1, 2, 3, 4) == Rect(1.0, 2, 3, 4)
+        assert Size(1, 2) + Size(3, 4) == Size(4, 6)
+    finally:
+        SetValidation(validation)
+
+def RandomRects(rng : Generator, count : int) -> list[Rect[int]]:
+    return [Rect(*(int(value) for value in rng.integers(-20, 60, 4))) for _ in range(count)]
+
+def Rows(rects : list[Rect]) -> list[tuple]:
+    return [(rect.point_.x_, rect.point_.y_, rect.size_.width_, rect.size_.height_) for rect in rects]
+
+def test_rect_array_construction() -> None:
+    rects : list[Rect[int]] = RandomRects(default_rng(0), 50)
+    rect_array : RectArray = RectArray.FromRects(rects)
+    assert rect_array.boxes_.dtype == int32 and rect_array.boxes_.shape == (50, 4)
+    assert Rows(rect_array.ToRects()) == Rows(rects)
+    assert len(RectArray.FromRects([])) == 0
+    assert RectArray.FromRects(rects, float32).boxes_.dtype == float32
+    assert len(rect_array[rect_array.Area() > 100]) == sum(rect.size_.width_ * rect.size_.height_ > 100 for rect in rects)
+    assert rect_array[3].boxes_.shape == (1, 4)
+    with raises(AssertionError):
+        RectArray(array([1, 2, 3, 4]))
+
+def test_rect_array_matches_rects() -> None:
+    rects : list[Rect[int]] = RandomRects(default_rng(1), 50)
+    rect_array : RectArray = RectArray.FromRects(rects)
+    assert Rows(rect_array.Add(3).ToRects()) == Rows([rect.Add(3) for rect in rects])
+    assert Rows(rect_array.Sub(3).ToRects()) == Rows([rect.Sub(3) for rect in rects])
+    assert Rows(rect_array.Mul(2).ToRects()) == Rows([rect.Mul(2) for rect in rects])
+    assert Rows(rect_array.FloorDiv(3).ToRects()) == Rows([rect.FloorDiv(3) for rect in rects])
+    assert Rows(rect_array.TrueDiv(4).ToRects()) == Rows([rect.TrueDiv(4) for rect in rects])
+    assert rect_array.Translate(5, -2).boxes_.tolist() == [[x + 5, y - 2, width, height] for x, y, width, height in Rows(rects)]
+    assert rect_array.Center().tolist() == [[x + width // 2, y + height // 2] for x, y, width, height in Rows(rects)]
+
+def test_rect_array_comparisons() -> None:
+    rng : Generator = default_rng(2)
+    rects1 : list[Rect[int]] = RandomRects(rng, 200)
+    rects2 : list[Rect[int]] = [rect if keep else other for rect, other, keep in zip(rects1, RandomRects(rng, 200), rng.random(200) < 0.3)]
+    array1, array2 = RectArray.FromRects(rects1), RectArray.FromRects(rects2)
+    assert (array1 == array2).tolist() == [rect1 == rect2 for rect1, rect2 in zip(rects1, rects2)]
+    assert (array1 != array2).tolist() == [rect1 != rect2 for rect1, rect2 in zip(rects1, rects2)]
+    assert (array1 < array2).tolist() == [rect1 < rect2 for rect1, rect2 in zip(rects1, rects2)]
+    assert (array1 <= array2).tolist() == [rect1 <= rect2 for rect1, rect2 in zip(rects1, rects2)]
+    assert (array1 > array2).tolist() == [rect1 > rect2 for rect1, rect2 in zip(rects1, rects2)]
+    assert (array1 >= array2).tolist() == [rect1 >= rect2 for rect1, rect2 in zip(rects1, rects2)]
+    with raises(AssertionError):
+        array1 == array2[:10]
+
+def test_rect_array_clip() -> None:
+    rects : list[Rect[int]] = RandomRects(default_rng(3), 200)
+    size : Size[int] = Size(40, 30)
+    expected : list[list[int]] = []
+    for x, y, width, height in Rows(rects):
+        x0, y0 = min(max(x, 0), size.width_), min(max(y, 0), size.height_)
+        x1, y1 = min(max(x + width, 0), size.width_), min(max(y + height, 0), size.height_)
+        expected.append([x0, y0, max(x1 - x0, 0), max(y1 - y0, 0)])
+    clipped : RectArray = RectArray.FromRects(rects).Clip(size)
+    assert clipped.boxes_.tolist() == expected
+    assert clipped.boxes_.dtype == int32
+
+def test_rect_array_expand_to_square() -> None:
+    rects : list[Rect[int]] = RandomRects(default_rng(4), 200)
+    squares : RectArray = RectArray.FromRects(rects).ExpandToSquare()
+    for (x, y, width, height), (square_x, square_y, side, square_side) in zip(Rows(rects), squares.boxes_.tolist()):
+        assert side == square_side == max(width, height)
+        assert (square_x, square_y) == (x + width // 2 - side // 2, y + height // 2 - side // 2)
+    floats : RectArray = RectArray(array([[0.0, 0.0, 3.0, 1.0]])).ExpandToSquare()
+    assert floats.boxes_.tolist() == [[0.0, -1.0, 3.0, 3.0]]
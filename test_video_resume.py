@@ -0,0 +1,52 @@
+from os.path import join
+from tempfile import TemporaryDirectory
+
+from classes.image_lib import ImageAgent
+from classes.util_lib import Size
+from datasets.dataset_lib import VideoDatasetAgent
+
+def WriteImages(folder : str, numbers : list[int]) -> None:
+    for number in numbers:
+        open(join(folder, f"{number:07d}.png"), "wb").close()
+
+def test_resume_first_missing() -> None:
+    dataset_agent : VideoDatasetAgent = VideoDatasetAgent()
+    with TemporaryDirectory() as folder:
+        WriteImages(folder, [0, 1, 2, 3, 5])
+        assert dataset_agent.ResumeSample(folder, 0, None) == 3 # last image before the gap is written again
+        assert dataset_agent.ResumeSample(folder, 5, None) == 5
+        assert dataset_agent.ResumeSample(folder, 6, None) == 6
+
+def test_resume_encode_window() -> None:
+    dataset_agent : VideoDatasetAgent = VideoDatasetAgent(encode_threads=2)
+    with TemporaryDirectory() as folder:
+        WriteImages(folder, list(range(10)))
+        assert dataset_agent.ResumeSample(folder, 0, None) == 6 # images that were in flight are written again
+        assert dataset_agent.ResumeSample(folder, 8, None) == 8
+
+def test_resume_segment() -> None:
+    dataset_agent : VideoDatasetAgent = VideoDatasetAgent()
+    with TemporaryDirectory() as folder:
+        WriteImages(folder, list(range(20)))
+        assert dataset_agent.ResumeSample(folder, 0, 10) == 9
+        assert dataset_agent.ResumeSample(folder, 10, 15) == 14
+
+def test_resume_gaps() -> None:
+    # Dropped duplicates and skipped interval samples leave gaps, the extraction continues after the last image
+    with TemporaryDirectory() as folder:
+        WriteImages(folder, [0, 2, 3, 7])
+        assert VideoDatasetAgent(dedup_threshold=4).ResumeSample(folder, 0, None) == 7
+        assert VideoDatasetAgent(interval=1.0).ResumeSample(folder, 0, None) == 7
+        assert VideoDatasetAgent(dedup_threshold=4).ResumeSample(folder, 0, 3) == 2
+        assert VideoDatasetAgent().ResumeSample(folder, 0, None) == 0
+
+def test_resume_empty() -> None:
+    with TemporaryDirectory() as folder:
+        assert VideoDatasetAgent().ResumeSample(folder, 0, None) == 0
+        assert VideoDatasetAgent().ResumeSample(join(folder, "missing"), 4, None) == 4
+
+def test_settings_interpolation() -> None:
+    # The interpolation only changes resized images, without a size it does not force a new extraction
+    nearest : ImageAgent.ImageInterpolationEnum = ImageAgent.ImageInterpolationEnum.nearest_
+    assert VideoDatasetAgent(interpolation=nearest).ExtractSettings() == VideoDatasetAgent().ExtractSettings()
+    assert VideoDatasetAgent(size=Size(80, 60), interpolation=nearest).ExtractSettings() != VideoDatasetAgent(size=Size(80, 60)).ExtractSettings()
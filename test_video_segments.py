@@ -0,0 +1,41 @@
+from os.path import join
+from tempfile import TemporaryDirectory
+
+from cv2 import VideoWriter, VideoWriter_fourcc
+from numpy import full, uint8
+
+from datasets.dataset_lib import VideoDatasetAgent
+
+def WriteVideo(path : str, frames : int, fps : int) -> None:
+    video : VideoWriter = VideoWriter(path, VideoWriter_fourcc(*"mp4v"), fps, (64, 48))
+    for frame in range(frames):
+        video.write(full((48, 64, 3), frame % 256, dtype=uint8))
+    video.release()
+
+def Samples(dataset_agent : VideoDatasetAgent, path : str, first_sample : int = 0, stop_sample : int | None = None) -> list[tuple[int, float]]:
+    return [(sample, round(timestamp, 6)) for sample, timestamp, _ in dataset_agent.SampleVideo(path, first_sample, stop_sample)]
+
+def test_interval_segments_match_serial() -> None:
+    # Intervals shorter than a frame skip samples, a segment has to skip the same ones as the serial run
+    with TemporaryDirectory() as folder:
+        path : str = join(folder, "video.mp4")
+        WriteVideo(path, 300, 20)
+        for interval in (0.03, 0.045, 0.07, 0.45):
+            for seek_threshold in (None, 0, 3):
+                dataset_agent : VideoDatasetAgent = VideoDatasetAgent(interval=interval, seek_threshold=seek_threshold)
+                serial : list[tuple[int, float]] = Samples(dataset_agent, path)
+                for cuts in ((37,), (5, 80, 81), (1, 2, 150)):
+                    bounds : list[int | None] = [0, *cuts, None]
+                    segmented : list[tuple[int, float]] = []
+                    for first_sample, stop_sample in zip(bounds, bounds[1:]):
+                        segmented += Samples(dataset_agent, path, first_sample, stop_sample)
+                    assert segmented == serial, f"interval {interval} seek threshold {seek_threshold} cuts {cuts}"
+
+def test_frame_rate_segments_match_serial() -> None:
+    with TemporaryDirectory() as folder:
+        path : str = join(folder, "video.mp4")
+        WriteVideo(path, 300, 20)
+        for seek_threshold in (None, 0, 3):
+            dataset_agent : VideoDatasetAgent = VideoDatasetAgent(frame_rate=7, seek_threshold=seek_threshold)
+            serial : list[tuple[int, float]] = Samples(dataset_agent, path)
+            assert Samples(dataset_agent, path, 0, 10) + Samples(dataset_agent, path, 10, 31) + Samples(dataset_agent, path, 31) == serial